@@ -0,0 +1,238 @@
+"""
+Headless batch runner: runs many production/logistics scenarios in a process pool and
+collects their results into one summary table.
+
+Usage:
+    python batch_runner.py scenarios.json --workers 8 --output summary.csv
+
+scenarios.json holds a list of BatchScenario objects (see models.py).
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional
+
+import pandas as pd
+
+from models import BatchScenario
+from bom_service import BOMService, parse_bom_file
+from production_engine_v2 import ProductionEngineV2
+from logistics_simulation import LogisticsSimulationEngine
+from sim_logging import get_logger
+
+log = get_logger("batch_runner")
+
+
+def _seeded(setup, seed: Optional[int]):
+    if seed is None or setup.seed is not None:
+        return setup
+    return setup.copy(update={"seed": seed})
+
+
+def build_engines(scenario: BatchScenario):
+    """
+    Builds the production engine of a scenario and, if it has a logistics setup, a logistics
+    engine sharing its material request queue. Returns (production_engine, logistics_engine).
+    """
+    bom_service = BOMService()
+    if scenario.bom_file:
+        bom_service.bom_data = parse_bom_file(scenario.bom_file)
+
+    material_request_queue = deque()
+    production_engine = ProductionEngineV2(
+        setup=_seeded(scenario.production_setup, scenario.seed),
+        schedule_file=scenario.schedule_file,
+        bom_service=bom_service,
+        material_request_queue=material_request_queue,
+        target_date=scenario.target_date
+    )
+
+    logistics_engine = None
+    if scenario.logistics_setup:
+        logistics_engine = LogisticsSimulationEngine(
+            setup=_seeded(scenario.logistics_setup, scenario.seed),
+            material_request_queue=material_request_queue,
+            production_engine=production_engine,
+            mrp_file=scenario.mrp_file or "",
+            location_distances=scenario.location_distances
+        )
+    return production_engine, logistics_engine
+
+
+def _production_stalled(production_engine: ProductionEngineV2, logistics_engine: Optional[LogisticsSimulationEngine]) -> bool:
+    """
+    True if production can never reach its target: nothing is in process or queued between
+    processes, and every line is out of orders or waiting for material nobody will deliver.
+    This happens e.g. when ignore_material_availability skips units, or when logistics has
+    finished while production still waits for material.
+    """
+    deliveries_possible = logistics_engine is not None and logistics_engine.status != "finished"
+    for line_data in production_engine.lines.values():
+        for process_data in line_data["processes"].values():
+            if process_data["units_in_process"] or any(process_data["queue_in"].values()):
+                return False
+        if line_data["production_orders"]:
+            # Only the process consuming the BOM waits for material; the others just idle
+            waiting = any(process_data.get("is_waiting_for_material", False) for process_data in line_data["processes"].values())
+            if not waiting or deliveries_possible:
+                return False
+    return True
+
+
+def _stall_note(production_engine: ProductionEngineV2) -> str:
+    return (f"stalled at {production_engine.time}s with "
+            f"{production_engine.completed_units + production_engine.scrapped_units}/{production_engine.total_production_target} units")
+
+
+def run_engines(scenario: BatchScenario, production_engine: ProductionEngineV2, logistics_engine: Optional[LogisticsSimulationEngine]) -> int:
+    """
+    Steps production until it is done and keeps logistics in lockstep on simulated time.
+    A run that can no longer progress ends with status "stalled" instead of looping forever.
+    Returns the number of production steps executed.
+    """
+    steps = 0
+    production_engine.status = "running"
+    while production_engine.status == "running":
+        if production_engine.completed_units + production_engine.scrapped_units >= production_engine.total_production_target:
+            production_engine.status = "finished"
+            break
+        if scenario.max_sim_time and production_engine.time >= scenario.max_sim_time:
+            production_engine.stop_simulation()
+            break
+
+        version_before = production_engine.state_version
+        production_engine.run_step()
+        steps += 1
+
+        if logistics_engine:
+            # Event-driven logistics jumps between events but never past the production clock
+            horizon = logistics_engine.setup.workday_start_time + production_engine.time
+            while logistics_engine.status != "finished" and logistics_engine.current_time < horizon:
+                logistics_engine.run_step(until=horizon)
+
+        # Only a step that changed nothing can start a stall
+        if production_engine.state_version == version_before and _production_stalled(production_engine, logistics_engine):
+            production_engine.status = "stalled"
+            log.warning(f"Scenario '{scenario.name}' {_stall_note(production_engine)}")
+    return steps
+
+
+def simulate_scenario(scenario: BatchScenario, quiet: bool = True):
+    """
+    Builds and runs the engines of a scenario. Returns (production_engine, logistics_engine, steps);
+    logistics_engine is None for production-only scenarios.
+    """
+    # Engine log messages go to stdout (see sim_logging); silence them unless asked otherwise.
+    # Anything the summary needs, such as a stall, is reported in the summary row instead.
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull if quiet else sys.stdout):
+        production_engine, logistics_engine = build_engines(scenario)
+        steps = run_engines(scenario, production_engine, logistics_engine)
+    return production_engine, logistics_engine, steps
+
+
+def run_scenario(scenario: BatchScenario, quiet: bool = True) -> dict:
+    """
+    Runs a single scenario to completion and returns one summary row.
+    Errors are reported in the 'error' column instead of being raised, so one bad scenario
+    does not abort a whole sweep.
+    """
+    row = {
+        "scenario": scenario.name,
+        "seed": scenario.seed,
+        "schedule_file": os.path.basename(scenario.schedule_file),
+        "target_date": scenario.target_date,
+        "fleet_size": len(scenario.logistics_setup.transport_units) if scenario.logistics_setup else 0,
+        "error": None,
+        "note": None,
+    }
+    wall_start = time.time()
+    try:
+        production_engine, logistics_engine, steps = simulate_scenario(scenario, quiet)
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+        row["wall_time_s"] = round(time.time() - wall_start, 3)
+        return row
+
+    target = production_engine.total_production_target
+    finished_units = production_engine.completed_units + production_engine.scrapped_units
+    operators = sum(
+        process_data["config"].num_operators
+        for line_data in production_engine.lines.values()
+        for process_data in line_data["processes"].values()
+    )
+    row.update({
+        "status": production_engine.status,
+        "steps": steps,
+        "sim_time_s": production_engine.time,
+        "num_lines": len(production_engine.lines),
+        "total_operators": operators,
+        "total_target": target,
+        "completed_units": production_engine.completed_units,
+        "scrapped_units": production_engine.scrapped_units,
+        "completion_rate": finished_units / target if target else 0,
+        "throughput_per_hour": production_engine.completed_units / (production_engine.time / 3600) if production_engine.time > 0 else 0,
+        "step_p95_ms": production_engine.step_timer.summary()["total"]["p95_ms"],
+    })
+    if logistics_engine:
+        row.update({
+            "logistics_time_s": logistics_engine.current_time,
+            "logistics_completed_tasks": logistics_engine.completed_tasks_count,
+            "logistics_pending_tasks": len(logistics_engine.available_tasks) + len(logistics_engine.in_progress_tasks),
+            "logistics_distance_m": logistics_engine.performance_metrics["total_distance_traveled"],
+            "logistics_utilization": logistics_engine.get_utilization(),
+            "logistics_step_p95_ms": logistics_engine.step_timer.summary()["total"]["p95_ms"],
+        })
+    if production_engine.status == "stalled":
+        row["note"] = _stall_note(production_engine)
+    row["wall_time_s"] = round(time.time() - wall_start, 3)
+    return row
+
+
+def run_batch(scenarios: List[BatchScenario], max_workers: Optional[int] = None, quiet: bool = True) -> pd.DataFrame:
+    """
+    Runs all scenarios in a process pool (one scenario per worker process) and returns the
+    summary table in the order the scenarios were given.
+    """
+    rows = [None] * len(scenarios)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(run_scenario, scenario, quiet): i for i, scenario in enumerate(scenarios)}
+        for future in as_completed(futures):
+            i = futures[future]
+            rows[i] = future.result()
+            log.info(f"Scenario '{scenarios[i].name}' done ({sum(r is not None for r in rows)}/{len(scenarios)})")
+    return pd.DataFrame(rows)
+
+
+def load_scenarios(file_path: str) -> List[BatchScenario]:
+    with open(file_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return [BatchScenario(**item) for item in data]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run production/logistics scenarios headless in parallel.")
+    parser.add_argument("scenarios", help="JSON file with a list of scenarios")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: all cores)")
+    parser.add_argument("--output", default=None, help="Write the summary table to this CSV file")
+    parser.add_argument("--verbose", action="store_true", help="Show the engines' own output")
+    args = parser.parse_args(argv)
+
+    scenarios = load_scenarios(args.scenarios)
+    log.info(f"Running {len(scenarios)} scenarios with {args.workers or os.cpu_count()} workers")
+    summary = run_batch(scenarios, max_workers=args.workers, quiet=not args.verbose)
+
+    if args.output:
+        summary.to_csv(args.output, index=False)
+        log.info(f"Summary written to {args.output}")
+    with pd.option_context('display.max_columns', None, 'display.width', 200):
+        print(summary)
+    return summary
+
+
+if __name__ == "__main__":
+    main()
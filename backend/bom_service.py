@@ -3,6 +3,20 @@ import glob
 import shutil
 import csv
 from collections import defaultdict
+from typing import NamedTuple, Tuple
+
+from sim_logging import get_logger
+
+# get_components runs on every production step, so its warning is capped
+log = get_logger("bom", max_per_second=1)
+
+
+class AggregatedComponents(NamedTuple):
+    """
+    Nearest child components of a part with summed quantities, as parallel tuples.
+    """
+    components: Tuple[str, ...]
+    quantities: Tuple[int, ...]
 
 # This function is adapted from the original bom_parser.py
 def parse_bom_file(file_path):
@@ -122,6 +136,10 @@ class BOMService:
         """
         Initializes the BOM service by loading the latest BOM and material data.
         """
+        # Filtered "nearest children" per (parent_part, mrpc_filter, spt_filter).
+        # Must be created before bom_data/material_data since their setters clear it.
+        self._component_index = {}
+        self._aggregated_index = {}
         self.bom_data = {}
         self.material_data = {}
         
@@ -130,6 +148,49 @@ class BOMService:
         self._load_latest_bom_data()
         print("INFO: BOMService initialized.")
 
+    @property
+    def bom_data(self):
+        return self._bom_data
+
+    @bom_data.setter
+    def bom_data(self, value):
+        self._bom_data = value
+        self.invalidate_component_index()
+
+    @property
+    def material_data(self):
+        return self._material_data
+
+    @material_data.setter
+    def material_data(self, value):
+        self._material_data = value
+        self.invalidate_component_index()
+
+    def reload(self):
+        """
+        Reloads the latest material and BOM data. The component index is rebuilt lazily.
+        """
+        self._load_latest_material_data()
+        self._load_latest_bom_data()
+
+    def invalidate_component_index(self):
+        """
+        Drops all memoized component lists, e.g. after BOM or material data changed.
+        """
+        self._component_index = {}
+        self._aggregated_index = {}
+
+    def build_component_index(self, parent_parts, mrpc_filter: str = "*", spt_filter: str = "*"):
+        """
+        Eagerly resolves the components of every given parent part so that later
+        get_components calls are plain dictionary lookups.
+        """
+        if not self.bom_data:
+            return
+        for parent_part in parent_parts:
+            self.get_components_aggregated(parent_part, mrpc_filter, spt_filter)
+        log.info(f"Component index holds {len(self._component_index)} entries.")
+
     def _load_latest_material_data(self):
         """
         Finds the latest material data file from the network drive,
@@ -189,11 +250,42 @@ class BOMService:
         Gets the nearest child components for a given parent part, applying filters.
         This replaces the simple bom_data.get() call.
         The quantity is assumed to be 1 as per the new parsing logic.
+        The returned list is shared through the component index and must not be modified.
         """
         if not self.bom_data:
-            print("WARNING: BOM data is not loaded. Cannot get components.")
+            log.warning("BOM data is not loaded. Cannot get components.")
             return []
 
+        index_key = (parent_part, (mrpc_filter or "*").upper(), (spt_filter or "*").upper())
+        components = self._component_index.get(index_key)
+        if components is None:
+            components = self._resolve_components(parent_part, mrpc_filter, spt_filter)
+            self._component_index[index_key] = components
+        return components
+
+    def get_components_aggregated(self, parent_part: str, mrpc_filter: str = "*", spt_filter: str = "*") -> AggregatedComponents:
+        """
+        Same components as get_components, but each child appears once with its summed
+        quantity, in order of first appearance.
+        """
+        index_key = (parent_part, (mrpc_filter or "*").upper(), (spt_filter or "*").upper())
+        aggregated = self._aggregated_index.get(index_key)
+        if aggregated is not None:
+            return aggregated
+
+        quantities = {}
+        for item in self.get_components(parent_part, mrpc_filter, spt_filter):
+            quantities[item['component']] = quantities.get(item['component'], 0) + item['quantity']
+        aggregated = AggregatedComponents(tuple(quantities.keys()), tuple(quantities.values()))
+
+        if self.bom_data:
+            self._aggregated_index[index_key] = aggregated
+        return aggregated
+
+    def _resolve_components(self, parent_part: str, mrpc_filter: str, spt_filter: str):
+        """
+        Walks the BOM tree for get_components. Results are memoized in the component index.
+        """
         found_children = []
         self._find_nearest_filtered_children_recursive(
             current_part=parent_part,
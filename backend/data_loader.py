@@ -2,7 +2,19 @@ import pandas as pd
 from collections import defaultdict
 import csv
 import os
+import hashlib
+import hmac
+import pickle
+import secrets
 from datetime import datetime
+from sim_logging import get_logger
+
+log = get_logger("data_loader")
+
+# Bump whenever the normalization in _parse_schedule changes, so stale caches are ignored.
+SCHEDULE_CACHE_VERSION = 2
+# Private directory for parsed schedule caches, outside the upload directory
+DEFAULT_SCHEDULE_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "simulasi_logistik", "schedules")
 
 def parse_time_to_seconds(val):
     try:
@@ -65,13 +77,127 @@ def load_mrp_data(mrp_file_path):
         
     return mrp_data
 
-def load_schedule(schedule_file_path):
+def _schedule_cache_dir():
+    """
+    SCHEDULE_CACHE_DIR, or a per-user directory under ~/.cache. Created private (0700): the
+    caches are pickles, so nobody else, in particular the upload endpoint, may write there.
+    """
+    cache_dir = os.environ.get("SCHEDULE_CACHE_DIR") or DEFAULT_SCHEDULE_CACHE_DIR
+    os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+    return cache_dir
+
+def _schedule_cache_path(schedule_file_path):
+    """
+    One cache file per source path, named after the hash of the absolute path so that the
+    uploaded file name never ends up in a path.
+    """
+    path_hash = hashlib.sha256(os.path.abspath(schedule_file_path).encode('utf-8')).hexdigest()
+    return os.path.join(_schedule_cache_dir(), f"{path_hash}.schedule-cache.pkl")
+
+def _schedule_cache_key(cache_dir):
+    """Secret HMAC key of the cache directory, generated on first use."""
+    key_path = os.path.join(cache_dir, "cache.key")
+    try:
+        with open(key_path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+    key = secrets.token_bytes(32)
+    try:
+        fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # Another process created it in the meantime
+        with open(key_path, 'rb') as f:
+            return f.read()
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key)
+    return key
+
+def _cache_signature(cache_path, payload):
+    key = _schedule_cache_key(os.path.dirname(cache_path))
+    return hmac.new(key, payload, hashlib.sha256).digest()
+
+def _file_sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _read_schedule_cache(cache_path):
+    """
+    The file is an HMAC-SHA256 signature followed by the pickle. The signature is checked
+    before anything is unpickled, so a cache file that this module did not write is ignored.
+    """
+    try:
+        with open(cache_path, 'rb') as f:
+            signature = f.read(hashlib.sha256().digest_size)
+            payload = f.read()
+        if not hmac.compare_digest(signature, _cache_signature(cache_path, payload)):
+            log.warning(f"Ignoring schedule cache with a bad signature: {cache_path}")
+            return None
+        cached = pickle.loads(payload)
+        if isinstance(cached, dict) and cached.get('version') == SCHEDULE_CACHE_VERSION:
+            return cached
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        log.warning(f"Ignoring unreadable schedule cache {cache_path}: {e}")
+    return None
+
+def _write_schedule_cache(cache_path, cached):
+    temp_path = f"{cache_path}.tmp"
+    try:
+        payload = pickle.dumps(cached, protocol=pickle.HIGHEST_PROTOCOL)
+        with open(temp_path, 'wb') as f:
+            f.write(_cache_signature(cache_path, payload))
+            f.write(payload)
+        os.replace(temp_path, cache_path)
+    except Exception as e:
+        log.warning(f"Could not write schedule cache {cache_path}: {e}")
+
+def load_schedule(schedule_file_path, use_cache=True):
     """
     Loads the production schedule from a CSV or Excel file.
+    The normalized DataFrame is cached in a signed binary file in the private cache directory,
+    keyed by the SHA-256 of its content. The cache is trusted as long as mtime and size are unchanged,
+    otherwise the content hash decides whether the file has to be parsed again.
+    """
+    if not use_cache:
+        return _parse_schedule(schedule_file_path)
+
+    cache_path = _schedule_cache_path(schedule_file_path)
+    file_stat = os.stat(schedule_file_path)
+    cached = _read_schedule_cache(cache_path)
+
+    if cached and cached['mtime'] == file_stat.st_mtime and cached['size'] == file_stat.st_size:
+        log.info(f"Loaded schedule from cache: {cache_path}")
+        return cached['df']
+
+    content_hash = _file_sha256(schedule_file_path)
+    if cached and cached['sha256'] == content_hash:
+        # Touched but unchanged: refresh the stat fields so the next load skips hashing
+        df = cached['df']
+        log.info(f"Schedule unchanged since last parse, using cache: {cache_path}")
+    else:
+        df = _parse_schedule(schedule_file_path)
+
+    _write_schedule_cache(cache_path, {
+        'version': SCHEDULE_CACHE_VERSION,
+        'sha256': content_hash,
+        'mtime': file_stat.st_mtime,
+        'size': file_stat.st_size,
+        'df': df,
+    })
+    return df
+
+def _parse_schedule(schedule_file_path):
+    """
+    Parses the production schedule from a CSV or Excel file.
     This version is designed to handle the specific multi-line header format.
     """
     try:
-        print(f"--- DEBUG: Loading schedule file: {schedule_file_path} ---")
+        log.debug(f"--- Loading schedule file: {schedule_file_path} ---")
         file_extension = os.path.splitext(schedule_file_path)[1].lower()
         
         header_rows = [2, 3]
@@ -221,11 +347,8 @@ def load_schedule(schedule_file_path):
             if col.startswith('SCH_'):
                 df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
 
-        print("--- DEBUG: TAKT_TIME after all processing ---")
-        print(df[['LINE', 'PART NO', 'TAKT_TIME']].head(50).to_string())
-
-        print("--- DEBUG: TAKT_TIME after all processing ---")
-        print(df[['LINE', 'PART NO', 'TAKT_TIME']].head(50).to_string())
+        if log.debug_enabled:
+            log.debug("--- TAKT_TIME after all processing ---\n" + df[['LINE', 'PART NO', 'TAKT_TIME']].head(50).to_string())
 
         return df
 
@@ -1,5 +1,5 @@
 import os
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Float
+from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Float, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
@@ -60,6 +60,18 @@ class MasterLocationDB(Base):
     created_at = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
 
+class MasterLocationDistanceDB(Base):
+    __tablename__ = "master_location_distances"
+    __table_args__ = (UniqueConstraint("from_location", "to_location", name="uq_location_distance"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    from_location = Column(String, index=True, nullable=False) # Nama master location asal
+    to_location = Column(String, index=True, nullable=False) # Nama master location tujuan
+    distance = Column(Float, nullable=False) # Meter
+    travel_time = Column(Float, nullable=False) # Detik
+    created_at = Column(DateTime, default=datetime.now)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
 class MasterTransportUnitDB(Base):
     __tablename__ = "master_transport_units"
 
@@ -0,0 +1,238 @@
+"""
+Dispatching for logistics transport tasks.
+
+Tasks are kept in a heap ordered by (score, arrival), so the most urgent task is taken first
+and ties keep the order in which tasks were created. With a constant score the queue is FIFO.
+A dispatch policy scores new tasks and picks the idle unit for the task at the head of the queue.
+"""
+import heapq
+import itertools
+import math
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from models import TransportTask
+
+# (priority tier, urgency value); lower is dispatched first
+DispatchScore = Tuple[int, float]
+
+# Score of tasks without priority information, e.g. preset tasks or FIFO dispatch
+NO_PRIORITY: DispatchScore = (1, math.inf)
+
+
+class DispatchQueue:
+    """
+    Heap of transport tasks. push/popleft are O(log n); peek and replace_head are used by
+    the assignment loop to take a task or leave the remainder of a split trip at the head.
+    """
+
+    def __init__(self, tasks: Iterable[TransportTask] = ()):
+        self._heap: List = []
+        self._arrival = itertools.count()
+        for task in tasks:
+            self.push(task)
+
+    def push(self, task: TransportTask, score: DispatchScore = NO_PRIORITY):
+        heapq.heappush(self._heap, (score, next(self._arrival), task))
+
+    def append(self, task: TransportTask):
+        self.push(task)
+
+    def extend(self, tasks: Iterable[TransportTask]):
+        for task in tasks:
+            self.push(task)
+
+    def peek(self) -> Optional[TransportTask]:
+        return self._heap[0][2] if self._heap else None
+
+    def popleft(self) -> TransportTask:
+        return heapq.heappop(self._heap)[2]
+
+    def replace_head(self, task: TransportTask):
+        """Replaces the head task and keeps its place in the queue."""
+        score, arrival, _ = self._heap[0]
+        self._heap[0] = (score, arrival, task)
+
+    def head_score(self) -> Optional[DispatchScore]:
+        return self._heap[0][0] if self._heap else None
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __bool__(self) -> bool:
+        return bool(self._heap)
+
+    def __iter__(self) -> Iterator[TransportTask]:
+        """Tasks in dispatch order. Sorts a copy of the heap, so it is meant for status and tests."""
+        return (task for _, _, task in sorted(self._heap, key=lambda entry: entry[:2]))
+
+
+class IdleUnitPool:
+    """
+    Idle transport units, in fleet order overall and per location. first() is the idle unit
+    that comes first in the fleet, first_at(location) the first one parked at a location.
+    A unit can also be taken by name; its heap entries are then dropped once they reach the top.
+    A policy only pops one of the two indexes, so both are compacted once they hold more than
+    COMPACT_FACTOR entries per idle unit.
+    """
+    COMPACT_FACTOR = 4
+    COMPACT_MIN_ENTRIES = 64
+
+    def __init__(self, unit_order: Dict[str, int]):
+        self._unit_order = unit_order
+        self._heap: List = []
+        self._idle = set()
+        # location -> heap of (unit_order, unit_name) of the units that went idle there
+        self._by_location: Dict[str, List] = {}
+        self._location_entries = 0
+        self._location: Dict[str, str] = {}
+
+    def order(self, unit_name: str) -> int:
+        return self._unit_order[unit_name]
+
+    def add(self, unit_name: str, location: str):
+        if unit_name in self._idle:
+            return
+        self._idle.add(unit_name)
+        self._location[unit_name] = location
+        entry = (self._unit_order[unit_name], unit_name)
+        heapq.heappush(self._heap, entry)
+        heapq.heappush(self._by_location.setdefault(location, []), entry)
+        self._location_entries += 1
+        limit = max(self.COMPACT_MIN_ENTRIES, self.COMPACT_FACTOR * len(self._idle))
+        if len(self._heap) > limit or self._location_entries > limit:
+            self._compact()
+
+    def _compact(self):
+        """Rebuilds both indexes from the idle units, dropping the stale entries."""
+        entries = sorted((self._unit_order[unit_name], unit_name) for unit_name in self._idle)
+        self._heap = entries
+        self._by_location = {}
+        for entry in entries:
+            self._by_location.setdefault(self._location[entry[1]], []).append(entry)
+        self._location_entries = len(entries)
+
+    def take(self, unit_name: str):
+        self._idle.discard(unit_name)
+
+    def first(self) -> Optional[str]:
+        while self._heap and self._heap[0][1] not in self._idle:
+            heapq.heappop(self._heap)
+        return self._heap[0][1] if self._heap else None
+
+    def first_at(self, location: str) -> Optional[str]:
+        heap = self._by_location.get(location)
+        if heap is None:
+            return None
+        while heap and (heap[0][1] not in self._idle or self._location[heap[0][1]] != location):
+            heapq.heappop(heap)
+            self._location_entries -= 1
+        if not heap:
+            del self._by_location[location]
+            return None
+        return heap[0][1]
+
+    def locations(self) -> List[str]:
+        """Locations that may have idle units (some may turn out empty in first_at)."""
+        return list(self._by_location)
+
+    def __len__(self) -> int:
+        return len(self._idle)
+
+    def __bool__(self) -> bool:
+        return bool(self._idle)
+
+    def __contains__(self, unit_name: str) -> bool:
+        return unit_name in self._idle
+
+    def __iter__(self) -> Iterator[str]:
+        """Idle unit names in no particular order."""
+        return iter(self._idle)
+
+
+class DispatchPolicy:
+    """
+    Scores new tasks and picks the idle unit for the task at the head of the queue. By default
+    tasks are scored by the setup's dispatch_priority and go to the first idle unit of the fleet.
+    """
+    name = "fifo"
+
+    def score(self, engine, line_name: Optional[str], process_name: Optional[str], priority: Optional[str]) -> DispatchScore:
+        return engine.priority_score(line_name, process_name, priority)
+
+    def select_unit(self, engine, task: TransportTask, idle_units: IdleUnitPool) -> Optional[str]:
+        if not task.drops:
+            return idle_units.first()
+        return self._best(self._eligible(task, idle_units), idle_units, lambda unit_name: 0)
+
+    @staticmethod
+    def _eligible(task: TransportTask, idle_units: IdleUnitPool) -> Iterable[str]:
+        """Milk-run tours only go to the tow trains they were planned for."""
+        if not task.drops:
+            return idle_units
+        return (unit_name for unit_name in idle_units if unit_name in task.transport_unit_names)
+
+    @staticmethod
+    def _best(candidates: Iterable[str], idle_units: IdleUnitPool, key) -> Optional[str]:
+        """Candidate with the lowest key; ties go to the unit that comes first in the fleet."""
+        return min(candidates, key=lambda unit_name: (key(unit_name), idle_units.order(unit_name)), default=None)
+
+
+class FifoPolicy(DispatchPolicy):
+    """First-come, first-served, as the engine always dispatched."""
+    name = "fifo"
+
+
+class NearestUnitPolicy(DispatchPolicy):
+    """
+    The head task goes to the idle unit with the shortest drive to the task's origin. Units are
+    looked up per location, so the cost depends on the number of locations with idle units,
+    not on the fleet size. Ties go to the unit that comes first in the fleet.
+    """
+    name = "nearest_unit"
+
+    def select_unit(self, engine, task: TransportTask, idle_units: IdleUnitPool) -> Optional[str]:
+        if task.drops:
+            return self._best(self._eligible(task, idle_units), idle_units, lambda unit_name: engine.time_to_origin(unit_name, task))
+        best, best_key = None, None
+        for location in idle_units.locations():
+            unit_name = idle_units.first_at(location)
+            if unit_name is None:
+                continue
+            key = (engine.approach_leg(location, task)[1], idle_units.order(unit_name))
+            if best_key is None or key < best_key:
+                best, best_key = unit_name, key
+        return best
+
+
+class EarliestDuePolicy(DispatchPolicy):
+    """
+    Tasks are due when their destination process runs out of material; the earliest due task
+    goes first regardless of dispatch_priority and request priority.
+    """
+    name = "earliest_due"
+
+    def score(self, engine, line_name: Optional[str], process_name: Optional[str], priority: Optional[str]) -> DispatchScore:
+        return (0, engine.due_time(line_name, process_name))
+
+
+class CapacityFillPolicy(DispatchPolicy):
+    """
+    The head task goes to the smallest idle unit that carries it whole, so large units stay
+    free for large trips; if none can, to the largest one so the trip is split as little as possible.
+    """
+    name = "capacity_fill"
+
+    def select_unit(self, engine, task: TransportTask, idle_units: IdleUnitPool) -> Optional[str]:
+        def fill(unit_name):
+            capacity = engine.transport_units_map[unit_name].total_capacity
+            if capacity >= task.lots_required:
+                return (0, capacity - task.lots_required)
+            return (1, -capacity)
+        return self._best(self._eligible(task, idle_units), idle_units, fill)
+
+
+DISPATCH_POLICIES = {policy.name: policy for policy in (FifoPolicy, NearestUnitPolicy, EarliestDuePolicy, CapacityFillPolicy)}
+
+
+def make_policy(name: str) -> DispatchPolicy:
+    return DISPATCH_POLICIES[name]()
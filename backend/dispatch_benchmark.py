@@ -0,0 +1,189 @@
+"""
+Dispatch policy benchmark: replays one recorded stream of material requests through every
+dispatch policy and compares tasks completed, mean lead time, unit utilization and step CPU time.
+
+Usage:
+    python dispatch_benchmark.py scenario.json --output policies.csv
+    python dispatch_benchmark.py scenario.json --requests recorded.json --policies fifo nearest_unit
+
+scenario.json holds one BatchScenario with a logistics setup (see models.py). Without
+--requests, the scenario is run once with its own policy to record the request stream.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+from collections import deque, defaultdict
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from models import BatchScenario
+from batch_runner import build_engines, run_engines
+from dispatch import DISPATCH_POLICIES
+from logistics_simulation import LogisticsSimulationEngine
+
+
+class RecordingRequestQueue(deque):
+    """
+    Material request queue that records every request with the production time it was raised
+    at and the time its destination process had left before starving.
+    """
+
+    def __init__(self, production_engine):
+        super().__init__()
+        self.production_engine = production_engine
+        self.recorded: List[dict] = []
+
+    def _record(self, request: dict):
+        line_name, _, process_name = request.get('destination', '').partition(':')
+        self.recorded.append({
+            **request,
+            "time": self.production_engine.time,
+            "time_to_starvation": self.production_engine.time_to_starvation(line_name, process_name),
+        })
+
+    def append(self, request: dict):
+        self._record(request)
+        super().append(request)
+
+    def appendleft(self, request: dict):
+        self._record(request)
+        super().appendleft(request)
+
+
+class ReplayedProduction:
+    """
+    Stands in for the production engine during a replay: accepts every delivery and answers
+    starvation queries from the recorded requests.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+        self.due: Dict[tuple, float] = {}
+        self.delivered: Dict[str, int] = defaultdict(int)
+
+    def has_process(self, line_name: str, process_name: str) -> bool:
+        return True
+
+    def add_stock(self, destination: str, material: str, quantity: int):
+        self.delivered[material] += quantity
+
+    def time_to_starvation(self, line_name: str, process_name: str) -> float:
+        return max(0.0, self.due.get((line_name, process_name), float("inf")) - self.now)
+
+
+def record_request_stream(scenario: BatchScenario, quiet: bool = True) -> List[dict]:
+    """Runs the scenario once and returns the material requests production raised, in order."""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull if quiet else sys.stdout):
+        production_engine, logistics_engine = build_engines(scenario)
+        queue = RecordingRequestQueue(production_engine)
+        production_engine.material_request_queue = queue
+        if logistics_engine:
+            logistics_engine.material_request_queue = queue
+        run_engines(scenario, production_engine, logistics_engine)
+    return queue.recorded
+
+
+def replay_requests(scenario: BatchScenario, requests: Sequence[dict], policy: str, quiet: bool = True) -> dict:
+    """
+    Feeds the recorded requests to a fresh logistics engine that uses `policy`, each at the
+    time it was raised, and returns one summary row. The replay ticks every second so that
+    requests arrive on time, whatever the setup's event_driven flag says.
+    """
+    setup = scenario.logistics_setup.copy(update={"dispatch_policy": policy, "event_driven": False})
+    pending = deque(sorted(requests, key=lambda request: request["time"]))
+    request_queue = deque()
+    production = ReplayedProduction()
+
+    step_cpu_times = []
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull if quiet else sys.stdout):
+        engine = LogisticsSimulationEngine(
+            setup=setup,
+            material_request_queue=request_queue,
+            production_engine=production,
+            mrp_file=scenario.mrp_file or "",
+            location_distances=scenario.location_distances
+        )
+        while engine.status != "finished":
+            elapsed = engine.current_time - setup.workday_start_time
+            while pending and pending[0]["time"] <= elapsed:
+                recorded = pending.popleft()
+                line_name, _, process_name = recorded.get('destination', '').partition(':')
+                production.due[(line_name, process_name)] = recorded["time"] + recorded.get("time_to_starvation", float("inf"))
+                request_queue.append({key: value for key, value in recorded.items() if key not in ("time", "time_to_starvation")})
+            production.now = elapsed
+
+            cpu_start = time.process_time()
+            engine.run_step()
+            step_cpu_times.append(time.process_time() - cpu_start)
+
+    return {
+        "policy": policy,
+        "requests": len(requests),
+        "tasks_completed": engine.completed_tasks_count,
+        "tasks_pending": len(engine.available_tasks) + len(engine.in_progress_tasks),
+        "mean_lead_time_s": engine.get_average_lead_time(),
+        "utilization": engine.get_utilization(),
+        "distance_m": engine.performance_metrics["total_distance_traveled"],
+        "empty_distance_m": engine.performance_metrics["empty_distance_traveled"],
+        "steps": len(step_cpu_times),
+        "step_cpu_mean_us": 1e6 * sum(step_cpu_times) / len(step_cpu_times) if step_cpu_times else 0.0,
+        "step_cpu_total_s": sum(step_cpu_times),
+    }
+
+
+def run_benchmark(scenario: BatchScenario, policies: Optional[Sequence[str]] = None, requests: Optional[Sequence[dict]] = None, quiet: bool = True) -> pd.DataFrame:
+    """
+    Replays the same request stream through each policy (all registered policies by default)
+    and returns one row per policy. The stream is recorded from the scenario if not given.
+    """
+    if not scenario.logistics_setup:
+        raise ValueError(f"Scenario '{scenario.name}' has no logistics setup to benchmark")
+    if requests is None:
+        requests = record_request_stream(scenario, quiet)
+        print(f"INFO: Recorded {len(requests)} material requests from scenario '{scenario.name}'")
+
+    rows = []
+    for policy in policies or DISPATCH_POLICIES:
+        rows.append(replay_requests(scenario, requests, policy, quiet))
+        print(f"INFO: Policy '{policy}' done")
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare logistics dispatch policies on one recorded request stream.")
+    parser.add_argument("scenario", help="JSON file with one BatchScenario that has a logistics setup")
+    parser.add_argument("--requests", default=None, help="Replay this recorded request stream instead of recording one")
+    parser.add_argument("--record-to", default=None, help="Write the recorded request stream to this JSON file")
+    parser.add_argument("--policies", nargs="+", choices=sorted(DISPATCH_POLICIES), default=None, help="Policies to compare (default: all)")
+    parser.add_argument("--output", default=None, help="Write the comparison table to this CSV file")
+    args = parser.parse_args(argv)
+
+    with open(args.scenario, 'r', encoding='utf-8') as f:
+        scenario = BatchScenario(**json.load(f))
+
+    requests = None
+    if args.requests:
+        with open(args.requests, 'r', encoding='utf-8') as f:
+            requests = json.load(f)
+    else:
+        requests = record_request_stream(scenario)
+        if args.record_to:
+            with open(args.record_to, 'w', encoding='utf-8') as f:
+                json.dump(requests, f)
+            print(f"INFO: Request stream written to {args.record_to}")
+
+    summary = run_benchmark(scenario, args.policies, requests)
+    if args.output:
+        summary.to_csv(args.output, index=False)
+        print(f"INFO: Comparison written to {args.output}")
+    with pd.option_context('display.max_columns', None, 'display.width', 200):
+        print(summary)
+    return summary
+
+
+if __name__ == "__main__":
+    main()
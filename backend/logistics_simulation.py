@@ -1,12 +1,28 @@
-import random
-from typing import Dict, List, Deque, Optional
+import math
+import heapq
+from typing import Dict, List, Deque, Optional, Tuple
 from collections import deque, defaultdict
-from models import LogisticsSimulationSetup, TransportTask, Location, TransportUnit, MasterLocation
+import numpy as np
+from models import LogisticsSimulationSetup, TransportTask, Location, TransportUnit, MasterLocation, LocationDistance
 from data_loader import load_mrp_data
+from random_streams import make_stream
+from sim_logging import get_logger
+from step_metrics import StepTimer
+from route_planner import plan_milk_runs
+from fleet_arrays import FleetArrays
+from dispatch import DispatchQueue, DispatchScore, IdleUnitPool, NO_PRIORITY, make_policy
 from simulation import SimulationEngine # Import Production Engine to add stock
 
+# Used for legs that have no entry in the location distance matrix
+DEFAULT_LEG_DISTANCE = 500.0  # meters
+DEFAULT_LEG_TRAVEL_TIME = 120.0  # seconds
+
+log = get_logger("logistics")
+# Per-step summaries, capped so long runs do not flood stdout
+step_log = get_logger("logistics.step", max_per_second=5)
+
 class LogisticsSimulationEngine:
-    def __init__(self, setup: LogisticsSimulationSetup, material_request_queue: deque, production_engine: SimulationEngine, mrp_file: str, master_locations: List[MasterLocation] = []):
+    def __init__(self, setup: LogisticsSimulationSetup, material_request_queue: deque, production_engine: SimulationEngine, mrp_file: str, master_locations: List[MasterLocation] = [], location_distances: List[LocationDistance] = []):
         # Validate setup
         if not setup.locations:
             raise ValueError("Logistics setup must include at least one location")
@@ -20,6 +36,8 @@ class LogisticsSimulationEngine:
         self.current_time = self.setup.workday_start_time
         self.is_paused = False
         self.simulation_speed = 1.0
+        # Per-engine random stream for abnormality draws, independent from production's NG stream
+        self.rng = make_stream(self.setup.seed, "logistics_abnormality")
 
         # Performance monitoring
         self.performance_metrics = {
@@ -28,12 +46,14 @@ class LogisticsSimulationEngine:
             "average_processing_time": 0,
             "peak_concurrent_units": 0,
             "total_distance_traveled": 0,
+            "empty_distance_traveled": 0,
+            "busy_unit_seconds": 0,
             "efficiency_score": 0,
-            "step_processing_times": [],
             "average_queue_time": 0,
             "throughput": 0
         }
-        self.step_start_time = None
+        # Wall-clock time of the last steps, per phase; average_processing_time is its running mean
+        self.step_timer = StepTimer(("requests", "dispatch", "progression"))
         self.batch_size_requests = 1000  # Max requests to process per step, large to allow parallel
         # Removed batch_size_assignments to allow unlimited assignments for better vehicle utilization
 
@@ -44,7 +64,7 @@ class LogisticsSimulationEngine:
         # Load MRP data to find material origins
         self.mrp_data = load_mrp_data(mrp_file)
         if not self.mrp_data:
-            print("Warning: MRP data could not be loaded. Material origins will be unknown.")
+            log.warning("MRP data could not be loaded. Material origins will be unknown.")
 
         self.location_to_lines_map: Dict[str, List[str]] = {}
         if master_locations:
@@ -53,6 +73,7 @@ class LogisticsSimulationEngine:
 
         self.locations: Dict[str, Location] = {loc.name: loc for loc in self.setup.locations}
         self.transport_units_map: Dict[str, TransportUnit] = {unit.name: unit for unit in self.setup.transport_units}
+        self._build_distance_matrix(location_distances, master_locations)
 
         self.transport_units_status: Dict[str, Dict] = {
             unit.name: {
@@ -62,8 +83,14 @@ class LogisticsSimulationEngine:
                 "current_task": None,
                 "current_location": self.find_initial_location(unit.name),
                 "progress": 0,
+                "phase_duration": 0,
+                "phase_started_at": self.current_time,
+                "phase_id": 0,
                 "stoppage_duration": 0,
                 "delay_countdown": 0,
+                "busy_since": None,
+                "stop_index": 0,
+                "leg_distance": 0,
                 "current_load_carried_by_unit": {},
             }
             for unit in self.setup.transport_units
@@ -74,18 +101,39 @@ class LogisticsSimulationEngine:
 
         self.completed_tasks_count = 0
         self.completed_tasks_per_unit: Dict[str, int] = {unit.name: 0 for unit in self.setup.transport_units}
-        self.task_assignment_index = 0  # For round-robin task assignment to transports
+        self.dispatch_policy = make_policy(self.setup.dispatch_policy)
 
         self.event_log: Deque[str] = deque(maxlen=100)
+
+        # Event-driven mode: heap of (phase_end_time, unit_order, phase_id, unit_name)
+        self.event_driven = self.setup.event_driven
+        self._phase_events: List = []
+        self._off_shift_since: Optional[int] = None
+        self._unit_order: Dict[str, int] = {unit.name: i for i, unit in enumerate(self.setup.transport_units)}
+
+        # Vectorized fleet state for tick mode; the dicts above stay the source of truth for tasks
+        self.fleet: Optional[FleetArrays] = None
+        if self.setup.vectorized_fleet and not self.event_driven:
+            self.fleet = FleetArrays(list(self.transport_units_status))
+            for unit_name, unit_status in self.transport_units_status.items():
+                self.fleet.set_idle(unit_name, unit_status["current_location"])
+
+        # Idle pool, so dispatch finds idle units without scanning every unit.
+        # A unit is added when it becomes idle and taken when assigned.
+        self._idle_units = IdleUnitPool(self._unit_order)
+        for unit_name, unit_status in self.transport_units_status.items():
+            self._idle_units.add(unit_name, unit_status["current_location"])
         
         # If a production engine is present, this is an integrated run.
         # Ignore pre-set tasks and rely solely on dynamic requests.
         self.integrated_mode = production_engine is not None
         if self.integrated_mode:
-            self.available_tasks: Deque[TransportTask] = deque()
+            self.available_tasks = DispatchQueue()
             self._log("Integrated mode: Ignoring pre-set tasks. Waiting for dynamic requests.")
         else:
-            self.available_tasks: Deque[TransportTask] = deque(self.setup.tasks)
+            self.available_tasks = DispatchQueue(self.setup.tasks)
+            for task in self.setup.tasks:
+                task.created_at = self.current_time
 
         self._log("Logistics Simulation Initialized.")
 
@@ -93,15 +141,66 @@ class LogisticsSimulationEngine:
         time_str = f"{int(self.current_time // 3600):02d}:{int((self.current_time % 3600) // 60):02d}:{int(self.current_time % 60):02d}"
         self.event_log.append(f"[{time_str}] {message}")
 
+    def _build_distance_matrix(self, location_distances: List[LocationDistance], master_locations: List[MasterLocation]):
+        """
+        Loads the origin/destination distances into NumPy matrices indexed by location name, so a leg
+        is an O(1) lookup. A missing reverse direction is taken to be symmetric; unknown legs are NaN.
+        """
+        names = [loc.name for loc in self.setup.locations] + [loc.name for loc in master_locations]
+        for entry in location_distances:
+            names.extend([entry.from_location, entry.to_location])
+        self._location_index: Dict[str, int] = {}
+        for name in names:
+            self._location_index.setdefault(name, len(self._location_index))
+
+        size = len(self._location_index)
+        self.distance_matrix = np.full((size, size), np.nan)
+        self.travel_time_matrix = np.full((size, size), np.nan)
+        np.fill_diagonal(self.distance_matrix, 0.0)
+        np.fill_diagonal(self.travel_time_matrix, 0.0)
+
+        explicit = set()
+        for entry in location_distances:
+            i, j = self._location_index[entry.from_location], self._location_index[entry.to_location]
+            self.distance_matrix[i, j] = entry.distance
+            self.travel_time_matrix[i, j] = entry.travel_time
+            explicit.add((i, j))
+        for i, j in explicit:
+            if (j, i) not in explicit:
+                self.distance_matrix[j, i] = self.distance_matrix[i, j]
+                self.travel_time_matrix[j, i] = self.travel_time_matrix[i, j]
+        if location_distances:
+            log.info(f"Loaded {len(location_distances)} location distances for {size} locations")
+
+    def _lookup_leg(self, from_location: str, to_location: str) -> Optional[Tuple[float, float]]:
+        """(distance, travel time) from the matrix, or None if the leg is unknown."""
+        i = self._location_index.get(from_location)
+        j = self._location_index.get(to_location)
+        if i is None or j is None:
+            return (0.0, 0.0) if from_location == to_location else None
+        travel_time = self.travel_time_matrix[i, j]
+        if np.isnan(travel_time):
+            return None
+        return float(self.distance_matrix[i, j]), float(travel_time)
+
     def find_initial_location(self, unit_name: str) -> str:
         # A reasonable default: start at the first location defined.
         return self.setup.locations[0].name if self.setup.locations else "Unknown"
 
+    def _lot_size(self, material: str) -> int:
+        """Pieces per lot: the MRP rounding value, or 1 if the material has none."""
+        rounding_value = self.mrp_data.get(material, {}).get('rounding_value', 0)
+        return max(1, int(rounding_value or 0))
+
     def _process_material_requests(self):
         """Processes pending material requests from production and creates transport tasks.
-        Uses batch processing to limit requests per step for performance."""
+        Uses batch processing to limit requests per step for performance.
+        Requests are rounded up to whole MRP lots and consolidated per (origin, destination, process),
+        then packed into trips of the largest unit capacity."""
         processed_requests = 0
         batch_limit = min(self.batch_size_requests, len(self.material_request_queue))
+        # (origin, destination, process) -> {"lots": {material: lots}, "parent_part": ..., "score": ...}
+        consolidated: Dict[tuple, Dict] = {}
 
         for i in range(batch_limit):
             try:
@@ -111,10 +210,11 @@ class LogisticsSimulationEngine:
                 full_destination = request.get('destination')
                 parent_part = request.get('parent_part')
 
-                print(f"DEBUG: Processing material request: {request}")
+                if log.debug_enabled:
+                    log.debug(f"Processing material request: {request}")
                 if not all([material, quantity_needed, full_destination]):
                     self._log(f"Invalid material request: {request}")
-                    print(f"Invalid material request: {request}")
+                    log.warning(f"Invalid material request: {request}")
                     continue
 
                 # Parse destination into location and process
@@ -136,39 +236,188 @@ class LogisticsSimulationEngine:
                 origin = self.mrp_data.get(material, {}).get('issue_location', 'WAREHOUSE')
                 if not origin:
                     origin = 'WAREHOUSE'
-                print(f"DEBUG: Origin for {material}: {origin}, Destination: {destination_location_name}")
-
-                # Create tasks, now with correct destination and target_process
-                unit_names = list(self.transport_units_map.keys())
-                # Ensure quantity_needed is an integer
-                for _ in range(int(quantity_needed)):
-                    new_task = TransportTask(
-                        material=material,
-                        lots_required=1,
-                        parent_part=parent_part,
-                        origin=origin,
-                        destination=destination_location_name,
-                        target_process=process_name,
-                        transport_unit_names=unit_names,
-                        loading_time=30,
-                        travel_time=120,
-                        unloading_time=30,
-                        return_time=120,
-                        distance=500 # Default distance
-                    )
-                    self.available_tasks.append(new_task)
-                    processed_requests += 1
-                    self._log(f"Processed request: Deliver 1 lot of {material} to {destination_location_name} (Process: {process_name})")
-                    print(f"DEBUG: Created task for {material} to {destination_location_name}")
+                if log.debug_enabled:
+                    log.debug(f"Origin for {material}: {origin}, Destination: {destination_location_name}")
+
+                lots = math.ceil(int(quantity_needed) / self._lot_size(material))
+                group = consolidated.setdefault((origin, destination_location_name, process_name), {"lots": {}, "parent_part": parent_part, "score": NO_PRIORITY})
+                group["lots"][material] = group["lots"].get(material, 0) + lots
+                group["score"] = min(group["score"], self.dispatch_policy.score(self, line_name, process_name, request.get('priority')))
+                processed_requests += 1
+                self._log(f"Processed request: Deliver {lots} lot(s) of {material} to {destination_location_name} (Process: {process_name})")
             except Exception as e:
                 self._log(f"Error processing material request: {e}")
-                print(f"DEBUG: Error processing request: {e}")
+                if log.debug_enabled:
+                    log.debug(f"Error processing request: {e}")
+
+        tow_trains = [unit for unit in self.setup.transport_units if unit.num_sub_units > 1]
+        if self.setup.milk_run_enabled and tow_trains:
+            self._plan_milk_runs(consolidated, tow_trains)
+        else:
+            for (origin, destination, process_name), group in consolidated.items():
+                for trip_load in self._pack_trips(group["lots"]):
+                    self._create_trip_task(origin, destination, process_name, group["parent_part"], trip_load, group["score"])
 
         if processed_requests > 0:
-            print(f"Logistics: Processed {processed_requests} material requests this step")
+            step_log.info(f"Logistics: Processed {processed_requests} material requests this step")
             self._log(f"Total material requests processed this step: {processed_requests}")
             self.performance_metrics["total_requests_processed"] += processed_requests
 
+    def _pack_trips(self, lots_by_material: Dict[str, int]) -> List[Dict[str, int]]:
+        """Packs lots into trips of the largest unit capacity; a trip may carry several materials."""
+        trip_capacity = max(unit.total_capacity for unit in self.setup.transport_units)
+        trips, current_trip, space = [], {}, trip_capacity
+        for material, lots in lots_by_material.items():
+            while lots > 0:
+                take = min(lots, space)
+                current_trip[material] = current_trip.get(material, 0) + take
+                lots -= take
+                space -= take
+                if space == 0:
+                    trips.append(current_trip)
+                    current_trip, space = {}, trip_capacity
+        if current_trip:
+            trips.append(current_trip)
+        return trips
+
+    def priority_score(self, line_name: Optional[str], process_name: Optional[str], priority: Optional[str]) -> DispatchScore:
+        """
+        Dispatch score of a request for the configured dispatch_priority; lower goes first.
+        'starvation' uses the time at which the destination process runs out of material,
+        'takt' the takt time of the destination line. Without a production engine that can
+        tell, or for a destination it does not know, the request is ordered last.
+        """
+        mode = self.setup.dispatch_priority
+        if mode == "fifo":
+            return NO_PRIORITY
+        tier = 0 if priority == "high" else 1
+        if mode == "starvation":
+            return (tier, self.due_time(line_name, process_name))
+        if mode == "takt" and hasattr(self.production_engine, "line_takt_time"):
+            return (tier, self.production_engine.line_takt_time(line_name))
+        return (tier, math.inf)
+
+    def due_time(self, line_name: Optional[str], process_name: Optional[str]) -> float:
+        """Simulation time at which the destination process runs out of material (inf if unknown)."""
+        if not hasattr(self.production_engine, "time_to_starvation"):
+            return math.inf
+        return self.current_time + self.production_engine.time_to_starvation(line_name, process_name)
+
+    def approach_leg(self, from_location: str, task: TransportTask) -> Tuple[float, float]:
+        """
+        (distance, travel time) of the empty drive from a location to a task's origin; an unknown
+        leg takes the task's own distance and travel time. Both the dispatch policies and the
+        traveling_to_origin phase use it, so units are ranked by the drive they actually make.
+        """
+        return self._lookup_leg(from_location, task.origin) or (task.distance, task.travel_time)
+
+    def time_to_origin(self, unit_name: str, task: TransportTask) -> float:
+        """Empty drive time of a unit to a task's origin."""
+        return self.approach_leg(self.transport_units_status[unit_name]["current_location"], task)[1]
+
+    def _create_trip_task(self, origin: str, destination: str, process_name: Optional[str], parent_part: Optional[str], load: Dict[str, int], score: DispatchScore = NO_PRIORITY):
+        distance, travel_time = self._leg(origin, destination)
+        return_time = self._leg(destination, origin)[1]
+        new_task = TransportTask(
+            material=next(iter(load)),
+            lots_required=sum(load.values()),
+            load=load,
+            parent_part=parent_part,
+            origin=origin,
+            destination=destination,
+            target_process=process_name,
+            transport_unit_names=list(self.transport_units_map.keys()),
+            loading_time=30,
+            # Task times must be positive; origin and destination can be the same location
+            travel_time=travel_time or 1,
+            unloading_time=30,
+            return_time=return_time or 1,
+            distance=distance or 1
+        )
+        new_task.created_at = self.current_time
+        self.available_tasks.push(new_task, score)
+        if log.debug_enabled:
+            log.debug(f"Created trip to {destination} with {load}")
+
+    def _leg(self, from_location: str, to_location: str) -> Tuple[float, float]:
+        """(distance, travel time) between two locations, falling back to the default leg if unknown."""
+        return self._lookup_leg(from_location, to_location) or (DEFAULT_LEG_DISTANCE, DEFAULT_LEG_TRAVEL_TIME)
+
+    def _plan_milk_runs(self, consolidated: Dict[tuple, Dict], tow_trains: List[TransportUnit]):
+        """Turns consolidated demand into multi-drop tours per issue location, served by tow trains only."""
+        demands_by_origin: Dict[str, Dict] = {}
+        for (origin, destination, process_name), group in consolidated.items():
+            demands_by_origin.setdefault(origin, {})[(destination, process_name)] = group["lots"]
+
+        # Size tours so that any tow train can take them: one stop per wagon
+        capacity = min(unit.total_capacity for unit in tow_trains)
+        max_stops = min(unit.num_sub_units for unit in tow_trains)
+        for origin, demands in demands_by_origin.items():
+            tours = plan_milk_runs(origin, demands, capacity, max_stops, self._leg, [unit.name for unit in tow_trains])
+            for tour in tours:
+                # A tour is as urgent as its most urgent stop
+                score = min(consolidated[(origin, drop.destination, drop.target_process)]["score"] for drop in tour.drops)
+                tour.created_at = self.current_time
+                self.available_tasks.push(tour, score)
+            if log.debug_enabled:
+                log.debug(f"Planned {len(tours)} milk-run tours from {origin} over {len(demands)} stops")
+
+    def _mark_idle(self, unit_name: str, unit_status: Dict):
+        unit_status["status"] = "idle"
+        self._idle_units.add(unit_name, unit_status["current_location"])
+        if self.fleet is not None:
+            self.fleet.set_idle(unit_name, unit_status["current_location"])
+
+    def _split_task_for_unit(self, task: TransportTask, unit: TransportUnit):
+        """
+        Returns (trip, remainder): the part of a consolidated task the unit can carry and what is left
+        for another unit (None if the unit takes everything). Pre-set tasks without a load are not split.
+        """
+        if not task.load or task.drops or task.lots_required <= unit.total_capacity:
+            return task, None
+        space = unit.total_capacity
+        taken, left = {}, {}
+        for material, lots in task.load.items():
+            take = min(lots, space)
+            space -= take
+            if take:
+                taken[material] = take
+            if lots > take:
+                left[material] = lots - take
+        trip = task.copy(update={"load": taken, "lots_required": sum(taken.values()), "material": next(iter(taken))})
+        remainder = task.copy(update={"load": left, "lots_required": sum(left.values()), "material": next(iter(left))})
+        return trip, remainder
+
+    def _assign_task(self, unit_name: str, task: TransportTask):
+        if log.debug_enabled:
+            log.debug(f"Assigning task {task.material} to unit {unit_name}")
+        self.in_progress_tasks[id(task)] = task
+        task.current_load_in_lots = task.lots_required
+        task.assigned_at = self.current_time
+
+        unit_status = self.transport_units_status[unit_name]
+        unit_status["current_task"] = task
+        unit_status["busy_since"] = self.current_time
+        # Check if unit is at origin location before loading
+        if unit_status["current_location"] == task.origin:
+            self._start_phase(unit_name, unit_status, "loading", task.loading_time, assigned_this_step=True)
+            self._log(f"Unit {unit_name} assigned to task for {task.material}. Starts loading at {task.origin}.")
+            if log.debug_enabled:
+                log.debug(f"Unit {unit_name} starts loading at {task.origin}")
+        else:
+            # If not at origin, set status to traveling_to_origin first
+            distance, travel_time = self.approach_leg(unit_status["current_location"], task)
+            self._start_phase(unit_name, unit_status, "traveling_to_origin", travel_time, assigned_this_step=True, distance=distance)
+            self._log(f"Unit {unit_name} traveling to origin {task.origin} before loading {task.material}.")
+            if log.debug_enabled:
+                log.debug(f"Unit {unit_name} traveling to origin {task.origin}")
+
+        if task.load:
+            # Consolidated trips carry whole MRP lots; production receives pieces
+            unit_status["current_load_carried_by_unit"] = {material: lots * self._lot_size(material) for material, lots in task.load.items()}
+        else:
+            unit_status["current_load_carried_by_unit"] = {task.material: task.lots_required}
+
     def is_in_shift(self):
         if not self.setup.shifts:
             return True
@@ -181,13 +430,22 @@ class LogisticsSimulationEngine:
         # This logic remains the same
         pass
 
-    def run_step(self):
-        import time
-        step_start = time.time()
-
+    def run_step(self, until: Optional[int] = None):
+        """
+        Runs one step. In event-driven mode the clock jumps to the next event but never past
+        until, the time the caller (e.g. the production clock in a lockstep run) has reached.
+        """
         if self.is_paused:
             return
 
+        self.step_timer.start_step()
+        try:
+            self._run_step(until)
+        finally:
+            self.step_timer.end_step()
+            self.performance_metrics["average_processing_time"] = self.step_timer.mean_step_time
+
+    def _run_step(self, until: Optional[int] = None):
         if self.current_time >= self.setup.workday_end_time and not self.in_progress_tasks:
             if self.status != "finished":
                 self._log("Workday finished and all tasks are complete. Logistics simulation ending.")
@@ -196,141 +454,291 @@ class LogisticsSimulationEngine:
             return
 
         self.status = "running"
-        self.current_time += 1
+        if self.event_driven:
+            self.current_time = self._next_event_time(until)
+        else:
+            self.current_time += 1
 
         # Process new material requests from the production line
         self._process_material_requests()
+        self.step_timer.mark("requests")
 
         if not self.is_in_shift():
             # ... (shift logic remains the same)
+            if self.event_driven and self._off_shift_since is None:
+                self._off_shift_since = self.current_time
             return
 
+        if self.event_driven and self._off_shift_since is not None:
+            # Units are frozen while off shift, so every pending transition slides by the break length
+            self._postpone_phase_events(self.current_time - self._off_shift_since)
+            self._off_shift_since = None
+
         self.check_scheduled_events()
 
-        # Refactored Task Assignment Logic
-        idle_units = [name for name, status in self.transport_units_status.items() if status["status"] == "idle"]
-        print(f"DEBUG: Idle units: {idle_units}")
-        print(f"DEBUG: Available tasks: {len(self.available_tasks)}")
+        # Task assignment: pop tasks from the front of the queue and let the dispatch policy pick
+        # an idle unit from the pool, so the cost scales with the number of assignments rather than the backlog
+        if log.debug_enabled:
+            log.debug(f"Idle units: {len(self._idle_units)}")
+        if log.debug_enabled:
+            log.debug(f"Available tasks: {len(self.available_tasks)}")
         assigned_count = 0
 
-        if idle_units and self.available_tasks:
-            tasks_to_assign = list(self.available_tasks)
-            print(f"DEBUG: Tasks to assign: {len(tasks_to_assign)}")
-
-            for task in tasks_to_assign:
-                if not idle_units:
-                    break  # No more idle units
-
-                # Assign the task to the next available idle unit
-                unit_name = idle_units.pop(0)
-                print(f"DEBUG: Assigning task {task.material} to unit {unit_name}")
-
-                self.in_progress_tasks[id(task)] = task
-                self.available_tasks.remove(task)
-
-                unit_status = self.transport_units_status[unit_name]
-                unit_status["current_task"] = task
-                # Check if unit is at origin location before loading
-                if unit_status["current_location"] == task.origin:
-                    unit_status["status"] = "loading"
-                    unit_status["progress"] = 0
-                    self._log(f"Unit {unit_name} assigned to task for {task.material}. Starts loading at {task.origin}.")
-                    print(f"DEBUG: Unit {unit_name} starts loading at {task.origin}")
-                else:
-                    # If not at origin, set status to traveling_to_origin first
-                    unit_status["status"] = "traveling_to_origin"
-                    unit_status["progress"] = 0
-                    self._log(f"Unit {unit_name} traveling to origin {task.origin} before loading {task.material}.")
-                    print(f"DEBUG: Unit {unit_name} traveling to origin {task.origin}")
-
-                unit_status["current_load_carried_by_unit"] = {task.material: task.lots_required}
-
-                assigned_count += 1
+        while self._idle_units and self.available_tasks:
+            queued_task = self.available_tasks.peek()
+            unit_name = self.dispatch_policy.select_unit(self, queued_task, self._idle_units)
+            if unit_name is None:
+                break  # The head of the queue is a milk run and no tow train is idle
+            self._idle_units.take(unit_name)
+
+            # A consolidated trip larger than the unit's capacity is split; the remainder
+            # stays at the head of the queue for the next idle unit
+            task, remaining = self._split_task_for_unit(queued_task, self.transport_units_map[unit_name])
+            self._assign_task(unit_name, task)
+            assigned_count += 1
+            if remaining is None:
+                self.available_tasks.popleft()
+            else:
+                self.available_tasks.replace_head(remaining)
 
         if assigned_count > 0:
-            print(f"Logistics: Assigned {assigned_count} transport units to tasks this step")
+            step_log.info(f"Logistics: Assigned {assigned_count} transport units to tasks this step")
             self._log(f"Assigned {assigned_count} transport units to tasks this step")
 
         # Update performance metrics per step
-        concurrent_units = len([u for u in self.transport_units_status.values() if u["status"] not in ["idle", "off_shift"]])
+        concurrent_units = len(self.transport_units_status) - len(self._idle_units)
         self.performance_metrics["peak_concurrent_units"] = max(self.performance_metrics["peak_concurrent_units"], concurrent_units)
-
-        # Calculate step processing time
-        step_time = time.time() - step_start
-        self.performance_metrics["step_processing_times"].append(step_time)
-        if len(self.performance_metrics["step_processing_times"]) > 100:  # Keep last 100
-            self.performance_metrics["step_processing_times"].pop(0)
-        self.performance_metrics["average_processing_time"] = sum(self.performance_metrics["step_processing_times"]) / len(self.performance_metrics["step_processing_times"])
+        self.step_timer.mark("dispatch")
 
         # Unit state progression logic
+        if self.event_driven:
+            self._process_due_phase_events()
+        elif self.fleet is not None:
+            self._advance_fleet_arrays()
+        else:
+            self._advance_units()
+        self.step_timer.mark("progression")
+
+    def _advance_units(self):
+        """Tick-mode progression: one second of progress for every unit in a task phase."""
         for unit_name, unit_status in self.transport_units_status.items():
             if unit_status["status"] in ["idle", "off_shift", "event", "abnormal"]:
                 continue
 
             task = unit_status.get("current_task")
             if not task:
-                unit_status["status"] = "idle"
+                self._mark_idle(unit_name, unit_status)
                 continue
 
             unit_status["progress"] += 1
             
             try:
-                if unit_status["status"] == "traveling_to_origin" and unit_status["progress"] >= task.travel_time:
-                    unit_status["status"] = "loading"
-                    unit_status["progress"] = 0
-                    self._log(f"Unit {unit_name} arrived at origin {task.origin} and starts loading {task.material}.")
-
-                elif unit_status["status"] == "loading" and unit_status["progress"] >= task.loading_time:
-                    unit_status["status"] = "traveling"
-                    unit_status["progress"] = 0
-                    self._log(f"Unit {unit_name} traveling to {task.destination} with {task.material}.")
-                
-                elif unit_status["status"] == "traveling" and unit_status["progress"] >= task.travel_time:
-                    unit_status["status"] = "unloading"
-                    unit_status["current_location"] = task.destination
-                    unit_status["progress"] = 0
-                    self._log(f"Unit {unit_name} arrived at {task.destination}.")
-
-                elif unit_status["status"] == "unloading" and unit_status["progress"] >= task.unloading_time:
-                    # *** KEY INTEGRATION POINT: Add stock to the production process ***
-                    if self.production_engine:
-                        for material, qty in unit_status["current_load_carried_by_unit"].items():
-                            master_location_name = task.destination
-                            target_process = task.target_process
-                            final_destination = None
-
-                            if master_location_name in self.location_to_lines_map and target_process:
-                                lines_at_location = self.location_to_lines_map[master_location_name]
-                                for line_name in lines_at_location:
-                                    if self.production_engine.has_process(line_name, target_process):
-                                        final_destination = f"{line_name}:{target_process}"
-                                        break
-
-                            if final_destination:
-                                self.production_engine.add_stock(destination=final_destination, material=material, quantity=qty)
-                                self._log(f"Delivered {qty} of {material} to destination {final_destination}.")
-                            else:
-                                # Fallback to old behavior if no suitable line/process is found
-                                self.production_engine.add_stock(destination=task.destination, material=material, quantity=qty)
-                                self._log(f"Warning: Could not find a matching line and process for destination {master_location_name} and process {target_process}. Delivering to {task.destination}.")
-                    
-                    unit_status["current_load_carried_by_unit"] = {}
-                    unit_status["status"] = "returning"
-                    unit_status["progress"] = 0
-                    self._log(f"Unit {unit_name} returning to {task.origin}.")
-
-                elif unit_status["status"] == "returning" and unit_status["progress"] >= task.return_time:
-                    unit_status["status"] = "idle"
-                    unit_status["current_task"] = None
-                    unit_status["current_location"] = task.origin
-                    self.completed_tasks_per_unit[unit_name] += 1
-                    self.completed_tasks.append(task)
-                    self.completed_tasks_count += 1
-                    del self.in_progress_tasks[id(task)]
-                    self._log(f"Unit {unit_name} is now idle.")
+                if unit_status["progress"] >= unit_status["phase_duration"]:
+                    self._complete_phase(unit_name, unit_status, task)
             except Exception as e:
                 self._log(f"Error processing unit {unit_name} task progression: {e}")
-                    
+
+    def _advance_fleet_arrays(self):
+        """Tick-mode progression on the vectorized fleet: only units whose phase ends are handled in Python."""
+        for i in self.fleet.advance():
+            unit_name = self.fleet.unit_names[i]
+            unit_status = self.transport_units_status[unit_name]
+            task = unit_status.get("current_task")
+            if not task:
+                self._mark_idle(unit_name, unit_status)
+                continue
+            try:
+                self._complete_phase(unit_name, unit_status, task)
+            except Exception as e:
+                self._log(f"Error processing unit {unit_name} task progression: {e}")
+
+    def _start_phase(self, unit_name: str, unit_status: Dict, status: str, duration: float, assigned_this_step: bool = False, distance: float = 0):
+        """Puts a unit into a new task phase. In event-driven mode the phase end is scheduled here.
+        A phase started at assignment already gets its first second of progress in the same step.
+        distance is the length of the leg driven in a moving phase, counted when the phase completes."""
+        unit_status["status"] = status
+        unit_status["leg_distance"] = distance
+        unit_status["progress"] = 0
+        unit_status["phase_duration"] = duration
+        unit_status["phase_started_at"] = self.current_time
+        if self.fleet is not None:
+            self.fleet.set_phase(unit_name, status, duration, unit_status["current_location"])
+
+        if self.event_driven:
+            phase_end = self.current_time + max(1, math.ceil(duration))
+            if assigned_this_step:
+                phase_end -= 1
+            unit_status["phase_id"] += 1
+            heapq.heappush(self._phase_events, (phase_end, self._unit_order[unit_name], unit_status["phase_id"], unit_name))
+
+    def _complete_phase(self, unit_name: str, unit_status: Dict, task: TransportTask):
+        """Finishes the unit's current phase and moves it on to the next one."""
+        if unit_status["status"] in ("traveling_to_origin", "traveling", "returning"):
+            self.performance_metrics["total_distance_traveled"] += unit_status["leg_distance"]
+
+        if unit_status["status"] == "traveling_to_origin":
+            self.performance_metrics["empty_distance_traveled"] += unit_status["leg_distance"]
+            unit_status["current_location"] = task.origin
+            self._start_phase(unit_name, unit_status, "loading", task.loading_time)
+            self._log(f"Unit {unit_name} arrived at origin {task.origin} and starts loading {task.material}.")
+
+        elif unit_status["status"] == "loading":
+            unit_status["stop_index"] = 0
+            if task.drops:
+                first_drop = task.drops[0]
+                self._start_phase(unit_name, unit_status, "traveling", first_drop.travel_time, distance=first_drop.distance)
+                self._log(f"Unit {unit_name} starts milk run with {len(task.drops)} stops, first stop {first_drop.destination}.")
+            else:
+                self._start_phase(unit_name, unit_status, "traveling", task.travel_time, distance=task.distance)
+                self._log(f"Unit {unit_name} traveling to {task.destination} with {task.material}.")
+        
+        elif unit_status["status"] == "traveling":
+            if task.drops:
+                drop = task.drops[unit_status["stop_index"]]
+                unit_status["current_location"] = drop.destination
+                self._start_phase(unit_name, unit_status, "unloading", drop.unloading_time)
+                self._log(f"Unit {unit_name} arrived at stop {unit_status['stop_index'] + 1}/{len(task.drops)}: {drop.destination}.")
+            else:
+                unit_status["current_location"] = task.destination
+                self._start_phase(unit_name, unit_status, "unloading", task.unloading_time)
+                self._log(f"Unit {unit_name} arrived at {task.destination}.")
+
+        elif unit_status["status"] == "unloading":
+            if task.drops:
+                drop = task.drops[unit_status["stop_index"]]
+                drop_load = {material: lots * self._lot_size(material) for material, lots in drop.load.items()}
+                self._deliver(drop.destination, drop.target_process, drop_load)
+                carried = unit_status["current_load_carried_by_unit"]
+                for material, qty in drop_load.items():
+                    carried[material] = carried.get(material, 0) - qty
+                    if carried[material] <= 0:
+                        del carried[material]
+
+                if unit_status["stop_index"] + 1 < len(task.drops):
+                    unit_status["stop_index"] += 1
+                    next_drop = task.drops[unit_status["stop_index"]]
+                    self._start_phase(unit_name, unit_status, "traveling", next_drop.travel_time, distance=next_drop.distance)
+                    self._log(f"Unit {unit_name} traveling to next stop {next_drop.destination}.")
+                    return
+            else:
+                self._deliver(task.destination, task.target_process, unit_status["current_load_carried_by_unit"])
+            
+            unit_status["current_load_carried_by_unit"] = {}
+            if task.drops:
+                # The tour distance includes the way back from the last stop
+                return_distance = task.distance - sum(drop.distance for drop in task.drops)
+            else:
+                leg = self._lookup_leg(task.destination, task.origin)
+                return_distance = leg[0] if leg else task.distance
+            self._start_phase(unit_name, unit_status, "returning", task.return_time, distance=max(0, return_distance))
+            self._log(f"Unit {unit_name} returning to {task.origin}.")
+
+        elif unit_status["status"] == "returning":
+            unit_status["current_task"] = None
+            unit_status["current_location"] = task.origin
+            self._mark_idle(unit_name, unit_status)
+            self.performance_metrics["busy_unit_seconds"] += self.current_time - unit_status["busy_since"]
+            unit_status["busy_since"] = None
+            self.completed_tasks_per_unit[unit_name] += 1
+            task.completed_at = self.current_time
+            self.completed_tasks.append(task)
+            self.completed_tasks_count += 1
+            del self.in_progress_tasks[id(task)]
+            self._log(f"Unit {unit_name} is now idle.")
+
+    def _deliver(self, master_location_name: str, target_process: Optional[str], load: Dict[str, int]):
+        """*** KEY INTEGRATION POINT: Add stock to the production process ***"""
+        if not self.production_engine:
+            return
+        for material, qty in load.items():
+            final_destination = None
+
+            if master_location_name in self.location_to_lines_map and target_process:
+                lines_at_location = self.location_to_lines_map[master_location_name]
+                for line_name in lines_at_location:
+                    if self.production_engine.has_process(line_name, target_process):
+                        final_destination = f"{line_name}:{target_process}"
+                        break
+
+            if final_destination:
+                self.production_engine.add_stock(destination=final_destination, material=material, quantity=qty)
+                self._log(f"Delivered {qty} of {material} to destination {final_destination}.")
+            else:
+                # Fallback to old behavior if no suitable line/process is found
+                self.production_engine.add_stock(destination=master_location_name, material=material, quantity=qty)
+                self._log(f"Warning: Could not find a matching line and process for destination {master_location_name} and process {target_process}. Delivering to {master_location_name}.")
+
+    def _next_event_time(self, until: Optional[int] = None) -> int:
+        """
+        Returns the time of the next step that can change anything in event-driven mode, at most
+        until. In integrated mode production can raise requests at any second, so without a
+        horizon from the caller the clock does not skip ahead at all.
+        """
+        next_step = self.current_time + 1
+        if self.material_request_queue:
+            return next_step
+        if self.integrated_mode and until is None:
+            return next_step
+
+        candidates = []
+        if self._off_shift_since is None:
+            if self._phase_events:
+                candidates.append(self._phase_events[0][0])
+            if self.available_tasks and self._idle_units:
+                candidates.append(next_step)
+        for shift in self.setup.shifts:
+            candidates.extend(t for t in (shift.start_time, shift.end_time) if t > self.current_time)
+        if self.current_time < self.setup.workday_end_time:
+            candidates.append(self.setup.workday_end_time)
+        if until is not None:
+            candidates.append(int(until))
+
+        if not candidates:
+            return next_step
+        return max(next_step, min(candidates))
+
+    def _postpone_phase_events(self, delay: int):
+        """
+        Shifts every scheduled phase end by delay seconds, and the start of the phases they end,
+        so the break does not count as progress.
+        """
+        if delay <= 0 or not self._phase_events:
+            return
+        self._phase_events = [(end + delay, order, phase_id, unit_name) for end, order, phase_id, unit_name in self._phase_events]
+        heapq.heapify(self._phase_events)
+        for _, _, phase_id, unit_name in self._phase_events:
+            unit_status = self.transport_units_status[unit_name]
+            if phase_id == unit_status["phase_id"]:
+                unit_status["phase_started_at"] += delay
+
+    def _process_due_phase_events(self):
+        """Completes every phase that ends at the current time, in unit order like tick mode."""
+        while self._phase_events and self._phase_events[0][0] <= self.current_time:
+            _, _, phase_id, unit_name = heapq.heappop(self._phase_events)
+            unit_status = self.transport_units_status[unit_name]
+            if phase_id != unit_status["phase_id"] or unit_status["status"] in ["idle", "off_shift", "event", "abnormal"]:
+                continue  # Superseded by a later phase
+
+            task = unit_status.get("current_task")
+            if not task:
+                self._mark_idle(unit_name, unit_status)
+                continue
+
+            try:
+                self._complete_phase(unit_name, unit_status, task)
+            except Exception as e:
+                self._log(f"Error processing unit {unit_name} task progression: {e}")
+
+    def _unit_progress(self, unit_status: Dict) -> float:
+        """Seconds spent in the current phase."""
+        if self.event_driven and unit_status["status"] not in ["idle", "off_shift"]:
+            # Units are frozen while off shift
+            now = self.current_time if self._off_shift_since is None else self._off_shift_since
+            return now - unit_status["phase_started_at"]
+        if self.fleet is not None:
+            return self.fleet.unit_progress(unit_status["name"])
+        return unit_status["progress"]
+
     def get_status(self):
         location_statuses = [{ "name": loc.name, "stock": dict(loc.stock) } for loc in self.locations.values()]
         
@@ -338,6 +746,7 @@ class LogisticsSimulationEngine:
         enhanced_transport_units = []
         for unit_name, unit_status in self.transport_units_status.items():
             enhanced_status = unit_status.copy()
+            enhanced_status["progress"] = self._unit_progress(unit_status)
             if unit_status.get("current_task"):
                 task = unit_status["current_task"]
                 enhanced_status["current_task"] = {
@@ -346,6 +755,9 @@ class LogisticsSimulationEngine:
                     "destination": task.destination,
                     "parent_part": task.parent_part,
                     "lots_required": task.lots_required,
+                    "load": task.load,
+                    "drops": [drop.destination for drop in task.drops],
+                    "stop_index": unit_status["stop_index"],
                     "progress_percentage": self._calculate_task_progress(unit_status)
                 }
             enhanced_transport_units.append(enhanced_status)
@@ -363,11 +775,12 @@ class LogisticsSimulationEngine:
             "remaining_tasks_count": len(self.available_tasks),
             "in_progress_tasks_count": len(self.in_progress_tasks),
             "completed_tasks_per_unit": self.completed_tasks_per_unit,
+            "utilization": self.get_utilization(),
             "event_log": list(self.event_log),
             "material_requests_pending": len(self.material_request_queue),
             "mrp_data_loaded": len(self.mrp_data) > 0,
             "mrp_materials_count": len(self.mrp_data),
-            "performance_metrics": self.performance_metrics
+            "performance_metrics": {**self.performance_metrics, "step_timing": self.step_timer.summary()}
         }
     
     def _calculate_task_progress(self, unit_status):
@@ -376,21 +789,11 @@ class LogisticsSimulationEngine:
         if not task:
             return 0
 
-        status = unit_status["status"]
-        progress = unit_status["progress"]
-
-        if status == "traveling_to_origin":
-            return min(100, (progress / task.travel_time) * 100)
-        elif status == "loading":
-            return min(100, (progress / task.loading_time) * 100)
-        elif status == "traveling":
-            return min(100, (progress / task.travel_time) * 100)
-        elif status == "unloading":
-            return min(100, (progress / task.unloading_time) * 100)
-        elif status == "returning":
-            return min(100, (progress / task.return_time) * 100)
-        else:
+        if unit_status["status"] not in ["traveling_to_origin", "loading", "traveling", "unloading", "returning"]:
             return 0
+        if unit_status["phase_duration"] <= 0:
+            return 100
+        return min(100, (self._unit_progress(unit_status) / unit_status["phase_duration"]) * 100)
 
     def pause_simulation(self):
         """Pause the simulation."""
@@ -407,6 +810,23 @@ class LogisticsSimulationEngine:
         self.simulation_speed = max(0.1, min(10.0, speed))  # Clamp between 0.1 and 10.0
         self._log(f"Simulation speed set to {self.simulation_speed}")
 
+    def get_utilization(self) -> float:
+        """Share of the fleet's elapsed unit-seconds spent on tasks (assignment until back idle)."""
+        elapsed = self.current_time - self.setup.workday_start_time
+        if elapsed <= 0 or not self.transport_units_status:
+            return 0.0
+        busy = self.performance_metrics["busy_unit_seconds"] + sum(
+            self.current_time - unit_status["busy_since"]
+            for unit_status in self.transport_units_status.values()
+            if unit_status["busy_since"] is not None
+        )
+        return busy / (elapsed * len(self.transport_units_status))
+
+    def get_average_lead_time(self) -> float:
+        """Mean time from queuing a task to its unit being idle again, over completed tasks."""
+        lead_times = [task.completed_at - task.created_at for task in self.completed_tasks if task.created_at is not None]
+        return sum(lead_times) / len(lead_times) if lead_times else 0.0
+
     def _calculate_final_metrics(self):
         """Calculate final performance metrics when simulation ends."""
         total_time = self.current_time - self.setup.workday_start_time
@@ -421,4 +841,5 @@ class LogisticsSimulationEngine:
             self.performance_metrics["average_queue_time"] = (
                 total_time / self.performance_metrics["total_requests_processed"]
             )
+        self.performance_metrics["average_lead_time"] = self.get_average_lead_time()
         self._log(f"Final performance metrics: {self.performance_metrics}")
@@ -12,7 +12,8 @@ from typing import List, Optional, Dict, Deque
 from collections import deque, defaultdict
 from datetime import datetime
 
-from fastapi import FastAPI, Depends, HTTPException, status, APIRouter, UploadFile, File, Request, BackgroundTasks
+from fastapi import FastAPI, Depends, HTTPException, status, APIRouter, UploadFile, File, Request, BackgroundTasks, WebSocket, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, validator, ValidationError
 from sqlalchemy.orm import Session
 from starlette.middleware.cors import CORSMiddleware
@@ -26,16 +27,22 @@ from models import (
     SavedProductionSetupInfo, SavedProductionSetupFull, SavedLogisticsSetupCreate,
     SavedLogisticsSetupInfo, SavedLogisticsSetupFull, MasterLocation, Location, ProcessConfig, 
     MasterLocationCreate, MasterTransportUnit, MasterTransportUnitCreate, 
-    MasterProcessTemplate, MasterProcessTemplateCreate, OldSimulationSetup
+    MasterProcessTemplate, MasterProcessTemplateCreate, OldSimulationSetup, ReplicationRequest,
+    MasterLocationDistance, MasterLocationDistanceCreate
 )
 from simulation import SimulationEngine
 from logistics_simulation import LogisticsSimulationEngine
-from production_engine_v2 import ProductionEngineV2
+from production_engine_v2 import ProductionEngineV2, select_status_changes
+from replication import run_replications
+from status_stream import StatusBroadcaster
+from status_snapshot import SnapshotBuffer
+from status_projection import parse_sections, project_production_status, project_logistics_status
+from status_serializer import status_response
 from data_loader import load_bom, load_mrp_data, load_schedule
 from database import (
     create_db_and_tables, get_db, ProductionSimulationConfigDB, 
     LogisticsSimulationConfigDB, SimulationRunDB, MasterLocationDB, 
-    MasterTransportUnitDB, MasterProcessTemplateDB
+    MasterTransportUnitDB, MasterProcessTemplateDB, MasterLocationDistanceDB
 )
 
 load_dotenv()
@@ -134,6 +141,7 @@ class LogisticsSimulationManager:
         self.task: Optional[asyncio.Task] = None
         self.production_manager: Optional[ProductionSimulationManager] = None
         self.sync_status = {"is_running": False, "last_sync_time": None, "processed_requests": 0, "active_deliveries": 0, "sync_errors": 0}
+        self.status_stream = StatusBroadcaster("logistics")
 
     def set_production_manager(self, manager: ProductionSimulationManager):
         self.production_manager = manager
@@ -143,8 +151,10 @@ class LogisticsSimulationManager:
         if not self.production_manager or not self.production_manager.engine:
             raise HTTPException(status_code=400, detail="Production simulation must be running before starting logistics.")
         try:
-            self.engine = LogisticsSimulationEngine(setup=setup, material_request_queue=self.production_manager.material_request_queue, production_engine=self.production_manager.engine, mrp_file=CURRENT_MRP_FILE, master_locations=master_locations)
+            location_distances = db.query(MasterLocationDistanceDB).all()
+            self.engine = LogisticsSimulationEngine(setup=setup, material_request_queue=self.production_manager.material_request_queue, production_engine=self.production_manager.engine, mrp_file=CURRENT_MRP_FILE, master_locations=master_locations, location_distances=location_distances)
             self.sync_status["is_running"] = True
+            self.status_stream.reset()
             self.task = asyncio.create_task(self.run_background_simulation())
             return {"message": "Logistics simulation started."}
         except Exception as e:
@@ -155,7 +165,9 @@ class LogisticsSimulationManager:
         print("Starting logistics simulation...")
         while self.engine and self.engine.status != "finished":
             self.engine.run_step()
+            self.status_stream.publish_if_due(self.get_status)
             await asyncio.sleep(0)
+        self.status_stream.publish(self.get_status())
         print("Logistics simulation finished.")
 
     def get_status(self):
@@ -179,11 +191,17 @@ class LogisticsSimulationManager:
 class ProductionSimulationManagerV2:
     def __init__(self):
         self.engine: Optional[ProductionEngineV2] = None
+        self.status_stream = StatusBroadcaster("production")
+        # Status is built by the simulation loop between steps; requests only read the latest snapshot
+        self.snapshots = SnapshotBuffer()
+        # Held while the engine is swapped and while the loop publishes, so a replaced engine
+        # can never publish into the buffer of its successor
+        self._lock = threading.Lock()
 
     def setup_simulation(self, setup: SimulationSetup, schedule_file: str, bom_file: str):
         self.stop_simulation()
         try:
-            self.engine = ProductionEngineV2(
+            engine = ProductionEngineV2(
                 setup=setup,
                 schedule_file=schedule_file,
                 bom_file=bom_file,
@@ -192,24 +210,50 @@ class ProductionSimulationManagerV2:
         except Exception as e:
             logger.error(f"Error setting up production simulation V2: {e}", exc_info=True)
             raise HTTPException(status_code=400, detail=str(e))
+        with self._lock:
+            self.engine = engine
+            self.snapshots.publish(engine.get_status(), engine.status_versions())
+            self.status_stream.reset()
 
     def run_simulation_loop(self):
-        if not self.engine:
+        engine = self.engine
+        if not engine:
             print("ERROR: V2 simulation engine not setup. Cannot run.")
             return
         print("Starting production simulation V2 background task...")
-        while self.engine and self.engine.status != "finished":
-            self.engine.run_step()
+        # Stops when the engine finishes or is stopped/replaced by another request
+        while self.engine is engine and engine.status != "finished":
+            engine.run_step()
+            with self._lock:
+                if self.engine is not engine:
+                    break
+                self.snapshots.step_done(lambda: (engine.get_status(), engine.status_versions()))
+                self.status_stream.publish_if_due(self.get_status)
             time.sleep(0.1) # Prevent runaway clock when idle
+        with self._lock:
+            # Final frame of this engine (finished or stopped), unless a new run already took over
+            if self.engine is engine or self.engine is None:
+                self.status_stream.publish(engine.get_status())
         print("Production simulation V2 background task finished.")
 
-    def get_status(self):
-        if not self.engine or self.engine.status in ["finished", "stopped"]:
+    def get_status(self, since_version: Optional[int] = None):
+        """Latest snapshot published by the simulation loop, or the changes in it after since_version."""
+        engine = self.engine
+        if not engine or engine.status in ["finished", "stopped"]:
             return {"status": "stopped"}
-        return self.engine.get_status()
+        snapshot = self.snapshots.latest()
+        if snapshot is None:
+            return {"status": engine.status}
+        if since_version is None:
+            return snapshot.status
+        return select_status_changes(snapshot.status, snapshot.versions, since_version)
 
     def stop_simulation(self):
-        self.engine = None
+        with self._lock:
+            if self.engine:
+                self.engine.stop_simulation()
+            self.engine = None
+            self.snapshots.clear()
         return {"message": "Production simulation V2 stopped and cleared."}
 
 # --- Instantiate Managers ---
@@ -218,6 +262,12 @@ log_sim_manager = LogisticsSimulationManager()
 log_sim_manager.set_production_manager(prod_sim_manager)
 prod_sim_manager_v2 = ProductionSimulationManagerV2()
 
+# Status streams by channel, published from the simulation loops (see status_stream.py)
+STATUS_STREAMS = {
+    "production": prod_sim_manager_v2.status_stream,
+    "logistics": log_sim_manager.status_stream,
+}
+
 
 # --- Master Data Management Endpoints ---
 
@@ -270,6 +320,28 @@ def create_location(location: MasterLocationCreate, db: Session = Depends(get_db
     db.refresh(db_location)
     return db_location
 
+@app.get("/master/location-distances/", response_model=List[MasterLocationDistance])
+def get_all_location_distances(db: Session = Depends(get_db)):
+    distances = db.query(MasterLocationDistanceDB).all()
+    return [MasterLocationDistance.from_orm(d) for d in distances]
+
+@app.post("/master/location-distances/", response_model=MasterLocationDistance, status_code=status.HTTP_201_CREATED)
+def create_location_distance(location_distance: MasterLocationDistanceCreate, db: Session = Depends(get_db)):
+    # One entry per direction: posting an existing leg updates it
+    db_distance = db.query(MasterLocationDistanceDB).filter(
+        MasterLocationDistanceDB.from_location == location_distance.from_location,
+        MasterLocationDistanceDB.to_location == location_distance.to_location
+    ).first()
+    if db_distance:
+        for key, value in location_distance.dict().items():
+            setattr(db_distance, key, value)
+    else:
+        db_distance = MasterLocationDistanceDB(**location_distance.dict())
+        db.add(db_distance)
+    db.commit()
+    db.refresh(db_distance)
+    return db_distance
+
 @app.get("/master/transport-units/", response_model=List[MasterTransportUnit])
 def get_all_transport_units(db: Session = Depends(get_db)):
     units = db.query(MasterTransportUnitDB).all()
@@ -438,14 +510,102 @@ def run_production_simulation_v2(run_config: ProductionRunConfig, background_tas
         logger.error(f"Error processing /v2/production/run: {e}", exc_info=True)
         raise HTTPException(status_code=400, detail=f"An unexpected error occurred: {e}")
 
+def _parse_status_sections(include: Optional[str]):
+    try:
+        return parse_sections(include)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.get("/v2/production/status")
-def get_production_simulation_v2_status():
-    return prod_sim_manager_v2.get_status()
+def get_production_simulation_v2_status(request: Request, since_version: Optional[int] = None, include: Optional[str] = None, offset: int = Query(0, ge=0), limit: Optional[int] = Query(None, ge=1)):
+    """
+    Full status, or only what changed after since_version (the "version" of an earlier response).
+    include selects sections (lines, stock, child_parts; empty for the summary only);
+    offset/limit page through the lines. JSON by default; MessagePack and gzip on request.
+    """
+    sections = _parse_status_sections(include)
+    return status_response(project_production_status(prod_sim_manager_v2.get_status(since_version), sections, offset, limit), request)
+
+@app.get("/logistics/status")
+def get_logistics_simulation_status(request: Request, include: Optional[str] = None,
+                                    units_offset: int = Query(0, ge=0), units_limit: Optional[int] = Query(None, ge=1),
+                                    log_offset: int = Query(0, ge=0), log_limit: Optional[int] = Query(None, ge=1)):
+    """
+    Logistics status. include selects sections (units, event_log, stock; empty for the summary
+    only); units_offset/units_limit page through the transport units and log_offset/log_limit
+    through the event log. JSON by default; MessagePack and gzip on request.
+    """
+    sections = _parse_status_sections(include)
+    status = project_logistics_status(log_sim_manager.get_status(), sections, units_offset, units_limit, log_offset, log_limit)
+    return status_response(status, request)
+
+@app.get("/v2/production/status/stream")
+def stream_production_simulation_v2_status():
+    """Server-sent events with the production status, published by the simulation loop."""
+    return StreamingResponse(prod_sim_manager_v2.status_stream.sse_events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.get("/logistics/status/stream")
+def stream_logistics_simulation_status():
+    """Server-sent events with the logistics status, published by the simulation loop."""
+    return StreamingResponse(log_sim_manager.status_stream.sse_events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.websocket("/ws/status/{channel}")
+async def status_websocket(websocket: WebSocket, channel: str):
+    """
+    Same frames as the SSE streams, over a WebSocket as JSON text messages; channel is
+    "production" or "logistics". A receive task runs next to the send loop, so a client close
+    ends the subscription right away instead of at the next frame.
+    """
+    stream = STATUS_STREAMS.get(channel)
+    if stream is None:
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+
+    async def send_frames():
+        async for frame in stream.subscribe():
+            await websocket.send_text(frame.decode())
+
+    async def wait_for_close():
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    tasks = [asyncio.create_task(send_frames()), asyncio.create_task(wait_for_close())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Collects WebSocketDisconnect from a send to a client that is already gone
+        await asyncio.gather(*tasks, return_exceptions=True)
 
 @app.post("/v2/production/stop")
 def stop_production_simulation_v2():
     return prod_sim_manager_v2.stop_simulation()
 
+@app.post("/v2/production/replications")
+def run_production_replications(request: ReplicationRequest):
+    """Runs seeded Monte Carlo replications of a scenario and returns mean and CI per metric."""
+    if not os.path.exists(request.scenario.schedule_file):
+        raise HTTPException(status_code=404, detail=f"Schedule file not found: {request.scenario.schedule_file}")
+    if request.min_replications > request.max_replications:
+        raise HTTPException(status_code=400, detail="min_replications cannot exceed max_replications")
+    try:
+        return run_replications(
+            request.scenario,
+            max_replications=request.max_replications,
+            min_replications=request.min_replications,
+            confidence=request.confidence,
+            target_relative_half_width=request.target_relative_half_width,
+            target_metrics=request.target_metrics,
+            max_workers=request.max_workers,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error running replications: {e}", exc_info=True)
+        raise HTTPException(status_code=400, detail=f"An unexpected error occurred: {e}")
+
 # --- Original (V1) Endpoints ---
 @app.post("/production/run")
 def run_production_simulation(run_config: ProductionRunConfig):
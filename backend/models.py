@@ -20,6 +20,9 @@ class SimulationSetup(BaseModel):
         title="Line-specific Process Configurations",
         description="A dictionary mapping line names to their list of process configurations."
     )
+    event_driven: bool = Field(default=False, title="Event-driven Mode", description="Jump the clock from event to event (unit finish, takt release, shift boundary, material arrival) instead of ticking every second.")
+    seed: Optional[int] = Field(None, ge=0, title="Random Seed", description="Seed for the NG draws. Runs with the same seed are reproducible; empty means a fresh random seed.")
+    ignore_material_availability: bool = Field(default=False, title="Ignore Material Availability", description="Skip a unit whose materials are short instead of waiting for (and requesting) them.")
 
 class OldSimulationSetup(BaseModel):
     processes: List[ProcessConfig] = Field(..., min_items=1, title="Process List", description="The list of process configurations.")
@@ -41,12 +44,21 @@ class TransportUnit(BaseModel):
     def total_capacity(self) -> int:
         return self.num_sub_units * self.capacity_per_sub_unit
 
+class TransportDrop(BaseModel):
+    destination: str = Field(..., title="Drop Location", description="Location where this part of the load is unloaded.")
+    target_process: Optional[str] = Field(None, title="Target Process")
+    load: Dict[str, int] = Field(default_factory=dict, title="Load", description="Lots per material unloaded at this stop.")
+    travel_time: float = Field(..., ge=0, title="Leg Travel Time", description="Time in seconds from the previous stop (or the origin) to this stop.")
+    distance: float = Field(default=0, ge=0, title="Leg Distance", description="Distance in meters from the previous stop (or the origin) to this stop.")
+    unloading_time: float = Field(..., ge=0, title="Unloading Time")
+
 class TransportTask(BaseModel):
     origin: str = Field(..., title="Origin Location", description="Name of the starting location for the task.")
     destination: str = Field(..., title="Destination Location", description="Name of the ending location for the task.")
     # REFACTORED: Task is now per-material
     material: str = Field(..., title="Material ID", description="The specific material to be transported.")
     lots_required: int = Field(..., gt=0, title="Lots Required", description="Number of lots of the material to transport.")
+    load: Dict[str, int] = Field(default_factory=dict, title="Load", description="Lots per material for consolidated trips that carry several materials. Empty means lots_required of material.")
     parent_part: Optional[str] = Field(None, title="Parent Part", description="The parent part number that this material is for.")
     target_process: Optional[str] = Field(None, title="Target Process", description="The name of the target process within the destination location.")
     
@@ -57,9 +69,13 @@ class TransportTask(BaseModel):
     return_time: Optional[float] = Field(None, gt=0, title="Return Time", description="Time in seconds to return to the origin. Defaults to travel_time if not set.")
     transport_unit_names: List[str] = Field(..., min_items=1, title="Transport Unit Names", description="List of transport unit names assigned to this task.")
     unit_start_delay: int = Field(default=0, ge=0, title="Unit Start Delay", description="Delay in seconds between each unit starting the task.")
+    drops: List[TransportDrop] = Field(default_factory=list, title="Milk-run Drops", description="Stops of a multi-drop tour in visiting order. Empty for a direct origin-destination trip.")
     
     # Runtime fields
     current_load_in_lots: Optional[int] = Field(None, description="Runtime field to store the actual load of a trip in lots.")
+    created_at: Optional[float] = Field(None, description="Runtime field: simulation time the task was queued.")
+    assigned_at: Optional[float] = Field(None, description="Runtime field: simulation time a unit took the task.")
+    completed_at: Optional[float] = Field(None, description="Runtime field: simulation time the unit finished the task and was idle again.")
 
     @validator('return_time', pre=True, always=True)
     def set_return_time(cls, v, values):
@@ -71,6 +87,12 @@ class Shift(BaseModel):
     start_time: int = Field(..., ge=0, title="Shift Start Time")
     end_time: int = Field(..., gt=0, title="Shift End Time")
 
+class LocationDistance(BaseModel):
+    from_location: str = Field(..., title="From Location", description="Location name where the leg starts.")
+    to_location: str = Field(..., title="To Location", description="Location name where the leg ends.")
+    distance: float = Field(..., gt=0, title="Distance", description="Distance in meters.")
+    travel_time: float = Field(..., gt=0, title="Travel Time", description="Time in seconds to drive the leg.")
+
 class ScheduledEvent(BaseModel):
     name: str = Field(..., title="Event Name")
     start_time: int = Field(..., ge=0, title="Event Start Time")
@@ -88,6 +110,48 @@ class LogisticsSimulationSetup(BaseModel):
     scheduled_events: List[ScheduledEvent] = Field(default_factory=list, title="Scheduled Events")
     abnormality_rate: float = Field(default=0.0, ge=0.0, le=1.0, title="Abnormality Rate")
     abnormality_duration: int = Field(default=0, ge=0, title="Abnormality Duration")
+    milk_run_enabled: bool = Field(default=False, title="Milk-run Routing", description="Combine requests from the same issue location into multi-drop tours for tow trains (units with more than one sub-unit).")
+    event_driven: bool = Field(default=False, title="Event-driven Mode", description="Compute each phase's completion time at assignment and jump to the next transition or request arrival instead of ticking every second.")
+    vectorized_fleet: bool = Field(default=False, title="Vectorized Fleet", description="Tick mode only: keep unit phase state in NumPy arrays and advance all units with one vectorized update per step. For fleets of hundreds of units.")
+    seed: Optional[int] = Field(None, ge=0, title="Random Seed", description="Seed for the logistics random stream (abnormalities). Empty means a fresh random seed.")
+    dispatch_priority: str = Field(default="fifo", title="Dispatch Priority", description="Order of waiting tasks: 'fifo' (creation order), 'starvation' (destination process that runs out of material first) or 'takt' (destination line with the shortest takt time first). High-priority requests go first in the last two. Ignored when dispatch_policy is 'earliest_due', which orders tasks itself.")
+    dispatch_policy: str = Field(default="fifo", title="Dispatch Policy", description="Which idle unit takes the next task: 'fifo' (first unit of the fleet), 'nearest_unit' (shortest drive to the origin), 'earliest_due' (tasks ordered by when the destination starves) or 'capacity_fill' (smallest unit that carries the trip whole). 'earliest_due' takes precedence over dispatch_priority and request priority; the other policies keep the dispatch_priority order.")
+
+    @validator('dispatch_priority')
+    def check_dispatch_priority(cls, v):
+        if v not in ("fifo", "starvation", "takt"):
+            raise ValueError("dispatch_priority must be 'fifo', 'starvation' or 'takt'")
+        return v
+
+    @validator('dispatch_policy')
+    def check_dispatch_policy(cls, v):
+        # Keep in sync with dispatch.DISPATCH_POLICIES
+        if v not in ("fifo", "nearest_unit", "earliest_due", "capacity_fill"):
+            raise ValueError("dispatch_policy must be 'fifo', 'nearest_unit', 'earliest_due' or 'capacity_fill'")
+        return v
+
+# --- Batch Runner Models ---
+
+class BatchScenario(BaseModel):
+    name: str = Field(..., title="Scenario Name")
+    production_setup: SimulationSetup = Field(..., title="Production Setup")
+    logistics_setup: Optional[LogisticsSimulationSetup] = Field(None, title="Logistics Setup", description="Leave empty to run production only.")
+    schedule_file: str = Field(..., title="Schedule File", description="Path to the schedule CSV/Excel file.")
+    bom_file: Optional[str] = Field(None, title="BOM File", description="Optional BOM text file; defaults to the BOMService sources.")
+    mrp_file: Optional[str] = Field(None, title="MRP File", description="MRP file used by logistics to find material origins.")
+    target_date: Optional[str] = Field(None, title="Target Date", description="Schedule date to run, e.g. '15-Sep'. Runs all SCH_ columns if empty.")
+    seed: Optional[int] = Field(None, ge=0, title="Random Seed", description="Used for the production and logistics setups that do not set their own seed.")
+    max_sim_time: Optional[float] = Field(None, gt=0, title="Max Simulation Time", description="Stop the run after this many simulated seconds.")
+    location_distances: List[LocationDistance] = Field(default_factory=list, title="Location Distances", description="Distance/travel-time matrix entries for logistics, as stored in the master data.")
+
+class ReplicationRequest(BaseModel):
+    scenario: BatchScenario = Field(..., title="Scenario")
+    max_replications: int = Field(default=30, ge=2, title="Max Replications")
+    min_replications: int = Field(default=5, ge=2, title="Min Replications", description="Replications to run before the CI target is checked.")
+    confidence: float = Field(default=0.95, gt=0.0, lt=1.0, title="Confidence Level")
+    target_relative_half_width: float = Field(default=0.02, gt=0.0, title="Target Relative CI Half-width", description="Stop once the CI half-width of every target metric is within this fraction of its mean.")
+    target_metrics: List[str] = Field(default_factory=lambda: ["completed_units"], min_items=1, title="Target Metrics")
+    max_workers: Optional[int] = Field(None, gt=0, title="Max Worker Processes")
 
 # --- Schemas for Saved Setups ---
 
@@ -150,6 +214,22 @@ class MasterLocation(MasterLocationBase):
     class Config:
         from_attributes = True
 
+# Master Location Distance
+class MasterLocationDistanceBase(LocationDistance):
+    pass
+
+class MasterLocationDistanceCreate(MasterLocationDistanceBase):
+    pass
+
+class MasterLocationDistance(MasterLocationDistanceBase):
+    id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+        orm_mode = True
+
 # Master Transport Unit
 class MasterTransportUnitBase(BaseModel):
     name: str = Field(..., title="Transport Unit Name")
@@ -1,13 +1,27 @@
-import random
 import math
+import heapq
 from collections import deque, defaultdict
 from datetime import datetime
 from models import SimulationSetup, ProcessConfig
 from data_loader import load_schedule
 from bom_service import BOMService
+from random_streams import make_stream
+from sim_logging import get_logger
+from step_metrics import StepTimer
 import pandas as pd
+import numpy as np
 from typing import Optional
 
+log = get_logger("production")
+# Raised per unit start; capped so long runs with missing BOM data do not flood stdout
+material_log = get_logger("production.material", max_per_second=5)
+
+
+def _plain(value):
+    """NumPy scalar to the matching Python type; other values are returned as they are."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
 class ProductionEngineV2:
     def __init__(self, setup: SimulationSetup, schedule_file: str, bom_service: BOMService, material_request_queue: deque, target_date: Optional[str] = None):
         self.setup = setup
@@ -18,6 +32,14 @@ class ProductionEngineV2:
         self.status = "initializing"
         self.material_request_queue = material_request_queue
         self.operator_groups = {}
+        # Wall-clock time of the last steps: "events" (event jump and shift check), "lines" (all processes)
+        self.step_timer = StepTimer(("events", "lines"))
+        # Status versioning: every state change bumps state_version and stamps the changed
+        # line, process and stock entries with it (see _mark_changed and get_status)
+        self.state_version = 0
+        self._line_versions = {}
+        self._process_versions = {}
+        self._stock_versions = {}
 
         self.shift_manager = {
             'shifts': [
@@ -54,9 +76,17 @@ class ProductionEngineV2:
 
         self.seconds_per_step = 1  # Each step is one second
         self.simulation_speed = setup.simulation_speed if hasattr(setup, 'simulation_speed') else 1.0
+        # Seeded per-engine stream for NG draws (see random_streams.py)
+        self.rng = make_stream(getattr(setup, 'seed', None), "production_ng")
+
+        # --- Event-driven Mode ---
+        # Min-heap of (tick_time, kind). A tick is only executed when something can change,
+        # so idle seconds between unit finishes and takt releases are skipped entirely.
+        self.event_driven = getattr(setup, 'event_driven', False)
+        self._event_queue = []
 
         self.schedule_df = load_schedule(schedule_file)
-        print(f"DEBUG: ProductionEngineV2 loading schedule from: {schedule_file}")
+        log.debug(f"ProductionEngineV2 loading schedule from: {schedule_file}")
         self.schedule_df.columns = self.schedule_df.columns.map(str)
 
         self.bom_service = bom_service # Use the passed BOM service
@@ -64,12 +94,18 @@ class ProductionEngineV2:
         if self.schedule_df.empty:
             raise ValueError("Gagal memuat data jadwal. Simulasi tidak dapat dimulai.")
 
+        # Resolve the BOM of every scheduled part up front; the step loop and get_status only do lookups
+        self.bom_service.build_component_index(self.schedule_df['PART NO'].dropna().unique())
+
         self.lines = defaultdict(lambda: {
             "production_orders": deque(),
+            "order_index": {},  # original_sequence_no -> deque of open batches, in order book order
             "processes": {},
             "status": "pending",
             "total_line_target": 0,
-            "last_start_time": -999999
+            "last_start_time": -999999,
+            "completed_units": 0,
+            "scrapped_units": 0
         })
         
         self._initialize_operator_groups()
@@ -85,11 +121,14 @@ class ProductionEngineV2:
             raise ValueError("Tidak ada order produksi yang valid ditemukan dalam jadwal.")
 
         self.status = "ready" # Initialize as ready, run_simulation will set to running
-        print(f"Production Engine V2 Initialized for lines: {list(self.lines.keys())}. Total Target: {self.total_production_target} units.")
+        if self.event_driven:
+            self._schedule_event(self.time + self.seconds_per_step, "start")
+            self._schedule_shift_boundary()
+        log.info(f"Production Engine V2 Initialized for lines: {list(self.lines.keys())}. Total Target: {self.total_production_target} units.")
 
     def run_simulation(self):
         self.status = "running"
-        print("INFO: Simulation started.")
+        log.info("Simulation started.")
         while self.status == "running" and self.completed_units + self.scrapped_units < self.total_production_target:
             self.run_step()
             # In a real async application, this would use asyncio.sleep.
@@ -98,17 +137,17 @@ class ProductionEngineV2:
             # Check if simulation is finished
             if self.completed_units + self.scrapped_units >= self.total_production_target:
                 self.status = "finished"
-                print("INFO: Simulation finished.")
+                log.info("Simulation finished.")
                 break
             
             # Check for external stop signal (e.g., from stop_simulation method)
             if self.status == "stopped":
-                print("INFO: Simulation stopped by external signal.")
+                log.info("Simulation stopped by external signal.")
                 break
 
     def stop_simulation(self):
         self.status = "stopped"
-        print("INFO: Simulation received stop signal.")
+        log.info("Simulation received stop signal.")
 
     def is_running(self):
         return self.status in ["running", "ready"]
@@ -118,7 +157,7 @@ class ProductionEngineV2:
         Initializes operator groups from the schedule data.
         """
         if 'GROUP_KERJA' not in self.schedule_df.columns or 'JML_OPR_DIRECT' not in self.schedule_df.columns:
-            print("WARNING: Operator group columns ('GROUP_KERJA', 'JML_OPR_DIRECT') not found. Operator constraints will not be simulated.")
+            log.warning("Operator group columns ('GROUP_KERJA', 'JML_OPR_DIRECT') not found. Operator constraints will not be simulated.")
             return
 
         # Group by line to get the meta data for each line, then group by work group
@@ -150,7 +189,7 @@ class ProductionEngineV2:
                 self.operator_groups[group_name]['total'] += int(num_operators)
                 self.operator_groups[group_name]['available'] += int(num_operators)
 
-        print(f"INFO: Initialized operator groups: {self.operator_groups}")
+        log.info(f"Initialized operator groups: {self.operator_groups}")
 
     def _initialize_lines_and_orders(self):
         orders_by_line = self._create_production_orders_by_line()
@@ -160,10 +199,11 @@ class ProductionEngineV2:
         for line_name, orders in orders_by_line.items():
             line = self.lines[line_name]
             line["production_orders"] = orders
-            line["total_line_target"] = len(orders)
+            line["order_index"] = self._build_order_index(orders)
+            line["total_line_target"] = sum(order['quantity'] for order in orders)
             # Always set status to running if there are orders, never idle
             line["status"] = "running" if len(orders) > 0 else "pending"
-            print(f"DEBUG: {line_name} - Loaded {len(orders)} production orders, status: {line['status']}")
+            log.debug(f"{line_name} - Loaded {len(orders)} production order batches ({line['total_line_target']} units), status: {line['status']}")
 
             # Get the group_kerja for this line
             line_info = self.schedule_df[self.schedule_df['LINE'] == line_name]
@@ -178,14 +218,14 @@ class ProductionEngineV2:
                 schedule_operators = line_info.iloc[0].get('JML_OPR_DIRECT', 0)
                 group_kerja = line_info.iloc[0].get('GROUP_KERJA', '')
                 
-                print(f"DEBUG: {line_name} - JML_OPR_DIRECT: {schedule_operators}, GROUP_KERJA: '{group_kerja}'")
+                log.debug(f"{line_name} - JML_OPR_DIRECT: {schedule_operators}, GROUP_KERJA: '{group_kerja}'")
                 
                 if pd.notna(schedule_operators) and schedule_operators > 0:
                     # For production simulation, use total operators directly
                     # Don't divide by groups - each line should use all its operators
                     operators_per_group = int(schedule_operators)
                     
-                    print(f"DEBUG: {line_name} - Using total operators: {operators_per_group}")
+                    log.debug(f"{line_name} - Using total operators: {operators_per_group}")
                     
                     # Create one process with all operators
                     process_name = "Assembly"
@@ -217,15 +257,15 @@ class ProductionEngineV2:
                         "is_waiting_for_material": False,
                         "materials_waiting_for": []
                     }
-                    print(f"DEBUG: {line_name} - Created process: {process_name} with {operators_per_group} operators")
+                    log.debug(f"{line_name} - Created process: {process_name} with {operators_per_group} operators")
                     
-                    print(f"INFO: Created 1 process for {line_name} with {operators_per_group} operators (ST: {st_time}s)")
+                    log.info(f"Created 1 process for {line_name} with {operators_per_group} operators (ST: {st_time}s)")
                 else:
-                    print(f"WARNING: No valid operator count found for line {line_name} - schedule_operators: {schedule_operators}")
+                    log.warning(f"No valid operator count found for line {line_name} - schedule_operators: {schedule_operators}")
                     # Fallback: create default process if no valid operator count
                     self._create_default_process_for_line(line_name, line)
             else:
-                print(f"WARNING: No schedule data found for line {line_name}")
+                log.warning(f"No schedule data found for line {line_name}")
                 # Fallback: create default process if no schedule data
                 self._create_default_process_for_line(line_name, line)
 
@@ -248,9 +288,9 @@ class ProductionEngineV2:
                 orders = orders_by_line.get(line_name, deque())
                 for order in orders:
                     part_no = order['part_no']
-                    bom_for_part = self.bom_service.get_components(part_no)
-                    for item in bom_for_part:
-                        total_components[item['component']] += item['quantity']
+                    bom_for_part = self.bom_service.get_components_aggregated(part_no)
+                    for component, qty in zip(bom_for_part.components, bom_for_part.quantities):
+                        total_components[component] += qty * order['quantity']
                 
                 # If no orders found for this line, try to get BOM from schedule data
                 if not total_components:
@@ -258,22 +298,22 @@ class ProductionEngineV2:
                     if not line_schedule.empty:
                         # Get first part from schedule for this line
                         first_part = line_schedule.iloc[0]['PART NO']
-                        bom_for_part = self.bom_service.get_components(first_part)
-                        for item in bom_for_part:
-                            total_components[item['component']] += item['quantity'] * 100  # Default quantity
-                        print(f"DEBUG: {line_name} - No orders found, using schedule BOM for {first_part}")
+                        bom_for_part = self.bom_service.get_components_aggregated(first_part)
+                        for component, qty in zip(bom_for_part.components, bom_for_part.quantities):
+                            total_components[component] += qty * 100  # Default quantity
+                        log.debug(f"{line_name} - No orders found, using schedule BOM for {first_part}")
                 
                 # Set stock to total needed + 50% buffer for production simulation
                 for component, qty in total_components.items():
                     buffer_qty = int(qty * 1.5)  # 50% buffer
                     process_data["stock"][component] = max(process_data["stock"].get(component, 0), buffer_qty)
-                    print(f"DEBUG: {line_name} - Set stock for {component}: {process_data['stock'][component]} (needed: {qty}, buffer: {buffer_qty})")
+                    log.debug(f"{line_name} - Set stock for {component}: {process_data['stock'][component]} (needed: {qty}, buffer: {buffer_qty})")
 
     def _create_default_process_for_line(self, line_name: str, line: dict):
         """
         Creates a default process for a line when no valid operator data is found.
         """
-        print(f"INFO: Creating default process for {line_name}")
+        log.info(f"Creating default process for {line_name}")
         
         # Check if there's a configuration in setup.line_processes
         sanitized_line_processes = {k.strip(): v for k, v in self.setup.line_processes.items()}
@@ -281,7 +321,7 @@ class ProductionEngineV2:
         if line_name in sanitized_line_processes:
             # Use configuration from setup
             processes_config = sanitized_line_processes[line_name]
-            print(f"INFO: Using setup configuration for {line_name}: {len(processes_config)} processes")
+            log.info(f"Using setup configuration for {line_name}: {len(processes_config)} processes")
             
             for process_config in processes_config:
                 process_name = process_config.name
@@ -296,7 +336,7 @@ class ProductionEngineV2:
                     "is_waiting_for_material": False,
                     "materials_waiting_for": []
                 }
-                print(f"DEBUG: {line_name} - Created process from setup: {process_name}")
+                log.debug(f"{line_name} - Created process from setup: {process_name}")
         else:
             # Create a single default process
             process_name = "Assembly_1"
@@ -319,7 +359,7 @@ class ProductionEngineV2:
                 "is_waiting_for_material": False,
                 "materials_waiting_for": []
             }
-            print(f"DEBUG: {line_name} - Created default process: {process_name}")
+            log.debug(f"{line_name} - Created default process: {process_name}")
 
     def _create_production_orders_by_line(self) -> defaultdict:
         orders_by_line = defaultdict(deque)
@@ -352,62 +392,50 @@ class ProductionEngineV2:
             normalized_date = normalize_date_token(self.target_date)
             schedule_col_base = f"SCH_{normalized_date}"
             schedule_cols = [col for col in self.schedule_df.columns if col.startswith(schedule_col_base)]
-            print(f"INFO: Running simulation for specific date: {self.target_date} -> columns {schedule_cols}")
+            log.info(f"Running simulation for specific date: {self.target_date} -> columns {schedule_cols}")
         else:
             # Fallback to original behavior if no date is specified
             schedule_cols = [col for col in self.schedule_df.columns if col.startswith('SCH_')]
-            print(f"INFO: No target date specified. Running for all schedule columns: {schedule_cols}")
+            log.info(f"No target date specified. Running for all schedule columns: {schedule_cols}")
 
         if not schedule_cols:
-            print(f"INFO: No schedule columns found. No production orders will be loaded.")
+            log.info(f"No schedule columns found. No production orders will be loaded.")
             return orders_by_line
 
-        print(f"INFO: Loading production orders from schedule columns: {schedule_cols}")
+        log.info(f"Loading production orders from schedule columns: {schedule_cols}")
+
+        # Orders are kept as run-length batches: one dict per schedule row holding the number of
+        # units still to build, instead of one dict per unit.
+        sch_values = self.schedule_df[schedule_cols].apply(pd.to_numeric, errors='coerce')
+        quantities = np.trunc(sch_values.where(sch_values > 0)).fillna(0).sum(axis=1).astype(int)
+
+        st_raw = pd.to_numeric(self.schedule_df.get('ST', pd.Series(60, index=self.schedule_df.index)), errors='coerce')
+        st_seconds = st_raw.where(st_raw > 0, 60)  # ST is already in seconds from data_loader.py
+
+        takt_raw = pd.to_numeric(self.schedule_df.get('TAKT_TIME', pd.Series(0, index=self.schedule_df.index)), errors='coerce')
+        invalid_takt = ~(takt_raw > 0)
+        # Use ST as fallback for takt time if TAKT_TIME is 0 or invalid (minimum 60 seconds)
+        takt_time = takt_raw.where(~invalid_takt, np.maximum(st_raw.fillna(60), 60))
+
+        batches = pd.DataFrame({
+            'line': self.schedule_df['LINE'],
+            'part_no': self.schedule_df['PART NO'],
+            'model': self.schedule_df['MODEL'],
+            'quantity': quantities,
+            'st': st_seconds,
+            'takt_time': takt_time,
+            'original_sequence_no': self.schedule_df[schedule_order_col],
+        })
+        scheduled = quantities > 0
+        for part_no in batches.loc[scheduled & invalid_takt, 'part_no']:
+            log.warning(f"Invalid Takt Time for part {part_no}. Using ST as fallback.")
 
-        for _, row in self.schedule_df.iterrows():
-            try:
-                total_quantity = 0
-                for col in schedule_cols:
-                    if pd.notna(row[col]) and row[col] > 0:
-                        total_quantity += int(row[col])
-                
-                if total_quantity > 0:
-                    line_name = row['LINE']
-                    model = row['MODEL']
-                    part_no = row['PART NO']
-                    
-                    takt_time = row.get('TAKT_TIME', 0)
-                    if not isinstance(takt_time, (int, float)) or takt_time <= 0:
-                        # Use ST as fallback for takt time if TAKT_TIME is 0 or invalid
-                        st_fallback = row.get('ST', 60)  # Already in seconds
-                        takt_time = max(st_fallback, 60)  # Minimum 60 seconds
-                        print(f"WARNING: Invalid Takt Time ({takt_time}) for part {part_no}. Using ST as fallback: {takt_time}s")
-                    else:
-                        # TAKT_TIME is already in seconds from data_loader.py
-                        takt_time = takt_time
+        for order in batches[scheduled].to_dict('records'):
+            line_name = order.pop('line')
+            order['status'] = 'pending'
+            order['is_started'] = False  # True while the batch's current unit is in process
+            orders_by_line[line_name].append(order)
 
-                    # Get ST (already in seconds from data_loader.py)
-                    st_raw = row['ST']
-                    if not isinstance(st_raw, (int, float)) or st_raw <= 0:
-                        st_seconds = 60  # Default to 60 seconds
-                    else:
-                        st_seconds = st_raw  # Already in seconds from data_loader.py
-                    
-                    for _ in range(total_quantity):
-                        orders_by_line[line_name].append({
-                            'part_no': part_no,
-                            'model': model,
-                            'quantity': 1,
-                            'st': st_seconds,  # ST in seconds
-                            'takt_time': takt_time,
-                            'original_sequence_no': row[schedule_order_col],
-                            'status': 'pending',
-                            'is_started': False # Initialize is_started flag
-                        })
-            except (ValueError, TypeError, KeyError) as e:
-                print(f"ERROR processing row: {row}, error: {e}")
-                continue
-                
         return orders_by_line
 
     # def _calculate_realistic_progress(self):
@@ -513,53 +541,176 @@ class ProductionEngineV2:
                 # Use ST (Standard Time) as cycle time if takt_time is not available
                 if takt_time <= 0:
                     takt_time = order.get('st', 60)  # Default to 60 seconds if no ST
-                
-                if cumulative_time + takt_time < self.time:
-                    cumulative_time += takt_time
-                    self.completed_units += 1
-                    finished_count += 1
-                else:
+
+                # Units of this batch that finish strictly before the current time
+                units_done = 0
+                if self.time > cumulative_time:
+                    units_done = min(order['quantity'], max(0, math.ceil((self.time - cumulative_time) / takt_time) - 1))
+                cumulative_time += units_done * takt_time
+                self.completed_units += units_done
+                finished_count += units_done
+
+                if units_done < order['quantity']:
+                    order['quantity'] -= units_done
                     orders_to_keep.append(order)
             
             line_data["production_orders"] = orders_to_keep
-            print(f"INFO: Fast-forwarded line {line_name}. Marked {finished_count} orders as complete.")
+            line_data["order_index"] = self._build_order_index(orders_to_keep)
+            self._mark_changed(line_name)
+            log.info(f"Fast-forwarded line {line_name}. Marked {finished_count} orders as complete.")
+
+
+    def _build_order_index(self, orders: deque) -> dict:
+        order_index = defaultdict(deque)
+        for order in orders:
+            order_index[order.get('original_sequence_no')].append(order)
+        return dict(order_index)
+
+    def _retire_order(self, line_data: dict, order: dict):
+        """
+        Drops an exhausted batch from the sequence index. The batch normally sits at the front of
+        the order book; one finished out of order stays in the deque until it reaches the front.
+        """
+        open_batches = line_data["order_index"].get(order.get('original_sequence_no'))
+        if open_batches:
+            if open_batches[0] is order:
+                open_batches.popleft()
+            else:
+                open_batches.remove(order)
+            if not open_batches:
+                del line_data["order_index"][order.get('original_sequence_no')]
+
+        orders = line_data["production_orders"]
+        while orders and orders[0]['quantity'] <= 0:
+            orders.popleft()
 
+    def _schedule_event(self, event_time: float, kind: str):
+        """
+        Queues a tick at event_time (the value self.time will have while the tick runs).
+        No-op in tick mode.
+        """
+        if self.event_driven:
+            heapq.heappush(self._event_queue, (event_time, kind))
+
+    def _time_until(self, duration: float) -> float:
+        """
+        Rounds a duration up to whole steps, matching when tick mode would observe it.
+        """
+        if duration <= 0:
+            return 0
+        return math.ceil(duration / self.seconds_per_step) * self.seconds_per_step
+
+    def _schedule_shift_boundary(self):
+        """
+        Queues the first tick at which the current shift is over, so the shift switch in
+        run_step happens at the same simulated time as in tick mode.
+        """
+        current_sim_datetime = self.simulation_start_time + pd.Timedelta(seconds=self.time)
+        current_shift = self.shift_manager['shifts'][self.shift_manager['current_shift_index']]
+        shift_end = current_sim_datetime.replace(hour=current_shift['end_hour'], minute=0, second=0, microsecond=0)
+        if shift_end <= current_sim_datetime:
+            shift_end += pd.Timedelta(days=1)
+        # The shift check runs before the clock advances, so the tick lands one step after the boundary
+        boundary_time = (shift_end - self.simulation_start_time).total_seconds()
+        self._schedule_event(boundary_time + self.seconds_per_step, "shift_boundary")
+
+    def _advance_to_next_event(self):
+        """
+        Moves the clock so that the coming tick runs at the earliest queued event time.
+        Every event due at or before that tick is consumed by it.
+        """
+        if not self._event_queue:
+            self._schedule_shift_boundary()
+
+        next_event_time = self._event_queue[0][0]
+        tick_time = max(next_event_time, self.time + self.seconds_per_step)
+        while self._event_queue and self._event_queue[0][0] <= tick_time:
+            heapq.heappop(self._event_queue)
+
+        self.time = tick_time - self.seconds_per_step
+
+    def line_takt_time(self, line_name: str) -> float:
+        """Takt time of the order at the head of the line, with the same ST fallback as start_new_units."""
+        line_data = self.lines.get(line_name)
+        if not line_data or not line_data["production_orders"]:
+            return math.inf
+        order = line_data["production_orders"][0]
+        takt_time = order.get('takt_time', 0)
+        if takt_time <= 0:
+            takt_time = min(order.get('st', 3600), 3600)
+        return takt_time
+
+    def time_to_starvation(self, line_name: str, process_name: str) -> float:
+        """
+        Seconds until the process runs out of material for the order at the head of its line:
+        the whole units its stock still covers times the line's takt time. 0 if it already waits
+        for material, inf if it has nothing left to build or the part has no BOM.
+        """
+        line_data = self.lines.get(line_name)
+        if not line_data or process_name not in line_data["processes"] or not line_data["production_orders"]:
+            return math.inf
+        process_data = line_data["processes"][process_name]
+        if process_data["is_waiting_for_material"]:
+            return 0.0
+
+        bom = self.bom_service.get_components_aggregated(line_data["production_orders"][0]['part_no'])
+        stock = process_data["stock"]
+        units_covered = min(
+            (stock.get(component, 0) // quantity for component, quantity in zip(bom.components, bom.quantities) if quantity > 0),
+            default=math.inf
+        )
+        return units_covered * self.line_takt_time(line_name)
 
     def has_process(self, line_name: str, process_name: str) -> bool:
         return line_name in self.lines and process_name in self.lines[line_name]["processes"]
 
     def add_stock(self, destination: str, material: str, quantity: int):
-        print(f"Attempting to add stock: dest={destination}, mat={material}, qty={quantity}")
+        if log.debug_enabled:
+            log.debug(f"Attempting to add stock: dest={destination}, mat={material}, qty={quantity}")
         if ':' in destination:
             line_name, process_name = destination.split(':', 1)
             if line_name in self.lines and process_name in self.lines[line_name]["processes"]:
                 process_data = self.lines[line_name]["processes"][process_name]
                 process_data["stock"][material] += quantity
+                self._mark_changed(line_name, process_name, (material,))
                 if material in process_data["pending_requests"]:
                     process_data["pending_requests"].remove(material)
                 process_data["materials_waiting_for"] = [m for m in process_data["materials_waiting_for"] if m['material'] != material]
                 if not process_data["pending_requests"]:
                      process_data["is_waiting_for_material"] = False
+                self._schedule_event(self.time + self.seconds_per_step, "material_arrival")
             else:
-                print(f"Warning: Tried to add stock to a non-existent line/process: {destination}")
+                log.warning(f"Tried to add stock to a non-existent line/process: {destination}")
         else:
             process_name = destination
             for line_name in self.lines:
                 if process_name in self.lines[line_name]["processes"]:
                     process_data = self.lines[line_name]["processes"][process_name]
                     process_data["stock"][material] += quantity
+                    self._mark_changed(line_name, process_name, (material,))
                     if material in process_data["pending_requests"]:
                         process_data["pending_requests"].remove(material)
                     process_data["materials_waiting_for"] = [m for m in process_data["materials_waiting_for"] if m['material'] != material]
                     if not process_data["pending_requests"]:
                          process_data["is_waiting_for_material"] = False
+                    self._schedule_event(self.time + self.seconds_per_step, "material_arrival")
                     return
-            print(f"Warning: Process '{process_name}' not found in any line.")
+            log.warning(f"Process '{process_name}' not found in any line.")
 
     def run_step(self):
         if self.status != "running": 
             return
 
+        self.step_timer.start_step()
+        try:
+            self._run_step()
+        finally:
+            self.step_timer.end_step()
+
+    def _run_step(self):
+        if self.event_driven:
+            self._advance_to_next_event()
+
         try:
             current_sim_datetime = self.simulation_start_time + pd.Timedelta(seconds=self.time)
             current_shift = self.shift_manager['shifts'][self.shift_manager['current_shift_index']]
@@ -575,7 +726,7 @@ class ProductionEngineV2:
                 if current_sim_datetime.hour >= start_hour or current_sim_datetime.hour < end_hour:
                     is_working_hour = True
         except Exception as e:
-            print(f"ERROR in shift management: {e}")
+            log.error(f"Shift management failed: {e}")
             # Continue with simulation even if shift management fails
             is_working_hour = True
 
@@ -596,15 +747,20 @@ class ProductionEngineV2:
                 next_shift_start_time += pd.Timedelta(days=1)
 
             self.time = (next_shift_start_time - self.simulation_start_time).total_seconds()
+            self._schedule_event(self.time + self.seconds_per_step, "shift_start")
+            self._schedule_shift_boundary()
+            self.step_timer.mark("events")
             return # Skip the rest of the step
 
         self.time += self.seconds_per_step
+        self.step_timer.mark("events")
 
         try:
             for line_name, line_data in self.lines.items():
                 # Keep line running if there are still orders to process
-                if len(line_data["production_orders"]) > 0:
+                if len(line_data["production_orders"]) > 0 and line_data["status"] != "running":
                     line_data["status"] = "running"
+                    self._mark_changed(line_name)
                 
                 if line_data["status"] != "running": 
                     continue
@@ -626,46 +782,54 @@ class ProductionEngineV2:
                                 remaining_units.append(unit)
                                 
                         process_data["units_in_process"] = remaining_units
+                        if finished_units:
+                            self._mark_changed(line_name, process_name)
                         
                         for unit_info in finished_units:
                             # In production simulation mode, no need to manage operator availability
 
                             if not config.output_to:
-                                if random.random() > config.ng_rate: 
+                                if self.rng.random() > config.ng_rate: 
                                     self.completed_units += 1
+                                    line_data["completed_units"] += 1
                                 else: 
                                     self.scrapped_units += 1
-
-                                # Find the original order and decrement its quantity
-                                for i, order in enumerate(line_data["production_orders"]):
-                                    if order.get('original_sequence_no') == unit_info.get('original_sequence_no'):
-                                        order['quantity'] -= 1
-                                        if order['quantity'] <= 0:
-                                            # Remove the order and reset its is_started flag
-                                            line_data["production_orders"].pop(i)
-                                            # Ensure the last_start_time is reset or handled for the next order
-                                            line_data['last_start_time'] = -999999 # Reset to allow next unit to start
-                                            print(f"DEBUG: Completed order {order.get('part_no')} - reset last_start_time")
-                                        break
+                                    line_data["scrapped_units"] += 1
+
+                                # Find the original order batch and decrement its quantity
+                                open_batches = line_data["order_index"].get(unit_info.get('original_sequence_no'))
+                                if open_batches:
+                                    order = open_batches[0]
+                                    order['quantity'] -= 1
+                                    order['is_started'] = False  # Next unit of the batch may start
+                                    # Ensure the last_start_time is reset or handled for the next unit
+                                    line_data['last_start_time'] = -999999 # Reset to allow next unit to start
+                                    self._schedule_event(self.time + self.seconds_per_step, "takt_release")
+                                    if order['quantity'] <= 0:
+                                        self._retire_order(line_data, order)
+                                        if log.debug_enabled:
+                                            log.debug(f"Completed order {order.get('part_no')} - reset last_start_time")
 
                             else:
                                 for next_process_name in config.output_to:
                                     if next_process_name in line_data["processes"]:
                                         line_data["processes"][next_process_name]["queue_in"][process_name].append(unit_info)
+                                        self._mark_changed(line_name, next_process_name)
                     except Exception as e:
-                        print(f"ERROR in process {process_name} on line {line_name}: {e}")
+                        log.error(f"Process {process_name} on line {line_name} failed: {e}")
                         continue
                         
                 for process_name in line_data["processes"]:
                     try:
                         self.start_new_units(line_name, process_name)
                     except Exception as e:
-                        print(f"ERROR starting new units for process {process_name} on line {line_name}: {e}")
+                        log.error(f"Starting new units for process {process_name} on line {line_name} failed: {e}")
                         continue
                         
         except Exception as e:
-            print(f"ERROR in production step: {e}")
+            log.error(f"Production step failed: {e}")
             # Continue simulation even if there's an error
+        self.step_timer.mark("lines")
 
     def start_new_units(self, line_name: str, process_name: str):
         line_data = self.lines[line_name]
@@ -674,15 +838,19 @@ class ProductionEngineV2:
 
         # In production simulation mode, operators are always available
         # Skip operator availability check for production-only simulation
-        process_data['is_waiting_for_operator'] = False
+        if process_data.get('is_waiting_for_operator'):
+            process_data['is_waiting_for_operator'] = False
+            self._mark_changed(line_name, process_name)
 
         if process_data.get("is_waiting_for_material", False):
-            print(f"DEBUG: {line_name}:{process_name} waiting for materials")
+            if log.debug_enabled:
+                log.debug(f"{line_name}:{process_name} waiting for materials")
             return
 
         # Takt time check will be handled in the unit processing loop below
 
-        print(f"DEBUG: {line_name}:{process_name} - Starting unit processing loop. Current units: {len(process_data['units_in_process'])}/{config.num_operators}")
+        if log.debug_enabled:
+            log.debug(f"{line_name}:{process_name} - Starting unit processing loop. Current units: {len(process_data['units_in_process'])}/{config.num_operators}")
         
         # Check if enough time has passed since last unit start (takt time logic)
         can_start_unit = True
@@ -696,7 +864,8 @@ class ProductionEngineV2:
             time_since_last_start = self.time - line_data['last_start_time']
             can_start_unit = time_since_last_start >= takt_time
             
-            print(f"DEBUG: {line_name}:{process_name} takt check - self.time: {self.time}, last_start_time: {line_data['last_start_time']}, takt_time: {takt_time}, time_diff: {time_since_last_start}, can_start_unit: {can_start_unit}")
+            if log.debug_enabled:
+                log.debug(f"{line_name}:{process_name} takt check - self.time: {self.time}, last_start_time: {line_data['last_start_time']}, takt_time: {takt_time}, time_diff: {time_since_last_start}, can_start_unit: {can_start_unit}")
         
         # Only start one unit if takt time allows and operator is available
         # In production simulation mode, always try to start units if we have orders
@@ -716,45 +885,57 @@ class ProductionEngineV2:
                 unit_to_process['cycle_time'] = config.cycle_time
                 process_data["units_in_process"].append(unit_to_process)
                 line_data['last_start_time'] = self.time # Update last_start_time for the line
-                print(f"DEBUG: {line_name}:{process_name} - Started unit from upstream. Unit start_time: {unit_to_process['start_time']}, cycle_time: {unit_to_process['cycle_time']}")
+                self._mark_changed(line_name, process_name)
+                if log.debug_enabled:
+                    log.debug(f"{line_name}:{process_name} - Started unit from upstream. Unit start_time: {unit_to_process['start_time']}, cycle_time: {unit_to_process['cycle_time']}")
             
             elif line_data["production_orders"] and not line_data["production_orders"][0].get('is_started', False):
                 order = line_data["production_orders"][0]
                 part_no = order['part_no']
-                bom_for_part = self.bom_service.get_components(part_no)
-                print(f"DEBUG: Checking BOM for part {part_no}: {bom_for_part}")
+                bom_for_part = self.bom_service.get_components_aggregated(part_no)
+                bom_items = list(zip(bom_for_part.components, bom_for_part.quantities))
+                if log.debug_enabled:
+                    log.debug(f"Checking BOM for part {part_no}: {bom_items}")
 
                 # Initialize has_all_materials
                 has_all_materials = True
 
-                if not bom_for_part:
-                    print(f"WARNING: No BOM found for part {part_no}. Production will proceed without material consumption.")
+                if not bom_items:
+                    material_log.warning(f"No BOM found for part {part_no}. Production will proceed without material consumption.")
                     has_all_materials = True
                 else:
                     # Unified material check logic
                     has_all_materials = True
-                    for item in bom_for_part:
-                        if process_data["stock"].get(item['component'], 0) < item['quantity']:
+                    # Quantities are summed per component, so a child listed on several BOM lines is checked once
+                    for component, required_qty in bom_items:
+                        if process_data["stock"].get(component, 0) < required_qty:
                             has_all_materials = False
                             break
                     
                     if not has_all_materials:
                         # In production simulation mode, skip to next model if stock is insufficient
                         if self.setup.ignore_material_availability:
-                            print(f"DEBUG: {line_name}:{process_name} - Insufficient stock for {part_no}, skipping to next order")
+                            if log.debug_enabled:
+                                log.debug(f"{line_name}:{process_name} - Insufficient stock for {part_no}, skipping to next order")
                             # Remove current order and try next one
                             if line_data["production_orders"]:
-                                skipped_order = line_data["production_orders"].popleft()
-                                print(f"DEBUG: Skipped order: {skipped_order['part_no']} ({skipped_order['model']})")
+                                skipped_order = line_data["production_orders"][0]
+                                skipped_order['quantity'] -= 1
+                                if skipped_order['quantity'] <= 0:
+                                    self._retire_order(line_data, skipped_order)
+                                self._mark_changed(line_name)
+                                if log.debug_enabled:
+                                    log.debug(f"Skipped unit of order: {skipped_order['part_no']} ({skipped_order['model']})")
+                                self._schedule_event(self.time + self.seconds_per_step, "takt_release")
                             # Set unit_to_process to None to prevent processing this order
                             unit_to_process = None
                         else:
                             process_data["is_waiting_for_material"] = True
+                            self._mark_changed(line_name, process_name)
                             
                             # If in integrated mode, request materials
                             materials_to_request = []
-                            for item in bom_for_part:
-                                component, required_qty = item['component'], item['quantity']
+                            for component, required_qty in bom_items:
                                 if process_data["stock"].get(component, 0) < required_qty:
                                     if component not in process_data["pending_requests"]:
                                         needed_qty = required_qty - process_data["stock"].get(component, 0)
@@ -777,8 +958,9 @@ class ProductionEngineV2:
                     else:
                         # We have all materials, proceed with production
                         # Consume materials
-                        for item in bom_for_part:
-                            process_data["stock"][item['component']] -= item['quantity']
+                        for component, required_qty in bom_items:
+                            process_data["stock"][component] -= required_qty
+                        self._mark_changed(line_name, process_name, [component for component, _ in bom_items])
                         
                         # Create a new unit and add it to units_in_process
                         unit_to_process = {
@@ -791,7 +973,8 @@ class ProductionEngineV2:
                         process_data["units_in_process"].append(unit_to_process)
                         line_data['last_start_time'] = self.time # Update last_start_time for the line
                         order['is_started'] = True # Mark order as started
-                        print(f"DEBUG: {line_name}:{process_name} - Started unit from order. Unit start_time: {unit_to_process['start_time']}, cycle_time: {unit_to_process['st']}")
+                        if log.debug_enabled:
+                            log.debug(f"{line_name}:{process_name} - Started unit from order. Unit start_time: {unit_to_process['start_time']}, cycle_time: {unit_to_process['st']}")
 
                         # Decrement the quantity in the current production order.
                         # This quantity is for total orders to be made. Individual units are tracked in units_in_process.
@@ -806,169 +989,240 @@ class ProductionEngineV2:
                         # When a unit is finished, if it's the last unit for that order, then we remove the order.
 
             if unit_to_process:
+                if self.event_driven:
+                    self._schedule_unit_events(line_data, unit_to_process, config)
+
                 # Remove the block that appends unit_to_process again and updates last_start_time again
                 # It's already handled in the if/elif blocks above
                 
                 # We need to ensure that the order's quantity is decremented ONLY when a unit is completed and removed.
                 # For now, the 'is_started' flag helps to prevent starting multiple units from the same order if we are
                 # only processing one unit at a time.
-                print(f"DEBUG: Started unit {unit_to_process.get('part_no', 'unknown')} ({unit_to_process.get('model', 'unknown')}) in {line_name}:{process_name}")
+                if log.debug_enabled:
+                    log.debug(f"Started unit {unit_to_process.get('part_no', 'unknown')} ({unit_to_process.get('model', 'unknown')}) in {line_name}:{process_name}")
             else:
                 if not can_start_unit:
-                    print(f"DEBUG: {line_name}:{process_name} - Cannot start unit due to takt time constraint")
+                    if log.debug_enabled:
+                        log.debug(f"{line_name}:{process_name} - Cannot start unit due to takt time constraint")
                 elif len(process_data["units_in_process"]) >= 1: # Changed from config.num_operators
-                    print(f"DEBUG: {line_name}:{process_name} - Cannot start unit, one unit is already in process ({len(process_data['units_in_process'])}/1)")
+                    if log.debug_enabled:
+                        log.debug(f"{line_name}:{process_name} - Cannot start unit, one unit is already in process ({len(process_data['units_in_process'])}/1)")
                 elif not line_data["production_orders"]:
-                    print(f"DEBUG: {line_name}:{process_name} - No production orders available")
-                else:
-                    print(f"DEBUG: {line_name}:{process_name} - No unit to process (orders: {len(line_data['production_orders'])}, upstream: {unit_from_upstream is not None})")
-
-    def _sanitize_for_json(self, data):
-        if isinstance(data, dict) or isinstance(data, defaultdict):
-            return {str(key): self._sanitize_for_json(value) for key, value in data.items()}
-        elif isinstance(data, list):
-            return [self._sanitize_for_json(element) for element in data]
-        elif isinstance(data, float):
-            if not math.isfinite(data):
-                return None
-        return data
-
-    def get_status(self):
-        lines_status = {}
-        for line_name, line_data in self.lines.items():
-            process_status = {}
-            for p_name, p_data in line_data["processes"].items():
-                config = p_data["config"]
-                units_in_process_details = []
-                for unit in p_data["units_in_process"]:
-                    cycle_time = unit.get('cycle_time', config.cycle_time)
-                    if not isinstance(cycle_time, (int, float)) or cycle_time <= 0:
-                        cycle_time = 60
-                    
-                    # Calculate progress based on cycle time
-                    elapsed_time = self.time - unit.get('start_time', self.time)
-                    progress = min(100, max(0, int((elapsed_time / cycle_time) * 100)))
-                    
-                    # Calculate remaining time
-                    remaining_time = max(0, cycle_time - elapsed_time)
-                    
-                    part_no = unit.get('part_no', 'unknown')
-                    model = unit.get('model', 'unknown')
-                    child_parts = self.bom_service.get_components(part_no)
-                    
-                    units_in_process_details.append({
-                        'progress': progress, 
-                        'part_no': part_no, 
-                        'model': model, 
-                        'cycle_time': cycle_time,
-                        'remaining_time': remaining_time,
-                        'elapsed_time': elapsed_time,
-                        'child_parts': child_parts
-                    })
-                process_status[p_name] = {
-                    "queue_in": sum(len(q) for q in p_data["queue_in"].values()),
-                    "units_in_process": units_in_process_details,
-                    "queue_out": len(p_data["queue_out"]),
-                    "name": config.name,
-                    "num_operators": config.num_operators,
-                    "input_from": config.input_from,
-                    "output_to": config.output_to,
-                    "stock": dict(p_data["stock"]),
-                    "is_waiting_for_material": p_data.get("is_waiting_for_material", False),
-                    "materials_waiting_for": p_data.get("materials_waiting_for", []),
-                    "is_waiting_for_operator": p_data.get("is_waiting_for_operator", False)
-                }
-            current_order_info = None
-            if line_data["production_orders"]:
-                current_order = line_data["production_orders"][0]
-                child_parts = self.bom_service.get_components(current_order.get("part_no"))
-                # Get takt time and convert from minutes to seconds if needed
-                takt_time_raw = current_order.get("takt_time", 0)
-                if takt_time_raw > 0 and takt_time_raw < 3600:  # If it looks like minutes (less than 1 hour in seconds)
-                    takt_time_display = takt_time_raw * 60  # Convert minutes to seconds
+                    if log.debug_enabled:
+                        log.debug(f"{line_name}:{process_name} - No production orders available")
                 else:
-                    takt_time_display = takt_time_raw  # Already in seconds
-                
-                # Get ST (already in seconds from data_loader.py)
-                st_raw = current_order.get("st", 0)
-                st_display = st_raw  # Already in seconds from data_loader.py
-                
-                current_order_info = {
-                    "part_no": current_order.get("part_no"),
-                    "model": current_order.get("model"),
-                    "sequence_no": current_order.get("original_sequence_no"),
-                    "st": st_display,
-                    "takt_time": takt_time_display,
-                    "total_line_target": line_data["total_line_target"],
-                    "child_parts": child_parts
-                }
-            else:
-                # If no active orders, try to get info from the original schedule
-                line_schedule = self.schedule_df[self.schedule_df['LINE'] == line_name]
-                if not line_schedule.empty:
-                    # Get the first part in the schedule for that line
-                    first_part_in_schedule = line_schedule.iloc[0]
-                    part_no = first_part_in_schedule.get("PART NO")
-                    if part_no:
-                        child_parts = self.bom_service.get_components(part_no)
-                        # Get takt time and convert from minutes to seconds if needed
-                        takt_time_raw = first_part_in_schedule.get("TAKT_TIME", 0)
-                        if takt_time_raw > 0 and takt_time_raw < 3600:  # If it looks like minutes (less than 1 hour in seconds)
-                            takt_time_display = takt_time_raw * 60  # Convert minutes to seconds
-                        else:
-                            takt_time_display = takt_time_raw  # Already in seconds
-                        
-                        # Get ST (already in seconds from data_loader.py)
-                        st_raw = first_part_in_schedule.get("ST", 0)
-                        st_display = st_raw  # Already in seconds from data_loader.py
-                        
-                        current_order_info = {
-                            "part_no": part_no,
-                            "model": first_part_in_schedule.get("MODEL"),
-                            "sequence_no": first_part_in_schedule.get("NO. URUT"),
-                            "st": st_display,
-                            "takt_time": takt_time_display,
-                            "total_line_target": line_data["total_line_target"],
-                            "child_parts": child_parts
-                        }
+                    if log.debug_enabled:
+                        log.debug(f"{line_name}:{process_name} - No unit to process (orders: {len(line_data['production_orders'])}, upstream: {unit_from_upstream is not None})")
+
+    def _schedule_unit_events(self, line_data: dict, unit: dict, config: ProcessConfig):
+        """
+        Queues the finish of a freshly started unit and the next takt release of its line.
+        Uses the same cycle and takt time rules as run_step and start_new_units.
+        """
+        cycle_time = unit.get('st', config.cycle_time)
+        if not isinstance(cycle_time, (int, float)) or cycle_time <= 0:
+            cycle_time = 60
+        self._schedule_event(unit['start_time'] + self._time_until(cycle_time), "unit_finish")
+
+        if line_data["production_orders"]:
+            order = line_data["production_orders"][0]
+            takt_time = order.get('takt_time', 0)
+            if takt_time <= 0:
+                takt_time = min(order.get('st', 3600), 3600)
+            self._schedule_event(line_data['last_start_time'] + self._time_until(takt_time), "takt_release")
+
+    def _mark_changed(self, line_name: str, process_name: Optional[str] = None, materials=()):
+        """
+        Records that a line (and optionally one of its processes and stock entries) changed,
+        so get_status(since_version) can return only what changed since a client's last poll.
+        """
+        self.state_version += 1
+        version = self.state_version
+        self._line_versions[line_name] = version
+        if process_name is not None:
+            self._process_versions[(line_name, process_name)] = version
+            if materials:
+                stock_versions = self._stock_versions.setdefault((line_name, process_name), {})
+                for material in materials:
+                    stock_versions[material] = version
+
+    def status_versions(self) -> dict:
+        """
+        Copy of the change stamps, to be stored with a status snapshot so deltas can be cut
+        from the snapshot later (see select_status_changes).
+        """
+        return {
+            "version": self.state_version,
+            "lines": dict(self._line_versions),
+            "processes": dict(self._process_versions),
+            "stock": {key: dict(stock_versions) for key, stock_versions in self._stock_versions.items()},
+        }
+
+    def _unit_status(self, unit: dict, config: ProcessConfig) -> dict:
+        cycle_time = unit.get('cycle_time', config.cycle_time)
+        if not isinstance(cycle_time, (int, float)) or cycle_time <= 0:
+            cycle_time = 60
+
+        # Calculate progress based on cycle time
+        elapsed_time = self.time - unit.get('start_time', self.time)
+        progress = min(100, max(0, int((elapsed_time / cycle_time) * 100)))
+
+        # Calculate remaining time
+        remaining_time = max(0, cycle_time - elapsed_time)
+
+        part_no = unit.get('part_no', 'unknown')
+        return {
+            'progress': progress,
+            'part_no': part_no,
+            'model': unit.get('model', 'unknown'),
+            'cycle_time': float(cycle_time),
+            'start_time': unit.get('start_time', self.time),
+            'remaining_time': float(remaining_time),
+            'elapsed_time': elapsed_time,
+            'child_parts': self.bom_service.get_components(part_no)
+        }
+
+    def _process_status(self, line_name: str, p_name: str, p_data: dict, since_version: Optional[int] = None) -> dict:
+        config = p_data["config"]
+        stock = p_data["stock"]
+        if since_version is not None:
+            stock_versions = self._stock_versions.get((line_name, p_name), {})
+            stock = {material: stock[material] for material, version in stock_versions.items() if version > since_version}
+        return {
+            "queue_in": sum(len(q) for q in p_data["queue_in"].values()),
+            "units_in_process": [self._unit_status(unit, config) for unit in p_data["units_in_process"]],
+            "queue_out": len(p_data["queue_out"]),
+            "name": config.name,
+            "num_operators": config.num_operators,
+            "input_from": list(config.input_from),
+            "output_to": list(config.output_to),
+            "stock": dict(stock),
+            "is_waiting_for_material": p_data.get("is_waiting_for_material", False),
+            "materials_waiting_for": list(p_data.get("materials_waiting_for", [])),
+            "is_waiting_for_operator": p_data.get("is_waiting_for_operator", False)
+        }
 
-            current_processing_products = []
-            for p_data in line_data["processes"].values():
-                for unit in p_data["units_in_process"]:
-                    cycle_time = unit.get('st', config.cycle_time)
-                    if not isinstance(cycle_time, (int, float)) or cycle_time <= 0:
-                        cycle_time = 60
-                    current_processing_products.append({
-                        "part_no": unit.get("part_no", "unknown"),
-                        "model": unit.get("model", "unknown"),
-                        "progress": min(100, int(((self.time - unit.get('start_time', self.time)) / cycle_time) * 100))
-                    })
-            print(f"DEBUG: {line_name} - Current processing products: {current_processing_products}")
-
-            # Calculate takt time countdown for next unit
-            takt_countdown = 0
-            if line_data["production_orders"]:
-                current_order = line_data["production_orders"][0]
-                takt_time = current_order.get('takt_time', 0)
-                print(f"DEBUG: get_status - Line: {line_name}, Part No: {current_order.get('part_no')}, Takt Time used for countdown: {takt_time}")
-                # Ensure takt_time is valid, fallback to 60 seconds if not
-                if not isinstance(takt_time, (int, float)) or takt_time <= 0:
-                    takt_time = 60 # Fallback to 60 seconds if invalid
-
-                # Use simulation time for countdown calculation
-                time_since_last_start = self.time - line_data.get('last_start_time', 0)
-                takt_countdown = max(0, takt_time - time_since_last_start)
-
-            lines_status[line_name] = {
-                "status": line_data["status"],
+    def _current_order_info(self, line_name: str, line_data: dict) -> Optional[dict]:
+        if line_data["production_orders"]:
+            current_order = line_data["production_orders"][0]
+            child_parts = self.bom_service.get_components(current_order.get("part_no"))
+            # Get takt time and convert from minutes to seconds if needed
+            takt_time_raw = current_order.get("takt_time", 0)
+            if takt_time_raw > 0 and takt_time_raw < 3600:  # If it looks like minutes (less than 1 hour in seconds)
+                takt_time_display = takt_time_raw * 60  # Convert minutes to seconds
+            else:
+                takt_time_display = takt_time_raw  # Already in seconds
+
+            # Get ST (already in seconds from data_loader.py)
+            st_raw = current_order.get("st", 0)
+            st_display = st_raw  # Already in seconds from data_loader.py
+
+            return {
+                "part_no": current_order.get("part_no"),
+                "model": current_order.get("model"),
+                "sequence_no": current_order.get("original_sequence_no"),
+                "st": st_display,
+                "takt_time": takt_time_display,
                 "total_line_target": line_data["total_line_target"],
-                "remaining_orders": len(line_data["production_orders"]),
-                "current_order": current_order_info,
-                "current_processing_products": current_processing_products,
-                "processes": process_status,
-                "takt_countdown": takt_countdown,
-                "last_start_time": line_data.get('last_start_time', 0)
+                "child_parts": child_parts
             }
+
+        # If no active orders, try to get info from the original schedule
+        line_schedule = self.schedule_df[self.schedule_df['LINE'] == line_name]
+        if line_schedule.empty:
+            return None
+        # Get the first part in the schedule for that line
+        first_part_in_schedule = line_schedule.iloc[0]
+        part_no = first_part_in_schedule.get("PART NO")
+        if not part_no:
+            return None
+        child_parts = self.bom_service.get_components(part_no)
+        # Get takt time and convert from minutes to seconds if needed
+        takt_time_raw = first_part_in_schedule.get("TAKT_TIME", 0)
+        if takt_time_raw > 0 and takt_time_raw < 3600:  # If it looks like minutes (less than 1 hour in seconds)
+            takt_time_display = takt_time_raw * 60  # Convert minutes to seconds
+        else:
+            takt_time_display = takt_time_raw  # Already in seconds
+
+        # Get ST (already in seconds from data_loader.py)
+        st_raw = first_part_in_schedule.get("ST", 0)
+        st_display = st_raw  # Already in seconds from data_loader.py
+
+        # Schedule rows hold NumPy scalars; the status only carries plain Python types
+        return {
+            "part_no": _plain(part_no),
+            "model": _plain(first_part_in_schedule.get("MODEL")),
+            "sequence_no": _plain(first_part_in_schedule.get("NO. URUT")),
+            "st": _plain(st_display),
+            "takt_time": _plain(takt_time_display),
+            "total_line_target": line_data["total_line_target"],
+            "child_parts": child_parts
+        }
+
+    def _line_status(self, line_name: str, line_data: dict, since_version: Optional[int] = None) -> dict:
+        process_status = {}
+        current_processing_products = []
+        for p_name, p_data in line_data["processes"].items():
+            if since_version is None or self._process_versions.get((line_name, p_name), 0) > since_version:
+                process_status[p_name] = self._process_status(line_name, p_name, p_data, since_version)
+            cycle_fallback = p_data["config"].cycle_time
+            for unit in p_data["units_in_process"]:
+                cycle_time = unit.get('st', cycle_fallback)
+                if not isinstance(cycle_time, (int, float)) or cycle_time <= 0:
+                    cycle_time = 60
+                current_processing_products.append({
+                    "part_no": unit.get("part_no", "unknown"),
+                    "model": unit.get("model", "unknown"),
+                    "progress": min(100, int(((self.time - unit.get('start_time', self.time)) / cycle_time) * 100))
+                })
+
+        # Calculate takt time countdown for next unit
+        takt_countdown = 0
+        if line_data["production_orders"]:
+            current_order = line_data["production_orders"][0]
+            takt_time = current_order.get('takt_time', 0)
+            # Ensure takt_time is valid, fallback to 60 seconds if not
+            if not isinstance(takt_time, (int, float)) or takt_time <= 0:
+                takt_time = 60 # Fallback to 60 seconds if invalid
+
+            # Use simulation time for countdown calculation
+            time_since_last_start = self.time - line_data.get('last_start_time', 0)
+            takt_countdown = max(0, takt_time - time_since_last_start)
+
+        return {
+            "status": line_data["status"],
+            "total_line_target": line_data["total_line_target"],
+            "remaining_orders": sum(order['quantity'] for order in line_data["production_orders"]),
+            "completed_units": line_data["completed_units"],
+            "scrapped_units": line_data["scrapped_units"],
+            "current_order": self._current_order_info(line_name, line_data),
+            "current_processing_products": current_processing_products,
+            "processes": process_status,
+            "takt_countdown": takt_countdown,
+            "last_start_time": line_data.get('last_start_time', 0)
+        }
+
+    def get_status(self, since_version: Optional[int] = None):
+        """
+        Full status of the simulation, tagged with the current state version.
+
+        With since_version (the "version" of an earlier response) only the lines, processes and
+        stock entries changed after that version are returned under "lines"; the top-level
+        counters are always current. Progress and countdowns of unchanged lines are not resent;
+        clients derive them from current_time and the start times they already have.
+        A since_version the engine has not reached yet (e.g. from before a restart) gets the full status.
+
+        The status holds plain Python types but may contain non-finite floats; the API encodes
+        it with status_serializer, which turns those into null.
+        """
+        if since_version is not None and since_version > self.state_version:
+            since_version = None
+
+        lines_status = {}
+        for line_name, line_data in self.lines.items():
+            if since_version is None or self._line_versions.get(line_name, 0) > since_version:
+                lines_status[line_name] = self._line_status(line_name, line_data, since_version)
+
         total_progress = 0
         if self.total_production_target > 0:
             total_progress = ((self.completed_units + self.scrapped_units) / self.total_production_target) * 100
@@ -976,14 +1230,13 @@ class ProductionEngineV2:
         current_sim_datetime = self.simulation_start_time + pd.Timedelta(seconds=self.time)
         current_shift_name = self.shift_manager['shifts'][self.shift_manager['current_shift_index']]['name']
         
-        # Calculate simulation speed based on configured speed, not real time ratio
-        real_time_elapsed = (datetime.now() - self.simulation_start_time).total_seconds()
-        simulation_time_elapsed = self.time
         # Use configured simulation speed instead of calculating from real time
         speed_ratio = self.simulation_speed
 
         final_status = {
             "status": self.status,
+            "version": self.state_version,
+            "delta": since_version is not None,
             "target_date": self.target_date, # Add the target date here
             "current_time": self.time,
             "simulation_timestamp": current_sim_datetime.strftime("%Y-%m-%d %H:%M:%S"),
@@ -997,5 +1250,29 @@ class ProductionEngineV2:
             "total_production_target": self.total_production_target,
             "production_progress": total_progress,
             "lines": lines_status,
+            "step_timing": self.step_timer.summary(),
         }
-        return self._sanitize_for_json(final_status)
\ No newline at end of file
+        return final_status
+
+
+def select_status_changes(status: dict, versions: dict, since_version: int) -> dict:
+    """
+    Cuts what get_status(since_version) would return out of a full status and the
+    status_versions() taken with it, without touching the engine.
+    """
+    if since_version > versions["version"]:
+        return status
+    lines = {}
+    for line_name, line_status in status["lines"].items():
+        if versions["lines"].get(line_name, 0) <= since_version:
+            continue
+        processes = {}
+        for p_name, process_status in line_status["processes"].items():
+            if versions["processes"].get((line_name, p_name), 0) <= since_version:
+                continue
+            stock_versions = versions["stock"].get((line_name, p_name), {})
+            stock = {material: quantity for material, quantity in process_status["stock"].items()
+                     if stock_versions.get(material, 0) > since_version}
+            processes[p_name] = {**process_status, "stock": stock}
+        lines[line_name] = {**line_status, "processes": processes}
+    return {**status, "delta": True, "lines": lines}
@@ -0,0 +1,167 @@
+"""
+Monte Carlo replications of a scenario: runs independent seeded copies in worker processes
+and reports mean and confidence interval per output metric. Replications are launched in
+waves and stop early once the confidence interval is narrow enough.
+"""
+import os
+import math
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from scipy import stats
+
+from models import BatchScenario
+from batch_runner import simulate_scenario
+from data_loader import load_schedule
+
+LINE_THROUGHPUT_PREFIX = "line_throughput_per_hour:"
+PRODUCTION_METRICS = ("completed_units", "scrapped_units", "throughput_per_hour")
+LOGISTICS_METRICS = ("logistics_utilization", "logistics_completed_tasks")
+
+
+def _run_replication(scenario: BatchScenario, quiet: bool = True) -> Dict[str, float]:
+    """Runs one replication and returns its output metrics."""
+    production_engine, logistics_engine, _ = simulate_scenario(scenario, quiet)
+    hours = production_engine.time / 3600
+    # Keep in sync with PRODUCTION_METRICS / LOGISTICS_METRICS
+    metrics = {
+        "completed_units": production_engine.completed_units,
+        "scrapped_units": production_engine.scrapped_units,
+        "throughput_per_hour": production_engine.completed_units / hours if hours > 0 else 0.0,
+    }
+    for line_name, line_data in production_engine.lines.items():
+        metrics[f"{LINE_THROUGHPUT_PREFIX}{line_name}"] = line_data["completed_units"] / hours if hours > 0 else 0.0
+    if logistics_engine:
+        metrics["logistics_utilization"] = logistics_engine.get_utilization()
+        metrics["logistics_completed_tasks"] = logistics_engine.completed_tasks_count
+    return metrics
+
+
+def check_target_metrics(scenario: BatchScenario, target_metrics: Sequence[str]):
+    """
+    Raises ValueError if a target metric is not produced by the scenario's replications.
+    A missing metric would otherwise count as all zeros, whose zero-width CI always meets the target.
+    """
+    known = set(PRODUCTION_METRICS)
+    if scenario.logistics_setup:
+        known.update(LOGISTICS_METRICS)
+    unknown = [metric for metric in target_metrics if metric not in known and not metric.startswith(LINE_THROUGHPUT_PREFIX)]
+    line_metrics = [metric for metric in target_metrics if metric.startswith(LINE_THROUGHPUT_PREFIX)]
+    if line_metrics:
+        line_names = {str(line).strip() for line in load_schedule(scenario.schedule_file)['LINE'].dropna().unique()}
+        unknown += [metric for metric in line_metrics if metric[len(LINE_THROUGHPUT_PREFIX):] not in line_names]
+    if unknown:
+        raise ValueError(
+            f"Unknown target metric(s): {', '.join(unknown)}. "
+            f"Valid metrics: {', '.join(sorted(known))} or '{LINE_THROUGHPUT_PREFIX}<line name>'"
+        )
+
+
+def confidence_interval(values: Sequence[float], confidence: float = 0.95) -> Dict[str, float]:
+    """Student-t confidence interval of the mean. The interval is None with fewer than two values."""
+    data = np.asarray(values, dtype=float)
+    n = len(data)
+    mean = float(data.mean()) if n else 0.0
+    if n < 2:
+        return {"n": n, "mean": mean, "std": None, "half_width": None, "ci_low": None, "ci_high": None}
+    std = float(data.std(ddof=1))
+    half_width = float(stats.t.ppf((1 + confidence) / 2, n - 1) * std / math.sqrt(n))
+    return {
+        "n": n,
+        "mean": mean,
+        "std": std,
+        "half_width": half_width,
+        "ci_low": mean - half_width,
+        "ci_high": mean + half_width,
+    }
+
+
+def _relative_half_width(summary: Dict[str, float]) -> float:
+    if summary["half_width"] is None:
+        return math.inf
+    if summary["half_width"] == 0:
+        return 0.0
+    if summary["mean"] == 0:
+        return math.inf
+    return summary["half_width"] / abs(summary["mean"])
+
+
+def _replication_seeds(base_seed: Optional[int], count: int) -> List[int]:
+    if base_seed is None:
+        base_seed = int(np.random.SeedSequence().generate_state(1)[0])
+    return [base_seed + i for i in range(count)]
+
+
+def run_replications(
+    scenario: BatchScenario,
+    max_replications: int = 30,
+    min_replications: int = 5,
+    confidence: float = 0.95,
+    target_relative_half_width: float = 0.02,
+    target_metrics: Sequence[str] = ("completed_units",),
+    max_workers: Optional[int] = None,
+    quiet: bool = True,
+) -> dict:
+    """
+    Runs up to max_replications seeded copies of the scenario. After min_replications, every
+    finished wave is checked: once the CI half-width of each target metric is within
+    target_relative_half_width of its mean, no further replications are started.
+    Replication i uses seed scenario.seed + i (a random base seed when the scenario has none).
+    Raises ValueError for target metrics the replications do not produce.
+    """
+    check_target_metrics(scenario, target_metrics)
+    max_workers = max_workers or os.cpu_count() or 1
+    seeds = _replication_seeds(scenario.seed, max_replications)
+    results: List[Dict[str, float]] = []
+    errors: List[dict] = []
+    target_met = False
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        next_index = 0
+        while next_index < max_replications:
+            wave_size = max(max_workers, min_replications - len(results))
+            wave_seeds = seeds[next_index:next_index + wave_size]
+            next_index += len(wave_seeds)
+
+            replicas = [
+                scenario.copy(update={
+                    "seed": seed,
+                    "production_setup": scenario.production_setup.copy(update={"seed": seed}),
+                    "logistics_setup": scenario.logistics_setup.copy(update={"seed": seed}) if scenario.logistics_setup else None,
+                })
+                for seed in wave_seeds
+            ]
+            futures = [executor.submit(_run_replication, replica, quiet) for replica in replicas]
+            for seed, future in zip(wave_seeds, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    errors.append({"seed": seed, "error": f"{type(e).__name__}: {e}"})
+
+            if len(results) >= max(min_replications, 2):
+                # Metrics are checked up front; a scheduled line without orders on the target date has no throughput entry
+                target_met = all(
+                    _relative_half_width(confidence_interval([r.get(metric, 0.0) for r in results], confidence)) <= target_relative_half_width
+                    for metric in target_metrics
+                )
+                print(f"INFO: {len(results)} replications done, CI target {'met' if target_met else 'not met'}")
+                if target_met:
+                    break
+
+    metric_names = sorted({name for result in results for name in result})
+    summaries = {name: confidence_interval([r.get(name, 0.0) for r in results], confidence) for name in metric_names}
+    return {
+        "replications": len(results),
+        "seeds": seeds[:next_index],
+        "confidence": confidence,
+        "target_relative_half_width": target_relative_half_width,
+        "target_metrics": list(target_metrics),
+        "target_met": target_met,
+        "metrics": {name: summary for name, summary in summaries.items() if not name.startswith(LINE_THROUGHPUT_PREFIX)},
+        "line_throughput_per_hour": {
+            name[len(LINE_THROUGHPUT_PREFIX):]: summary
+            for name, summary in summaries.items() if name.startswith(LINE_THROUGHPUT_PREFIX)
+        },
+        "errors": errors,
+    }
@@ -0,0 +1,97 @@
+"""
+Milk-run route planner for tow trains.
+
+Combines the demand of several destinations served from the same issue location into
+multi-drop tours, using a nearest-neighbour heuristic over a distance lookup.
+"""
+from typing import Callable, Dict, List, Optional, Tuple
+
+from models import TransportTask, TransportDrop
+
+# (from_location, to_location) -> (distance in meters, travel time in seconds)
+DistanceLookup = Callable[[str, str], Tuple[float, float]]
+
+
+def plan_milk_runs(
+    origin: str,
+    demands: Dict[Tuple[str, Optional[str]], Dict[str, int]],
+    capacity: int,
+    max_stops: int,
+    distance_lookup: DistanceLookup,
+    transport_unit_names: List[str],
+    loading_time: float = 30,
+    unloading_time: float = 30,
+) -> List[TransportTask]:
+    """
+    Builds tours starting and ending at `origin`.
+
+    demands maps (destination, target_process) to lots per material. Every tour visits at
+    most max_stops stops and carries at most `capacity` lots. From each position, the tour
+    goes to the nearest stop that still has demand, and ties keep the order of `demands`.
+    A stop whose demand does not fit is served partly and the rest goes on a later tour.
+    """
+    remaining = {stop: dict(lots) for stop, lots in demands.items() if sum(lots.values()) > 0}
+    tours = []
+
+    while remaining:
+        position, space, drops = origin, capacity, []
+        tour_distance = 0.0
+        while remaining and space > 0 and len(drops) < max_stops:
+            candidates = [stop for stop in remaining if all(stop != (d.destination, d.target_process) for d in drops)]
+            if not candidates:
+                break
+            stop = min(candidates, key=lambda s: distance_lookup(position, s[0])[0])
+            distance, travel_time = distance_lookup(position, stop[0])
+
+            load = {}
+            for material, lots in list(remaining[stop].items()):
+                take = min(lots, space)
+                if take == 0:
+                    break
+                load[material] = take
+                space -= take
+                if lots > take:
+                    remaining[stop][material] = lots - take
+                else:
+                    del remaining[stop][material]
+            if not remaining[stop]:
+                del remaining[stop]
+
+            drops.append(TransportDrop(
+                destination=stop[0],
+                target_process=stop[1],
+                load=load,
+                travel_time=travel_time,
+                distance=distance,
+                unloading_time=unloading_time
+            ))
+            tour_distance += distance
+            position = stop[0]
+
+        return_distance, return_time = distance_lookup(position, origin)
+        tours.append(_tour_task(origin, drops, tour_distance + return_distance, return_time, transport_unit_names, loading_time))
+
+    return tours
+
+
+def _tour_task(origin: str, drops: List[TransportDrop], distance: float, return_time: float, transport_unit_names: List[str], loading_time: float) -> TransportTask:
+    total_load: Dict[str, int] = {}
+    for drop in drops:
+        for material, lots in drop.load.items():
+            total_load[material] = total_load.get(material, 0) + lots
+    return TransportTask(
+        material=next(iter(total_load)),
+        lots_required=sum(total_load.values()),
+        load=total_load,
+        drops=drops,
+        origin=origin,
+        destination=drops[-1].destination,
+        target_process=drops[-1].target_process,
+        transport_unit_names=transport_unit_names,
+        loading_time=loading_time,
+        # The task-level times must be positive; a leg between co-located stops can be 0
+        travel_time=drops[0].travel_time or 1,
+        unloading_time=sum(drop.unloading_time for drop in drops),
+        return_time=return_time or 1,
+        distance=distance or 1
+    )
@@ -0,0 +1,103 @@
+"""
+Leveled, rate-limited logging for the simulation engines.
+
+The engines used to print on every step; in long runs writing to stdout cost more than the
+simulation itself. Messages now go through a logger per category (e.g. "logistics.dispatch")
+that drops them below the configured level and caps how many it prints per second.
+Debug output is off by default, so hot loops only pay for a flag check.
+
+Environment variables:
+    SIM_LOG_LEVEL  minimum level printed: DEBUG, INFO (default), WARNING or ERROR
+    SIM_DEBUG      comma-separated categories (or prefixes such as "logistics") that print
+                   DEBUG messages regardless of SIM_LOG_LEVEL; "*" enables all
+
+Messages are printed to the current sys.stdout as "LEVEL: message", the format the engines
+always used, so redirect_stdout (as in the batch runner) still silences them.
+"""
+import os
+import time
+from typing import Dict, Iterable, Optional
+
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+LEVELS = {name: level for level, name in LEVEL_NAMES.items()}
+
+_level = LEVELS.get(os.environ.get("SIM_LOG_LEVEL", "INFO").strip().upper(), INFO)
+_debug_categories = {c.strip() for c in os.environ.get("SIM_DEBUG", "").split(",") if c.strip()}
+_loggers: Dict[str, "SimLogger"] = {}
+
+
+class SimLogger:
+    """
+    Logger for one category. debug_enabled can be checked before building an expensive
+    message. With max_per_second set, messages beyond that rate are dropped and counted;
+    the count is reported with the next message that gets through.
+    """
+
+    def __init__(self, category: str, max_per_second: Optional[float] = None):
+        self.category = category
+        self.max_per_second = max_per_second
+        self.level = INFO
+        self.debug_enabled = False
+        self._window_start = 0.0
+        self._window_count = 0
+        self._suppressed = 0
+        self._apply_config()
+
+    def _apply_config(self):
+        debug = "*" in _debug_categories or any(
+            self.category == c or self.category.startswith(c + ".") for c in _debug_categories
+        )
+        self.level = DEBUG if debug else _level
+        self.debug_enabled = self.level <= DEBUG
+
+    def debug(self, message: str, *args):
+        if self.debug_enabled:
+            self._emit(DEBUG, message, args)
+
+    def info(self, message: str, *args):
+        if self.level <= INFO:
+            self._emit(INFO, message, args)
+
+    def warning(self, message: str, *args):
+        if self.level <= WARNING:
+            self._emit(WARNING, message, args)
+
+    def error(self, message: str, *args):
+        self._emit(ERROR, message, args)
+
+    def _emit(self, level: int, message: str, args: tuple):
+        if self.max_per_second is not None and level < ERROR:
+            now = time.monotonic()
+            if now - self._window_start >= 1.0:
+                self._window_start = now
+                self._window_count = 0
+            if self._window_count >= self.max_per_second:
+                self._suppressed += 1
+                return
+            self._window_count += 1
+        if args:
+            message = message % args
+        if self._suppressed:
+            message = f"{message} ({self._suppressed} similar messages suppressed)"
+            self._suppressed = 0
+        print(f"{LEVEL_NAMES[level]}: {message}")
+
+
+def get_logger(category: str, max_per_second: Optional[float] = None) -> SimLogger:
+    """Returns the logger of a category, creating it on first use."""
+    logger = _loggers.get(category)
+    if logger is None:
+        logger = _loggers[category] = SimLogger(category, max_per_second)
+    return logger
+
+
+def configure(level: Optional[str] = None, debug_categories: Optional[Iterable[str]] = None):
+    """Changes the level and/or debug categories at runtime, for every logger."""
+    global _level, _debug_categories
+    if level is not None:
+        _level = LEVELS[level.upper()]
+    if debug_categories is not None:
+        _debug_categories = set(debug_categories)
+    for logger in _loggers.values():
+        logger._apply_config()
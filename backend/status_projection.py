@@ -0,0 +1,107 @@
+"""
+Field projection and pagination for the status endpoints.
+
+A full status carries the BOM child parts of every unit and order, every stock dict, every
+transport unit and the whole event log. Clients pick the sections they need with
+include=lines,stock,... and page through the large collections with offset/limit (each
+logistics collection has its own pair), so a dashboard can poll a light summary and fetch
+details on demand.
+
+Sections:
+    lines        production lines with their processes (paginated)
+    stock        per-process stock (production) or per-location stock (logistics)
+    child_parts  BOM child parts of units in process and current orders
+    units        transport units (paginated)
+    event_log    logistics event log (paginated)
+
+The status passed in is never modified, since it may be a shared snapshot.
+"""
+from typing import List, Optional, Set, Tuple
+
+STATUS_SECTIONS = ("lines", "stock", "child_parts", "units", "event_log")
+
+
+def parse_sections(include: Optional[str]) -> Optional[Set[str]]:
+    """
+    Parses a comma-separated include parameter. None means every section; an empty string
+    means the summary only. Raises ValueError on unknown section names.
+    """
+    if include is None:
+        return None
+    sections = {section.strip() for section in include.split(",") if section.strip()}
+    unknown = sections.difference(STATUS_SECTIONS)
+    if unknown:
+        raise ValueError(f"Unknown status section(s): {', '.join(sorted(unknown))}. Valid sections: {', '.join(STATUS_SECTIONS)}")
+    return sections
+
+
+def paginate(items: List, offset: int = 0, limit: Optional[int] = None) -> Tuple[List, dict]:
+    """Returns the page and its {offset, limit, total} description."""
+    offset = max(0, offset)
+    page = items[offset:] if limit is None else items[offset:offset + limit]
+    return page, {"offset": offset, "limit": limit, "total": len(items)}
+
+
+def _without_child_parts(data: Optional[dict]) -> Optional[dict]:
+    if data is None:
+        return None
+    return {key: value for key, value in data.items() if key != "child_parts"}
+
+
+def _project_process(process_status: dict, sections: Set[str]) -> dict:
+    projected = dict(process_status)
+    if "stock" not in sections:
+        projected.pop("stock", None)
+    if "child_parts" not in sections:
+        projected["units_in_process"] = [_without_child_parts(unit) for unit in process_status.get("units_in_process", [])]
+    return projected
+
+
+def project_production_status(status: dict, sections: Optional[Set[str]] = None, offset: int = 0, limit: Optional[int] = None) -> dict:
+    """Keeps the requested sections of a ProductionEngineV2 status and pages its lines."""
+    if "lines" not in status or (sections is None and offset == 0 and limit is None):
+        return status
+    projected = dict(status)
+    if sections is not None and "lines" not in sections:
+        projected.pop("lines")
+        return projected
+
+    page, page_info = paginate(list(status["lines"].items()), offset, limit)
+    lines = {}
+    for line_name, line_status in page:
+        if sections is not None:
+            line_status = dict(line_status)
+            line_status["processes"] = {
+                p_name: _project_process(process_status, sections)
+                for p_name, process_status in line_status.get("processes", {}).items()
+            }
+            if "child_parts" not in sections:
+                line_status["current_order"] = _without_child_parts(line_status.get("current_order"))
+        lines[line_name] = line_status
+    projected["lines"] = lines
+    projected["pagination"] = {"lines": page_info}
+    return projected
+
+
+def project_logistics_status(status: dict, sections: Optional[Set[str]] = None,
+                             units_offset: int = 0, units_limit: Optional[int] = None,
+                             log_offset: int = 0, log_limit: Optional[int] = None) -> dict:
+    """
+    Keeps the requested sections of a LogisticsSimulationEngine status. The transport units and
+    the event log are paged independently, each with its own offset/limit.
+    """
+    pages = {"transport_units": (units_offset, units_limit), "event_log": (log_offset, log_limit)}
+    if "transport_units" not in status or (sections is None and all(page == (0, None) for page in pages.values())):
+        return status
+    projected = dict(status)
+    pagination = {}
+    for section, key in (("units", "transport_units"), ("event_log", "event_log")):
+        if sections is not None and section not in sections:
+            projected.pop(key, None)
+        else:
+            offset, limit = pages[key]
+            projected[key], pagination[key] = paginate(list(status.get(key, [])), offset, limit)
+    if sections is not None and "stock" not in sections:
+        projected["locations"] = [{"name": location["name"]} for location in status.get("locations", [])]
+    projected["pagination"] = pagination
+    return projected
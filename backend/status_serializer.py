@@ -0,0 +1,115 @@
+"""
+Serialization of simulation status for the API.
+
+The engines return status built from plain Python types. Encoding happens in one pass
+here, with no recursive cleanup walk first:
+  - JSON through orjson when it is installed. orjson writes NaN/Infinity as null and encodes
+    NumPy scalars and datetimes natively. Without orjson the standard library is used.
+    Its slow NaN cleanup only runs when a non-finite float is actually present.
+  - MessagePack when the client sends Accept: application/msgpack and msgpack is installed.
+  - gzip when the client accepts it and the body is large enough to be worth compressing.
+
+orjson and msgpack are optional (pip install orjson msgpack); everything works without them.
+"""
+import gzip
+import json
+import math
+from collections import deque
+from datetime import date, datetime
+
+import numpy as np
+from fastapi import Request, Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+# Smaller bodies are sent uncompressed; gzip would barely shrink them
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 5
+
+
+def _default(value):
+    """Types the encoders do not handle natively."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (set, frozenset, deque)):
+        return list(value)
+    raise TypeError(f"Type {type(value).__name__} is not serializable")
+
+
+def _replace_non_finite(data):
+    # NumPy values become plain Python first, or a NaN np.float32 would slip past the check
+    if isinstance(data, (np.generic, np.ndarray)):
+        data = data.tolist()
+    if isinstance(data, dict):
+        return {key: _replace_non_finite(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [_replace_non_finite(element) for element in data]
+    if isinstance(data, float) and not math.isfinite(data):
+        return None
+    return data
+
+
+def encode_json(data) -> bytes:
+    """Compact JSON; non-finite floats become null."""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    try:
+        text = json.dumps(data, default=_default, separators=(",", ":"), allow_nan=False)
+    except ValueError:
+        # Only reached when the status holds NaN/Infinity
+        text = json.dumps(_replace_non_finite(data), default=_default, separators=(",", ":"), allow_nan=False)
+    return text.encode("utf-8")
+
+
+def encode_msgpack(data) -> bytes:
+    """MessagePack; floats keep their IEEE value, so non-finite values survive as such."""
+    if msgpack is None:
+        raise RuntimeError("msgpack is not installed")
+    return msgpack.packb(data, default=_default, use_bin_type=True)
+
+
+def _accepts(header: str, token: str) -> bool:
+    """True if a comma-separated Accept(-Encoding) header lists token without q=0."""
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() != token:
+            continue
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def status_response(data, request: Request) -> Response:
+    """Encodes a status dict in the format the client asked for, gzipped if it accepts gzip."""
+    accept = request.headers.get("accept", "")
+    if msgpack is not None and any(_accepts(accept, media_type) for media_type in MSGPACK_MEDIA_TYPES):
+        body, media_type = encode_msgpack(data), MSGPACK_MEDIA_TYPE
+    else:
+        body, media_type = encode_json(data), JSON_MEDIA_TYPE
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if len(body) >= GZIP_MIN_BYTES and _accepts(request.headers.get("accept-encoding", ""), "gzip"):
+        body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type=media_type, headers=headers)
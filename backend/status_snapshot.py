@@ -0,0 +1,78 @@
+"""
+Double-buffered status snapshots.
+
+The production V2 loop steps the engine in a worker thread while status requests are served on
+other threads. Building the status on the request thread competes with the loop and can read
+lines halfway through a step. Instead the loop builds a snapshot between steps, every N steps
+or T milliseconds, into the back buffer and then swaps it to the front. Requests only read the
+front snapshot, so they never wait for the loop and never see a half-finished step.
+
+Snapshots are treated as immutable: nothing writes to a status dict once it is published.
+
+Environment variables:
+    STATUS_SNAPSHOT_STEPS  publish at least every this many steps (default 10)
+    STATUS_SNAPSHOT_MS     publish at least every this many milliseconds (default 250)
+"""
+import os
+import threading
+import time
+from typing import Callable, NamedTuple, Optional, Tuple
+
+DEFAULT_EVERY_STEPS = int(os.environ.get("STATUS_SNAPSHOT_STEPS", "10"))
+DEFAULT_EVERY_MS = float(os.environ.get("STATUS_SNAPSHOT_MS", "250"))
+
+
+class StatusSnapshot(NamedTuple):
+    sequence: int
+    published_at: float  # time.monotonic() of the publish
+    status: dict
+    versions: Optional[dict] = None  # change stamps taken with the status, for deltas
+
+
+class SnapshotBuffer:
+    """
+    Two snapshot slots: the front one is read by requests, the back one is written by the
+    simulation loop. Publishing fills the back slot and flips the front index, a single
+    assignment, so readers need no lock.
+    """
+
+    def __init__(self, every_steps: int = DEFAULT_EVERY_STEPS, every_ms: float = DEFAULT_EVERY_MS):
+        self.every_steps = every_steps
+        self.every_ms = every_ms
+        self._slots = [None, None]
+        self._front = 0
+        self._sequence = 0
+        self._steps_since_publish = 0
+        self._publish_lock = threading.Lock()
+
+    def latest(self) -> Optional[StatusSnapshot]:
+        return self._slots[self._front]
+
+    def step_done(self, build: Callable[[], Tuple[dict, Optional[dict]]]) -> bool:
+        """
+        Called by the simulation loop after each step; publishes build() when the step or
+        time interval has passed. build returns the status and its change stamps (or None).
+        """
+        self._steps_since_publish += 1
+        latest = self.latest()
+        if latest is not None and self._steps_since_publish < self.every_steps \
+                and (time.monotonic() - latest.published_at) * 1000.0 < self.every_ms:
+            return False
+        status, versions = build()
+        self.publish(status, versions)
+        return True
+
+    def publish(self, status: dict, versions: Optional[dict] = None) -> StatusSnapshot:
+        with self._publish_lock:
+            self._sequence += 1
+            back = 1 - self._front
+            snapshot = StatusSnapshot(self._sequence, time.monotonic(), status, versions)
+            self._slots[back] = snapshot
+            self._front = back
+            self._steps_since_publish = 0
+        return snapshot
+
+    def clear(self):
+        with self._publish_lock:
+            self._slots = [None, None]
+            self._steps_since_publish = 0
@@ -0,0 +1,114 @@
+"""
+Push-based status streaming.
+
+Polling viewers each trigger their own get_status rebuild. A StatusBroadcaster instead lets
+the simulation loop build and serialize the status once per frame, at most rate_hz times per
+second and only while someone is listening, and hands the same bytes to every subscriber.
+Subscribers always get the latest frame; a slow one skips frames instead of queueing them.
+
+The loop may run in a worker thread (production V2) or on the event loop (logistics), so
+publishing is thread-safe and subscribers are woken with call_soon_threadsafe.
+
+Environment variables:
+    STATUS_STREAM_RATE  frames per second published per stream (default 2)
+"""
+import asyncio
+import math
+import os
+import threading
+import time
+from typing import AsyncIterator, Callable, Optional
+
+from status_serializer import encode_json
+
+DEFAULT_RATE_HZ = float(os.environ.get("STATUS_STREAM_RATE", "2"))
+
+
+def encode_frame(status: dict) -> bytes:
+    """Compact JSON of a status dict, encoded once and shared by all subscribers."""
+    return encode_json(status)
+
+
+class _Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.wakeup = asyncio.Event()
+
+
+class StatusBroadcaster:
+    """
+    Latest serialized status frame of one simulation, shared by all subscribers.
+
+    The simulation loop calls publish_if_due(build_status) after each step; build_status is only
+    called when a frame is due. publish() sends a frame right away, e.g. the final one.
+    """
+
+    def __init__(self, name: str, rate_hz: float = DEFAULT_RATE_HZ):
+        self.name = name
+        self.rate_hz = rate_hz
+        self.frame: Optional[bytes] = None
+        self.sequence = 0
+        self._last_publish = -math.inf
+        self._lock = threading.Lock()
+        self._subscribers = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def due(self) -> bool:
+        """True if someone is listening and the last frame is at least 1/rate_hz old."""
+        if not self._subscribers:
+            return False
+        return time.monotonic() - self._last_publish >= 1.0 / self.rate_hz
+
+    def publish_if_due(self, build_status: Callable[[], dict]) -> bool:
+        if not self.due():
+            return False
+        self.publish(build_status())
+        return True
+
+    def publish(self, status: dict):
+        frame = encode_frame(status)
+        with self._lock:
+            self.frame = frame
+            self.sequence += 1
+            self._last_publish = time.monotonic()
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.wakeup.set)
+            except RuntimeError:
+                # Event loop already closed; the subscriber is gone
+                self._subscribers.discard(subscriber)
+
+    def reset(self):
+        """Forgets the last frame, e.g. when a new simulation replaces the old one."""
+        with self._lock:
+            self.frame = None
+            self._last_publish = -math.inf
+
+    async def subscribe(self) -> AsyncIterator[bytes]:
+        """
+        Yields the latest frame whenever a new one is published, starting with the current
+        one if there is any. Must be iterated on the event loop that serves the request.
+        """
+        subscriber = _Subscriber(asyncio.get_running_loop())
+        self._subscribers.add(subscriber)
+        try:
+            last_sequence = -1
+            while True:
+                with self._lock:
+                    frame, sequence = self.frame, self.sequence
+                if frame is not None and sequence != last_sequence:
+                    last_sequence = sequence
+                    yield frame
+                await subscriber.wakeup.wait()
+                subscriber.wakeup.clear()
+        finally:
+            self._subscribers.discard(subscriber)
+
+    async def sse_events(self) -> AsyncIterator[bytes]:
+        """subscribe() framed as server-sent events."""
+        async for frame in self.subscribe():
+            yield b"event: status\ndata: " + frame + b"\n\n"
@@ -0,0 +1,81 @@
+"""
+Step timing for the simulation engines.
+
+Each step is timed as a whole and per phase (e.g. requests, dispatch, progression for
+logistics) into fixed-size NumPy ring buffers. Recording is O(1) per step; percentiles are only
+computed when a summary is requested.
+"""
+import time
+from typing import Dict, Sequence
+
+import numpy as np
+
+
+class StepTimer:
+    """
+    Wall-clock timings of the last `capacity` steps, per phase and in total.
+
+    Usage per step: start_step(), mark(phase) after each phase, end_step(). Time between two
+    marks is booked on the phase of the second mark; phases not reached in a step count as 0.
+    """
+
+    def __init__(self, phases: Sequence[str], capacity: int = 1000):
+        self.phases = list(phases)
+        self.capacity = capacity
+        self._phase_index = {phase: i for i, phase in enumerate(self.phases)}
+        # Columns: one per phase, the last one is the step total
+        self._samples = np.zeros((capacity, len(self.phases) + 1), dtype=np.float64)
+        self._current = np.zeros(len(self.phases) + 1, dtype=np.float64)
+        self._position = 0
+        self.count = 0
+        self._window_total = 0.0
+        self._step_start = None
+        self._last_mark = None
+
+    def start_step(self):
+        self._current[:] = 0.0
+        self._step_start = self._last_mark = time.perf_counter()
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self._current[self._phase_index[phase]] += now - self._last_mark
+        self._last_mark = now
+
+    def end_step(self) -> float:
+        """Stores the step and returns its total time in seconds."""
+        total = time.perf_counter() - self._step_start
+        self._current[-1] = total
+        self._window_total += total - self._samples[self._position, -1]
+        self._samples[self._position] = self._current
+        self._position = (self._position + 1) % self.capacity
+        self.count += 1
+        return total
+
+    @property
+    def mean_step_time(self) -> float:
+        """Mean total step time in seconds over the buffered steps."""
+        filled = min(self.count, self.capacity)
+        return self._window_total / filled if filled else 0.0
+
+    def summary(self) -> Dict:
+        """
+        mean/p50/p95/p99/max in milliseconds over the buffered steps, for the total and each
+        phase, plus the number of steps recorded so far.
+        """
+        filled = min(self.count, self.capacity)
+        samples = self._samples[:filled] * 1000.0
+        columns = self.phases + ["total"]
+        stats = {}
+        for i, name in enumerate(columns):
+            if filled:
+                p50, p95, p99 = np.percentile(samples[:, i], [50, 95, 99])
+                stats[name] = {
+                    "mean_ms": float(samples[:, i].mean()),
+                    "p50_ms": float(p50),
+                    "p95_ms": float(p95),
+                    "p99_ms": float(p99),
+                    "max_ms": float(samples[:, i].max()),
+                }
+            else:
+                stats[name] = {"mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        return {"steps": self.count, "window": filled, "total": stats.pop("total"), "phases": stats}
@@ -34,7 +34,8 @@ function Dashboard({ onBack }) {
     try {
       const [prodRes, logRes] = await Promise.all([
         axios.get(`${API_URL}/production/status`),
-        axios.get(`${API_URL}/logistics/status`)
+        // Ringkasan saja: tanpa daftar unit, event log dan stok
+        axios.get(`${API_URL}/logistics/status`, { params: { include: '' } })
       ]);
       
       setSystemStatus({
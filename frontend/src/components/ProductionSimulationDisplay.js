@@ -25,6 +25,43 @@ ChartJS.register(
 
 const API_URL = 'http://localhost:8000';
 
+// Gabungkan status delta (hanya lini/proses/stok yang berubah) ke status sebelumnya,
+// lalu hitung ulang progres unit dari current_time untuk lini yang tidak dikirim ulang.
+const mergeStatusDelta = (previous, next) => {
+  if (!next.delta || !previous || !previous.lines) {
+    return next;
+  }
+  const lines = { ...previous.lines };
+  Object.entries(next.lines || {}).forEach(([lineName, lineDelta]) => {
+    const previousLine = lines[lineName] || { processes: {} };
+    const processes = { ...previousLine.processes };
+    Object.entries(lineDelta.processes).forEach(([processName, processDelta]) => {
+      const previousProcess = processes[processName] || { stock: {} };
+      processes[processName] = { ...processDelta, stock: { ...previousProcess.stock, ...processDelta.stock } };
+    });
+    lines[lineName] = { ...lineDelta, processes };
+  });
+  Object.entries(lines).forEach(([lineName, lineData]) => {
+    const processes = {};
+    Object.entries(lineData.processes).forEach(([processName, processData]) => {
+      processes[processName] = {
+        ...processData,
+        units_in_process: processData.units_in_process.map(unit => {
+          const elapsed = next.current_time - unit.start_time;
+          return {
+            ...unit,
+            elapsed_time: elapsed,
+            remaining_time: Math.max(0, unit.cycle_time - elapsed),
+            progress: Math.min(100, Math.max(0, Math.floor((elapsed / unit.cycle_time) * 100))),
+          };
+        }),
+      };
+    });
+    lines[lineName] = { ...lineData, processes };
+  });
+  return { ...next, lines };
+};
+
 const UnitProgressBar = memo(({ progress }) => (
   <div className="progress" style={{ height: '10px', margin: '2px 0', backgroundColor: '#e9ecef' }}>
     <div
@@ -130,6 +167,7 @@ const ProductionSimulationDisplay = ({ config, onBack }) => {
 
   useEffect(() => {
     let intervalId;
+    let lastStatus = null;
 
     const startSimulation = async () => {
       try {
@@ -153,8 +191,10 @@ const ProductionSimulationDisplay = ({ config, onBack }) => {
 
     const fetchStatus = async () => {
       try {
-        const response = await axios.get(`${API_URL}/v2/production/status`);
-        const newStatus = response.data;
+        const params = lastStatus && lastStatus.version !== undefined ? { since_version: lastStatus.version } : {};
+        const response = await axios.get(`${API_URL}/v2/production/status`, { params });
+        const newStatus = mergeStatusDelta(lastStatus, response.data);
+        lastStatus = newStatus;
         setStatus(newStatus);
 
         // Kumpulkan data untuk grafik
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Shared fakes and builders for the test scripts.
+"""
+
+import sys
+import os
+from collections import deque, defaultdict
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from models import SimulationSetup
+from bom_service import BOMService
+from data_loader import load_schedule
+from production_engine_v2 import ProductionEngineV2
+
+SCHEDULE_FILE = os.path.join(os.path.dirname(__file__), "20250912-Schedule FA1.csv")
+
+
+class StockRecorder:
+    """Stands in for the production engine and records every delivery."""
+    def __init__(self):
+        self.delivered = defaultdict(int)
+        self.delivered_to = defaultdict(int)
+
+    def has_process(self, line_name, process_name):
+        return True
+
+    def add_stock(self, destination, material, quantity):
+        self.delivered[material] += quantity
+        self.delivered_to[(destination, material)] += quantity
+
+
+def build_production_engine(event_driven=False, empty_stock=False, material_request_queue=None):
+    """
+    A running ProductionEngineV2 on the 15-Sep schedule with seed 7 and a synthetic BOM, so that
+    every scheduled part consumes COMP-A and COMP-B. With empty_stock every line starts out
+    waiting for material.
+    """
+    bom_service = BOMService()
+    bom_service.material_data = {}
+    schedule_df = load_schedule(SCHEDULE_FILE)
+    bom_service.bom_data = {part: ['COMP-A', 'COMP-B'] for part in schedule_df['PART NO'].dropna()}
+
+    setup = SimulationSetup(line_processes={}, event_driven=event_driven, seed=7)
+    queue = deque() if material_request_queue is None else material_request_queue
+    engine = ProductionEngineV2(setup, SCHEDULE_FILE, bom_service, queue, target_date='15-Sep')
+    if empty_stock:
+        for line_data in engine.lines.values():
+            for process_data in line_data["processes"].values():
+                process_data["stock"].clear()
+    engine.status = "running"
+    return engine
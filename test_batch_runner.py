@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test script for the headless batch runner.
+"""
+
+import sys
+import os
+import tempfile
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from models import BatchScenario, SimulationSetup, LogisticsSimulationSetup, Location, TransportUnit, TransportTask
+from data_loader import load_schedule
+import batch_runner
+from batch_runner import run_batch, run_scenario
+
+SCHEDULE_FILE = os.path.join(os.path.dirname(__file__), "20250912-Schedule FA1.csv")
+
+
+def create_scenarios(bom_file, fleet_sizes):
+    scenarios = []
+    for fleet_size in fleet_sizes:
+        units = [TransportUnit(name=f"Kururu {i}", type="Kururu") for i in range(fleet_size)]
+        logistics_setup = LogisticsSimulationSetup(
+            locations=[Location(name="WAREHOUSE"), Location(name="ASSEMBLY")],
+            transport_units=units,
+            tasks=[TransportTask(origin="WAREHOUSE", destination="ASSEMBLY", material="DUMMY", lots_required=1,
+                                 distance=100, travel_time=60, loading_time=10, unloading_time=10,
+                                 transport_unit_names=[unit.name for unit in units])],
+            event_driven=True
+        )
+        scenarios.append(BatchScenario(
+            name=f"fleet-{fleet_size}",
+            production_setup=SimulationSetup(line_processes={}, event_driven=True),
+            logistics_setup=logistics_setup,
+            schedule_file=SCHEDULE_FILE,
+            bom_file=bom_file,
+            target_date='15-Sep',
+            seed=7,
+            max_sim_time=4 * 3600
+        ))
+    return scenarios
+
+
+def test_run_batch():
+    print("🔍 Testing batch runner...")
+    schedule_df = load_schedule(SCHEDULE_FILE)
+    with tempfile.TemporaryDirectory() as work_dir:
+        bom_file = os.path.join(work_dir, "bom.txt")
+        with open(bom_file, 'w') as f:
+            for part in schedule_df['PART NO'].dropna().unique():
+                f.write(f"{part} COMP-A\n{part} COMP-B\n")
+
+        scenarios = create_scenarios(bom_file, fleet_sizes=[1, 2, 3])
+        summary = run_batch(scenarios, max_workers=2)
+
+    print(summary[['scenario', 'fleet_size', 'sim_time_s', 'completed_units', 'scrapped_units', 'error']])
+    assert list(summary['scenario']) == ['fleet-1', 'fleet-2', 'fleet-3']
+    assert summary['error'].isna().all()
+    assert (summary['completed_units'] > 0).all()
+    # Same seed and same production setup: the production results must not depend on the worker
+    assert summary['completed_units'].nunique() == 1
+    assert summary['scrapped_units'].nunique() == 1
+    print("✅ Batch runner works")
+
+
+def test_stalled_run_ends():
+    """A run without max_sim_time that waits for material nobody delivers ends as stalled"""
+    print("🔍 Testing stalled batch run...")
+    schedule_df = load_schedule(SCHEDULE_FILE)
+    with tempfile.TemporaryDirectory() as work_dir:
+        bom_file = os.path.join(work_dir, "bom.txt")
+        with open(bom_file, 'w') as f:
+            for part in schedule_df['PART NO'].dropna().unique():
+                f.write(f"{part} COMP-A\n")
+        scenario = BatchScenario(
+            name="no-material",
+            production_setup=SimulationSetup(line_processes={}, event_driven=True),
+            schedule_file=SCHEDULE_FILE,
+            bom_file=bom_file,
+            target_date='15-Sep',
+            seed=7,
+            max_sim_time=None
+        )
+
+        original_build = batch_runner.build_engines
+
+        def build_without_stock(scenario):
+            # No stock and no logistics: no line can ever start a unit
+            production_engine, logistics_engine = original_build(scenario)
+            for line_data in production_engine.lines.values():
+                for process_data in line_data["processes"].values():
+                    process_data["stock"].clear()
+            return production_engine, logistics_engine
+
+        batch_runner.build_engines = build_without_stock
+        try:
+            row = run_scenario(scenario, quiet=True)
+        finally:
+            batch_runner.build_engines = original_build
+
+    assert row["error"] is None
+    assert row["status"] == "stalled"
+    assert row["completed_units"] == 0
+    # Quiet mode silences the log, so the stall must show up in the summary row
+    assert row["note"].startswith("stalled at")
+    print(f"Stalled after {row['steps']} steps: {row['note']}")
+    print("✅ Stalled batch run ends")
+
+
+if __name__ == "__main__":
+    test_run_batch()
+    test_stalled_run_ends()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test script for the BOMService component index.
+"""
+
+import sys
+import os
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from bom_service import BOMService
+
+
+def create_bom_service():
+    bom_service = BOMService()
+    bom_service.material_data = {
+        'SUB-1': {'MRPC': 'P01', 'SPT': ''},
+        'SCREW': {'MRPC': 'L01', 'SPT': '40'},
+        'PANEL': {'MRPC': 'L01', 'SPT': ''},
+    }
+    bom_service.bom_data = {
+        'PIANO': ['SUB-1', 'PANEL'],
+        'SUB-1': ['SCREW', 'SCREW', 'PANEL'],
+    }
+    return bom_service
+
+
+def test_component_index():
+    print("🔍 Testing BOM component index...")
+    bom_service = create_bom_service()
+    bom_service.build_component_index(['PIANO', 'SUB-1'])
+
+    components = bom_service.get_components('PIANO')
+    assert [c['component'] for c in components] == ['SUB-1', 'PANEL']
+    # Served from the index on the second call
+    assert bom_service.get_components('PIANO') is components
+
+    filtered = bom_service.get_components('PIANO', mrpc_filter='l01')
+    assert [c['component'] for c in filtered] == ['PANEL']
+    assert bom_service.get_components('PIANO', mrpc_filter='L01') is filtered
+
+    # Reloading BOM data must drop stale entries
+    bom_service.bom_data = {'PIANO': ['PANEL']}
+    assert [c['component'] for c in bom_service.get_components('PIANO')] == ['PANEL']
+    print("✅ Component index works")
+
+
+def test_aggregated_components():
+    print("🔍 Testing aggregated BOM quantities...")
+    bom_service = create_bom_service()
+
+    aggregated = bom_service.get_components_aggregated('SUB-1')
+    assert aggregated.components == ('SCREW', 'PANEL')
+    assert aggregated.quantities == (2, 1)
+    assert bom_service.get_components_aggregated('SUB-1') is aggregated
+    assert bom_service.get_components_aggregated('UNKNOWN') == ((), ())
+    print("✅ Aggregated quantities work")
+
+
+if __name__ == "__main__":
+    test_component_index()
+    test_aggregated_components()
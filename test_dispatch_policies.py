@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Test script for the logistics dispatch policies and the policy benchmark.
+"""
+
+import sys
+import os
+import random
+import tempfile
+from collections import deque
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from models import (TransportUnit, TransportTask, Location, LogisticsSimulationSetup, LocationDistance,
+                    SimulationSetup, BatchScenario)
+from logistics_simulation import LogisticsSimulationEngine
+from dispatch_benchmark import run_benchmark
+from dispatch import DISPATCH_POLICIES, NearestUnitPolicy
+
+
+def _setup(policy="fifo"):
+    return LogisticsSimulationSetup(
+        locations=[Location(name="WH"), Location(name="LINE-A"), Location(name="LINE-B")],
+        transport_units=[
+            TransportUnit(name="Big", type="Forklift", capacity_per_sub_unit=10),
+            TransportUnit(name="Small", type="Forklift", capacity_per_sub_unit=2),
+        ],
+        tasks=[TransportTask(origin="WH", destination="LINE-A", material="DUMMY", lots_required=2, distance=10,
+                             travel_time=10, loading_time=5, unloading_time=5, transport_unit_names=["Big", "Small"])],
+        dispatch_policy=policy,
+        event_driven=True,
+        workday_end_time=3600
+    )
+
+
+DISTANCES = [
+    LocationDistance(from_location="WH", to_location="LINE-A", distance=100, travel_time=60),
+    LocationDistance(from_location="WH", to_location="LINE-B", distance=400, travel_time=240),
+]
+
+
+def _park(engine, unit_name, location):
+    """Moves an idle unit to another location, as if its last trip had ended there."""
+    engine._idle_units.take(unit_name)
+    engine.transport_units_status[unit_name]["current_location"] = location
+    engine._mark_idle(unit_name, engine.transport_units_status[unit_name])
+
+
+def test_unit_selection():
+    print("🔍 Testing unit selection per policy...")
+    # The preset task needs 2 lots at WH; Big sits at LINE-B, Small at WH
+    for policy, expected in [("fifo", "Big"), ("nearest_unit", "Small"), ("capacity_fill", "Small"), ("earliest_due", "Big")]:
+        engine = LogisticsSimulationEngine(_setup(policy), deque(), None, "", location_distances=DISTANCES)
+        _park(engine, "Big", "LINE-B")
+        engine.run_step()
+        assert engine.transport_units_status[expected]["current_task"] is not None, policy
+        print(f"  {policy}: {expected}")
+    print("✅ Each policy picks its unit")
+
+
+def test_unknown_leg_ranked_as_driven():
+    """A unit on an unknown leg is ranked by the drive it will actually make"""
+    print("🔍 Testing nearest_unit with an unknown leg...")
+    engine = LogisticsSimulationEngine(_setup("nearest_unit"), deque(), None, "", location_distances=DISTANCES)
+    _park(engine, "Big", "LINE-A")  # 60 s to WH
+    _park(engine, "Small", "DOCK")  # no distance entry: drives the task's 10 s
+    task = engine.available_tasks.peek()
+    assert engine.time_to_origin("Small", task) == task.travel_time
+    engine.run_step()
+    small = engine.transport_units_status["Small"]
+    assert small["status"] == "traveling_to_origin"
+    assert small["phase_duration"] == task.travel_time
+    assert engine.transport_units_status["Big"]["current_task"] is None
+    print("✅ Ranking and drive use the same leg cost")
+
+
+def test_nearest_unit_index():
+    print("🔍 Testing the idle-unit location index...")
+    locations = ["WH", "LINE-A", "LINE-B"]
+    setup = _setup("nearest_unit").copy(update={
+        "transport_units": [TransportUnit(name=f"U{i}", type="Forklift") for i in range(30)]
+    })
+    engine = LogisticsSimulationEngine(setup, deque(), None, "", location_distances=DISTANCES)
+    rng = random.Random(3)
+    for i in range(30):
+        _park(engine, f"U{i}", rng.choice(locations))
+    for i in rng.sample(range(30), 20):
+        engine._idle_units.take(f"U{i}")
+
+    policy = NearestUnitPolicy()
+    for origin in locations:
+        task = _setup().tasks[0].copy(update={"origin": origin})
+        expected = min(engine._idle_units, key=lambda name: (engine.time_to_origin(name, task), engine._idle_units.order(name)))
+        assert policy.select_unit(engine, task, engine._idle_units) == expected
+    print("✅ The location index finds the same unit as a scan of all idle units")
+
+
+def test_task_timestamps():
+    print("🔍 Testing task timestamps...")
+    engine = LogisticsSimulationEngine(_setup(), deque(), None, "", location_distances=DISTANCES)
+    while engine.status != "finished":
+        engine.run_step()
+    task = engine.completed_tasks[0]
+    assert task.created_at == 0 and task.assigned_at == 1
+    assert task.completed_at > task.assigned_at
+    assert engine.get_average_lead_time() == task.completed_at - task.created_at
+    print("✅ Tasks record when they were queued, assigned and completed")
+
+
+def test_benchmark_replays_same_stream():
+    print("🔍 Testing the dispatch policy benchmark...")
+    scenario = BatchScenario(
+        name="replay",
+        production_setup=SimulationSetup(line_processes={}),
+        logistics_setup=_setup(),
+        schedule_file="unused.csv",
+        location_distances=DISTANCES
+    )
+    requests = [
+        {"time": t, "material": f"MAT-{t % 3}", "quantity": 1 + t % 4, "destination": "LINE-A:Assembly" if t % 2 else "LINE-B:Assembly",
+         "priority": "high", "time_to_starvation": 600 - t}
+        for t in range(0, 600, 40)
+    ]
+    summary = run_benchmark(scenario, requests=requests)
+    print(summary[["policy", "tasks_completed", "mean_lead_time_s", "utilization"]])
+
+    assert list(summary["policy"]) == list(DISPATCH_POLICIES)
+    assert (summary["tasks_pending"] == 0).all()
+    assert (summary["tasks_completed"] > 0).all()
+    assert (summary["utilization"] > 0).all()
+    print("✅ Every policy served the whole request stream")
+
+
+def test_nearest_unit_cuts_empty_travel():
+    print("🔍 Testing empty travel with two issue locations...")
+    with tempfile.TemporaryDirectory() as work_dir:
+        mrp_file = os.path.join(work_dir, "mrp.txt")
+        with open(mrp_file, 'w', encoding='latin-1') as f:
+            f.write("Material\tIss. Stor, loc\tRounding val.\n")
+            f.write("MAT-1\tWH\t1\n")
+            f.write("MAT-2\tLINE-B\t1\n")
+        scenario = BatchScenario(
+            name="two-origins",
+            production_setup=SimulationSetup(line_processes={}),
+            logistics_setup=_setup(),
+            schedule_file="unused.csv",
+            mrp_file=mrp_file,
+            location_distances=DISTANCES
+        )
+        # Sparse requests alternating between the two issue locations, so both units are idle at each request
+        requests = [
+            {"time": 600 * i, "material": "MAT-1" if i % 2 else "MAT-2", "quantity": 2, "destination": "LINE-A:Assembly"}
+            for i in range(5)
+        ]
+        summary = run_benchmark(scenario, policies=["fifo", "nearest_unit"], requests=requests).set_index("policy")
+
+    print(summary[["tasks_completed", "empty_distance_m", "mean_lead_time_s"]])
+    assert summary.loc["nearest_unit", "tasks_completed"] == summary.loc["fifo", "tasks_completed"]
+    assert summary.loc["nearest_unit", "empty_distance_m"] < summary.loc["fifo", "empty_distance_m"]
+    print("✅ Nearest-unit dispatch drives less empty")
+
+
+if __name__ == "__main__":
+    test_unit_selection()
+    test_unknown_leg_ranked_as_driven()
+    test_nearest_unit_index()
+    test_task_timestamps()
+    test_benchmark_replays_same_stream()
+    test_nearest_unit_cuts_empty_travel()
+    print("\n🎉 Dispatch policy tests passed!")
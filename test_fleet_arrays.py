@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for the vectorized (struct-of-arrays) fleet state in tick mode.
+"""
+
+import sys
+import os
+import io
+import time
+import contextlib
+from collections import deque
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from models import TransportUnit, TransportTask, Location, LogisticsSimulationSetup, Shift
+from logistics_simulation import LogisticsSimulationEngine
+
+
+def _run(vectorized, num_units, num_tasks, shifts=()):
+    units = [TransportUnit(name=f"AGV{i}", type="AGV") for i in range(num_units)]
+    names = [unit.name for unit in units]
+    tasks = [TransportTask(origin="WH" if i % 3 else "LINE-A", destination="LINE-B", material=f"M{i}", lots_required=1,
+                           distance=100, travel_time=50 + i % 7 * 7.5, loading_time=0 if i % 4 == 0 else 10,
+                           unloading_time=1 if i % 2 else 20, transport_unit_names=names)
+             for i in range(num_tasks)]
+    setup = LogisticsSimulationSetup(
+        locations=[Location(name="WH"), Location(name="LINE-A"), Location(name="LINE-B")],
+        transport_units=units,
+        tasks=tasks,
+        shifts=list(shifts),
+        workday_end_time=3000,
+        vectorized_fleet=vectorized
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = LogisticsSimulationEngine(setup, deque(), None, "")
+        start = time.time()
+        statuses = []
+        while engine.status != "finished":
+            engine.run_step()
+            if engine.current_time % 97 == 0:
+                # The per-unit loop leaves the last phase's progress on idle units; compare busy units only
+                statuses.append([(u["name"], u["status"], u["progress"] if u["status"] != "idle" else 0, u["current_location"])
+                                 for u in engine.get_status()["transport_units"]])
+    return engine, statuses, time.time() - start
+
+
+def _event_log(engine):
+    # The last entry holds wall-clock step times, which differ between runs
+    return [entry for entry in engine.event_log if "Final performance metrics" not in entry]
+
+
+def test_vectorized_matches_dict_fleet():
+    print("🔍 Testing vectorized fleet against the per-unit loop...")
+    for shifts in ((), (Shift(start_time=0, end_time=300), Shift(start_time=420, end_time=28800))):
+        dict_engine, dict_statuses, _ = _run(False, num_units=4, num_tasks=12, shifts=shifts)
+        fleet_engine, fleet_statuses, _ = _run(True, num_units=4, num_tasks=12, shifts=shifts)
+        assert fleet_engine.fleet is not None and dict_engine.fleet is None
+        assert _event_log(fleet_engine) == _event_log(dict_engine)
+        assert fleet_statuses == dict_statuses
+        assert fleet_engine.completed_tasks_per_unit == dict_engine.completed_tasks_per_unit
+        assert fleet_engine.performance_metrics["total_distance_traveled"] == dict_engine.performance_metrics["total_distance_traveled"]
+    print("✅ Same events, unit states and metrics")
+
+
+def test_large_fleet():
+    print("🔍 Testing a large fleet...")
+    dict_engine, _, dict_time = _run(False, num_units=400, num_tasks=2000)
+    fleet_engine, _, fleet_time = _run(True, num_units=400, num_tasks=2000)
+    assert fleet_engine.completed_tasks_count == dict_engine.completed_tasks_count
+    assert fleet_engine.fleet.status_counts()["idle"] == 400
+    print(f"✅ 400 units: per-unit loop {dict_time:.2f}s, vectorized {fleet_time:.2f}s")
+
+
+if __name__ == "__main__":
+    test_vectorized_matches_dict_fleet()
+    test_large_fleet()
+    print("\n🎉 Vectorized fleet tests passed!")
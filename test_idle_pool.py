@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for the idle-unit pool used by logistics task dispatch.
+"""
+
+import sys
+import os
+import random
+from collections import deque
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from models import TransportUnit, TransportTask, Location, LogisticsSimulationSetup
+from logistics_simulation import LogisticsSimulationEngine
+from dispatch import IdleUnitPool
+
+
+def _engine(num_units, num_tasks):
+    units = [TransportUnit(name=f"U{i}", type="Forklift") for i in range(num_units)]
+    tasks = [TransportTask(origin="WH", destination="L1", material=f"M{i}", lots_required=1, distance=10,
+                           travel_time=20 + i, loading_time=5, unloading_time=5, transport_unit_names=[u.name for u in units])
+             for i in range(num_tasks)]
+    setup = LogisticsSimulationSetup(
+        locations=[Location(name="WH"), Location(name="L1")],
+        transport_units=units,
+        tasks=tasks,
+        event_driven=True,
+        workday_end_time=36000
+    )
+    return LogisticsSimulationEngine(setup, deque(), None, "")
+
+
+def test_dispatch_takes_queue_head_in_fleet_order():
+    print("🔍 Testing idle-unit dispatch order...")
+    engine = _engine(num_units=5, num_tasks=50)
+    engine.run_step()
+
+    assigned = {name: status["current_task"].material for name, status in engine.transport_units_status.items()}
+    assert assigned == {f"U{i}": f"M{i}" for i in range(5)}
+    assert len(engine.available_tasks) == 45
+    assert engine.available_tasks.peek().material == "M5"
+    assert len(engine._idle_units) == 0
+    print("✅ Tasks are taken from the head of the queue by idle units in fleet order")
+
+
+def test_idle_pool_tracks_unit_status():
+    print("🔍 Testing idle pool bookkeeping...")
+    engine = _engine(num_units=3, num_tasks=20)
+    while engine.status != "finished":
+        engine.run_step()
+        idle = sorted(name for name, status in engine.transport_units_status.items() if status["status"] == "idle")
+        assert sorted(engine._idle_units) == idle
+
+    assert engine.completed_tasks_count == 20
+    assert len(engine._idle_units) == 3
+    print("✅ Idle pool matches unit status on every step")
+
+
+def test_idle_pool_stays_compact():
+    """Reading only one index, as each policy does, must not let the other grow without bound"""
+    print("🔍 Testing idle pool compaction...")
+    unit_order = {f"U{i}": i for i in range(8)}
+    locations = ["WH", "L1", "L2"]
+    for reader in ("first", "first_at"):
+        pool = IdleUnitPool(unit_order)
+        for name in unit_order:
+            pool.add(name, "WH")
+        rng = random.Random(5)
+        for _ in range(20000):
+            if reader == "first":
+                name = pool.first()
+                assert name == min(pool, key=unit_order.get)
+            else:
+                location = rng.choice(locations)
+                name = pool.first_at(location)
+                parked = [unit for unit in pool if pool._location[unit] == location]
+                assert name == min(parked, key=unit_order.get, default=None)
+                if name is None:
+                    continue
+            pool.take(name)
+            pool.add(name, rng.choice(locations))
+
+            limit = max(IdleUnitPool.COMPACT_MIN_ENTRIES, IdleUnitPool.COMPACT_FACTOR * len(pool))
+            assert len(pool._heap) <= limit
+            assert sum(len(heap) for heap in pool._by_location.values()) <= limit
+    print("✅ Stale heap entries are compacted away")
+
+
+if __name__ == "__main__":
+    test_dispatch_takes_queue_head_in_fleet_order()
+    test_idle_pool_tracks_unit_status()
+    test_idle_pool_stays_compact()
+    print("\n🎉 Idle pool tests passed!")
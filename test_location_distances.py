@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Test script for the location distance matrix used by the logistics engine.
+"""
+
+import sys
+import os
+from collections import deque
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from models import TransportUnit, TransportTask, Location, LogisticsSimulationSetup, LocationDistance
+from logistics_simulation import LogisticsSimulationEngine
+from sim_test_support import StockRecorder
+
+
+def test_tasks_use_distance_matrix():
+    print("🔍 Testing location distance matrix...")
+    setup = LogisticsSimulationSetup(
+        locations=[Location(name="WAREHOUSE"), Location(name="L1")],
+        transport_units=[TransportUnit(name="Kururu", type="Kururu")],
+        tasks=[TransportTask(origin="WAREHOUSE", destination="L1", material="DUMMY", lots_required=1,
+                             distance=1, travel_time=1, loading_time=0, unloading_time=0,
+                             transport_unit_names=["Kururu"])],
+        event_driven=True
+    )
+    distances = [
+        LocationDistance(from_location="WAREHOUSE", to_location="L1", distance=300, travel_time=90),
+        LocationDistance(from_location="SUPERMARKET", to_location="L1", distance=80, travel_time=25),
+        LocationDistance(from_location="L1", to_location="SUPERMARKET", distance=100, travel_time=30),
+    ]
+    requests = deque([{'material': 'MAT-A', 'quantity': 2, 'destination': 'L1:Assembly'}])
+    recorder = StockRecorder()
+    engine = LogisticsSimulationEngine(setup, requests, recorder, "", location_distances=distances)
+
+    # Missing reverse directions are symmetric, explicit ones are kept, unknown legs use the default
+    assert engine._leg("L1", "WAREHOUSE") == (300, 90)
+    assert engine._leg("L1", "SUPERMARKET") == (100, 30)
+    assert engine._leg("SUPERMARKET", "L1") == (80, 25)
+    assert engine._lookup_leg("WAREHOUSE", "SUPERMARKET") is None
+    assert engine._leg("WAREHOUSE", "UNKNOWN") == (500, 120)
+
+    engine._process_material_requests()
+    task = engine.available_tasks.peek()
+    assert (task.distance, task.travel_time, task.return_time) == (300, 90, 90)
+
+    while engine.available_tasks or engine.in_progress_tasks:
+        engine.run_step()
+
+    # The unit starts at WAREHOUSE: two lots, two round trips of 2 x 300 m
+    assert recorder.delivered["MAT-A"] == 2
+    assert engine.performance_metrics["total_distance_traveled"] == 1200
+    print("✅ Tasks use the distance matrix")
+
+
+if __name__ == "__main__":
+    test_tasks_use_distance_matrix()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test script to verify that the event-driven logistics engine reproduces the tick-based
+unit state machine (same transitions at the same simulated times), standalone and in
+lockstep with a production engine.
+"""
+
+import sys
+import os
+import io
+import contextlib
+from collections import deque
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from models import (TransportUnit, TransportTask, Location, LogisticsSimulationSetup, Shift,
+                    SimulationSetup, BatchScenario, MasterLocationBase)
+from logistics_simulation import LogisticsSimulationEngine
+from batch_runner import run_engines
+from sim_test_support import SCHEDULE_FILE, build_production_engine
+
+
+def create_setup(event_driven):
+    units = [TransportUnit(name=f"Kururu {i}", type="Kururu") for i in range(3)]
+    unit_names = [unit.name for unit in units]
+    tasks = [
+        TransportTask(
+            origin="WAREHOUSE" if i % 3 else "SUPERMARKET",
+            destination="ASSEMBLY",
+            material=f"MATERIAL_{i}",
+            lots_required=1,
+            distance=100,
+            travel_time=50 + i * 7.5,
+            loading_time=0 if i % 4 == 0 else 10,
+            unloading_time=1 if i % 2 else 20,
+            transport_unit_names=unit_names
+        )
+        for i in range(12)
+    ]
+    return LogisticsSimulationSetup(
+        locations=[Location(name="WAREHOUSE"), Location(name="SUPERMARKET"), Location(name="ASSEMBLY")],
+        transport_units=units,
+        tasks=tasks,
+        shifts=[Shift(start_time=0, end_time=300), Shift(start_time=420, end_time=28800)],
+        workday_end_time=3000,
+        event_driven=event_driven
+    )
+
+
+def run_until_finished(event_driven):
+    engine = LogisticsSimulationEngine(create_setup(event_driven), deque(), None, "MRP_20250912.txt")
+    steps = 0
+    while engine.status != "finished":
+        engine.run_step()
+        steps += 1
+    return engine, steps
+
+
+def test_event_mode_matches_tick_mode():
+    print("🔍 Testing event-driven logistics engine...")
+
+    event_engine, event_steps = run_until_finished(event_driven=True)
+    tick_engine, tick_steps = run_until_finished(event_driven=False)
+
+    print(f"Event mode: {event_steps} steps, tick mode: {tick_steps} steps")
+    assert event_engine.current_time == tick_engine.current_time
+    assert event_engine.completed_tasks_count == tick_engine.completed_tasks_count == 12
+    assert event_engine.completed_tasks_per_unit == tick_engine.completed_tasks_per_unit
+    # The last entry holds wall-clock step timings, everything before must be identical
+    assert list(event_engine.event_log)[:-1] == list(tick_engine.event_log)[:-1]
+    assert event_steps < tick_steps / 10
+    print("✅ Event-driven logistics matches tick mode")
+
+
+def test_progress_across_break():
+    """The 300-420 s break must not count as phase progress in event mode"""
+    print("🔍 Testing unit progress across an off-shift break...")
+    event_engine = LogisticsSimulationEngine(create_setup(True), deque(), None, "MRP_20250912.txt")
+    tick_engine = LogisticsSimulationEngine(create_setup(False), deque(), None, "MRP_20250912.txt")
+    checked_after_break = 0
+    while event_engine.status != "finished":
+        event_engine.run_step()
+        while tick_engine.current_time < event_engine.current_time:
+            tick_engine.run_step()
+        for name, unit_status in event_engine.transport_units_status.items():
+            if unit_status["status"] in ["idle", "off_shift"]:
+                continue
+            # Tick mode counts the second a phase starts in, so the two may differ by one step
+            tick_progress = tick_engine._unit_progress(tick_engine.transport_units_status[name])
+            assert abs(event_engine._unit_progress(unit_status) - tick_progress) <= 1
+            if 420 <= event_engine.current_time < 700:
+                checked_after_break += 1
+        for unit in event_engine.get_status()["transport_units"]:
+            if unit.get("current_task"):
+                assert unit["current_task"]["progress_percentage"] <= 100
+    assert checked_after_break > 0
+    print("✅ Progress is frozen during the break")
+
+
+def run_lockstep(event_driven):
+    """Production with empty stock, so every unit waits for material delivered by logistics."""
+    material_request_queue = deque()
+    scenario = BatchScenario(name="lockstep", production_setup=SimulationSetup(line_processes={}, seed=7),
+                             schedule_file=SCHEDULE_FILE, target_date='15-Sep', max_sim_time=6000)
+    with contextlib.redirect_stdout(io.StringIO()):
+        production_engine = build_production_engine(empty_stock=True, material_request_queue=material_request_queue)
+        setup = LogisticsSimulationSetup(
+            locations=[Location(name="WAREHOUSE"), Location(name="ASSEMBLY")],
+            transport_units=[TransportUnit(name=f"Forklift {i}", type="Forklift", capacity_per_sub_unit=4) for i in range(2)],
+            tasks=[TransportTask(origin="WAREHOUSE", destination="ASSEMBLY", material="UNUSED", lots_required=1, distance=50,
+                                 travel_time=60, loading_time=10, unloading_time=10, transport_unit_names=["Forklift 0"])],
+            workday_end_time=28800,
+            event_driven=event_driven,
+            seed=7
+        )
+        logistics_engine = LogisticsSimulationEngine(
+            setup, material_request_queue, production_engine, "",
+            master_locations=[MasterLocationBase(name="ASSEMBLY", lines=list(production_engine.lines))]
+        )
+        run_engines(scenario, production_engine, logistics_engine)
+    return production_engine, logistics_engine
+
+
+def test_lockstep_matches_tick_mode():
+    """Driven by the production clock, event-driven logistics never runs ahead of production"""
+    print("🔍 Testing event-driven logistics in lockstep with production...")
+    tick_production, tick_logistics = run_lockstep(event_driven=False)
+    event_production, event_logistics = run_lockstep(event_driven=True)
+
+    print(f"Tick mode: {tick_production.completed_units} units, {tick_logistics.completed_tasks_count} tasks; "
+          f"event mode: {event_production.completed_units} units, {event_logistics.completed_tasks_count} tasks")
+    assert tick_logistics.completed_tasks_count > 0 and tick_production.completed_units > 0
+    assert event_logistics.current_time == tick_logistics.current_time == 6000
+    assert event_production.completed_units == tick_production.completed_units
+    assert event_logistics.completed_tasks_count == tick_logistics.completed_tasks_count
+    assert (event_logistics.performance_metrics["total_requests_processed"]
+            == tick_logistics.performance_metrics["total_requests_processed"])
+    print("✅ Lockstep event mode matches tick mode")
+
+
+if __name__ == "__main__":
+    test_event_mode_matches_tick_mode()
+    test_progress_across_break()
+    test_lockstep_matches_tick_mode()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test script for consolidating material requests into lot-based, capacity-sized trips.
+"""
+
+import sys
+import os
+import tempfile
+from collections import deque
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from models import TransportUnit, TransportTask, Location, LogisticsSimulationSetup
+from logistics_simulation import LogisticsSimulationEngine
+from sim_test_support import StockRecorder
+
+
+def test_requests_are_consolidated():
+    print("🔍 Testing lot consolidation...")
+    with tempfile.TemporaryDirectory() as work_dir:
+        mrp_file = os.path.join(work_dir, "mrp.txt")
+        with open(mrp_file, 'w', encoding='latin-1') as f:
+            f.write("Material\tIss. Stor, loc\tRounding val.\n")
+            f.write("MAT-A\tWAREHOUSE\t50\n")
+            f.write("MAT-B\tWAREHOUSE\t0\n")
+
+        setup = LogisticsSimulationSetup(
+            locations=[Location(name="WAREHOUSE"), Location(name="L1")],
+            transport_units=[
+                TransportUnit(name="Kururu", type="Kururu", num_sub_units=2, capacity_per_sub_unit=5),
+                TransportUnit(name="Forklift", type="Forklift", capacity_per_sub_unit=4),
+            ],
+            tasks=[TransportTask(origin="WAREHOUSE", destination="L1", material="DUMMY", lots_required=1,
+                                 distance=1, travel_time=1, loading_time=0, unloading_time=0,
+                                 transport_unit_names=["Kururu"])],
+            event_driven=True
+        )
+        requests = deque([
+            {'material': 'MAT-A', 'quantity': 290, 'destination': 'L1:Assembly', 'parent_part': 'P1'},
+            {'material': 'MAT-B', 'quantity': 30, 'destination': 'L1:Assembly', 'parent_part': 'P1'},
+        ])
+        recorder = StockRecorder()
+        engine = LogisticsSimulationEngine(setup, requests, recorder, mrp_file)
+
+    engine._process_material_requests()
+    # 290 pcs -> 6 lots of 50, 30 pcs -> 30 lots of 1: 36 lots in trips of 10
+    assert [task.load for task in engine.available_tasks] == [
+        {'MAT-A': 6, 'MAT-B': 4}, {'MAT-B': 10}, {'MAT-B': 10}, {'MAT-B': 6}
+    ]
+
+    while engine.available_tasks or engine.in_progress_tasks:
+        engine.run_step()
+
+    assert dict(recorder.delivered) == {'MAT-A': 300, 'MAT-B': 30}
+    # The forklift only carries 4 lots, so some trips were split between the units
+    assert engine.completed_tasks_count > 4
+    assert all(task.lots_required <= 10 for task in engine.completed_tasks)
+    print("✅ Requests are consolidated into lot-based trips")
+
+
+if __name__ == "__main__":
+    test_requests_are_consolidated()
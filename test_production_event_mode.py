@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Test script to verify that the event-driven mode of ProductionEngineV2 gives the same
+results as the 1-second tick mode while executing far fewer steps.
+"""
+
+import sys
+import os
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from sim_test_support import build_production_engine
+
+# Shifts run 07-15, 15-23 and 23-07; at 07:00 the next day the engine leaves shift 3 and
+# skips the off-shift time, so this horizon crosses every shift end and that jump
+PAST_SHIFT_ROLLOVER = 24 * 3600 + 1
+
+
+def test_event_mode_matches_tick_mode():
+    """Both modes must reach the same state at the same simulated time"""
+    print("🔍 Testing event-driven production engine...")
+
+    event_engine = build_production_engine(event_driven=True)
+    event_steps = 0
+    while event_engine.time < PAST_SHIFT_ROLLOVER:
+        event_engine.run_step()
+        event_steps += 1
+
+    tick_engine = build_production_engine(event_driven=False)
+    tick_steps = 0
+    while tick_engine.time < event_engine.time:
+        tick_engine.run_step()
+        tick_steps += 1
+
+    print(f"Event mode: {event_steps} steps, tick mode: {tick_steps} steps")
+    assert tick_engine.time == event_engine.time
+    # The tick engine skipped the off-shift time instead of ticking through it
+    assert tick_steps < tick_engine.time - 3600
+    assert tick_engine.shift_manager['current_shift_index'] == event_engine.shift_manager['current_shift_index']
+    assert tick_engine.completed_units == event_engine.completed_units
+    assert tick_engine.scrapped_units == event_engine.scrapped_units
+    for line_name, line_data in tick_engine.lines.items():
+        assert len(line_data["production_orders"]) == len(event_engine.lines[line_name]["production_orders"])
+    assert event_steps < tick_steps / 5
+    print("✅ Event-driven mode matches tick mode")
+
+
+if __name__ == "__main__":
+    test_event_mode_matches_tick_mode()
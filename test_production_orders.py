@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test script for the run-length order batches of ProductionEngineV2: batch quantities must
+match the schedule, completions plus skipped units must drain the order book, and the
+sequence-number index must survive batches that finish out of order.
+"""
+
+import sys
+import os
+import io
+import shutil
+import tempfile
+import contextlib
+from collections import deque
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from models import SimulationSetup
+from bom_service import BOMService
+from production_engine_v2 import ProductionEngineV2
+
+# Two lines, two schedule days; P-500 is not scheduled at all
+SMALL_SCHEDULE = """ SCHEDULE TEST ,,,,,,,,
+,,,,,,,,
+LINE,PART NO,MODEL,NO. URUT,SCHEDULE (REVISI 0),,ST,Takt Time
+,,,,15-Sep,16-Sep,,
+L1,P-100,M-A,1,3,2,0:01:00,0:01:00
+,P-200,M-B,2,0,4,0:01:30,0:01:30
+,P-300,M-C,3,5,0,0:00:45,0:00:45
+L2,P-400,M-D,4,2,1,0:02:00,0:02:00
+,P-500,M-E,5,0,0,0:01:00,0:01:00
+"""
+SCH_TOTALS = {1: 5, 2: 4, 3: 5, 4: 3}
+LINE_TARGETS = {"L1": 14, "L2": 3}
+
+
+def build_engine(work_dir, ignore_material_availability=False):
+    schedule_file = os.path.join(work_dir, "schedule.csv")
+    with open(schedule_file, 'w') as f:
+        f.write(SMALL_SCHEDULE)
+    bom_service = BOMService()
+    bom_service.material_data = {}
+    bom_service.bom_data = {part: [f"COMP-{part}"] for part in ["P-100", "P-200", "P-300", "P-400", "P-500"]}
+    setup = SimulationSetup(line_processes={}, event_driven=True, seed=7,
+                            ignore_material_availability=ignore_material_availability)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return ProductionEngineV2(setup, schedule_file, bom_service, deque())
+
+
+def test_batches_match_schedule():
+    """One batch per scheduled row holding its SCH_ sum; unscheduled rows are dropped"""
+    print("🔍 Testing order batches against the schedule...")
+    work_dir = tempfile.mkdtemp()
+    try:
+        engine = build_engine(work_dir)
+    finally:
+        shutil.rmtree(work_dir)
+
+    batches = {order['original_sequence_no']: order['quantity']
+               for line_data in engine.lines.values() for order in line_data["production_orders"]}
+    assert batches == SCH_TOTALS
+    for line_name, target in LINE_TARGETS.items():
+        line_data = engine.lines[line_name]
+        assert line_data["total_line_target"] == target
+        assert sum(order['quantity'] for order in line_data["production_orders"]) == target
+    assert engine.total_production_target == sum(SCH_TOTALS.values())
+    print("✅ Batch quantities match the schedule")
+
+
+def test_completions_and_skips_drain_orders():
+    """Completed, scrapped and skipped units together empty every line's order book"""
+    print("🔍 Testing that the order book drains...")
+    work_dir = tempfile.mkdtemp()
+    try:
+        engine = build_engine(work_dir, ignore_material_availability=True)
+    finally:
+        shutil.rmtree(work_dir)
+
+    # No stock for P-300: its 5 units are skipped instead of built
+    for process_data in engine.lines["L1"]["processes"].values():
+        process_data["stock"].pop("COMP-P-300", None)
+
+    engine.status = "running"
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(100000):
+            if not any(line_data["production_orders"] for line_data in engine.lines.values()):
+                break
+            engine.run_step()
+
+    status = engine.get_status()
+    for line_name, target in LINE_TARGETS.items():
+        line_status = status["lines"][line_name]
+        assert line_status["remaining_orders"] == 0
+        assert engine.lines[line_name]["order_index"] == {}
+        skipped = 5 if line_name == "L1" else 0
+        assert line_status["completed_units"] + line_status["scrapped_units"] + skipped == target
+    print(f"Drained at {engine.time}s: {engine.completed_units} completed, {engine.scrapped_units} scrapped")
+    print("✅ Completions and skips drain the orders")
+
+
+def test_out_of_order_retire():
+    """Batches sharing a sequence number stay findable until the last one is retired"""
+    print("🔍 Testing the order index with an out-of-order retire...")
+    work_dir = tempfile.mkdtemp()
+    try:
+        engine = build_engine(work_dir)
+    finally:
+        shutil.rmtree(work_dir)
+
+    line_data = engine.lines["L1"]
+    first, middle, last = ({'part_no': part, 'quantity': 2, 'original_sequence_no': 7} for part in ("P-100", "P-200", "P-300"))
+    other = {'part_no': "P-400", 'quantity': 1, 'original_sequence_no': 8}
+    line_data["production_orders"] = deque([first, middle, last, other])
+    line_data["order_index"] = engine._build_order_index(line_data["production_orders"])
+
+    # The middle batch finishes first: it leaves the index but waits in the order book
+    middle['quantity'] = 0
+    engine._retire_order(line_data, middle)
+    assert list(line_data["order_index"][7]) == [first, last]
+    assert line_data["order_index"][7][0] is first
+    assert list(line_data["production_orders"]) == [first, middle, last, other]
+
+    # Retiring the front batch also drops the exhausted one behind it
+    first['quantity'] = 0
+    engine._retire_order(line_data, first)
+    assert list(line_data["order_index"][7]) == [last]
+    assert list(line_data["production_orders"]) == [last, other]
+
+    last['quantity'] = 0
+    engine._retire_order(line_data, last)
+    assert 7 not in line_data["order_index"]
+    assert list(line_data["order_index"][8]) == [other]
+    assert list(line_data["production_orders"]) == [other]
+    print("✅ Order index survives out-of-order retires")
+
+
+if __name__ == "__main__":
+    test_batches_match_schedule()
+    test_completions_and_skips_drain_orders()
+    test_out_of_order_retire()
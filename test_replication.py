@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script for Monte Carlo replications with confidence intervals.
+"""
+
+import sys
+import os
+import tempfile
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from models import BatchScenario, SimulationSetup
+from data_loader import load_schedule
+from replication import run_replications, confidence_interval, check_target_metrics
+
+SCHEDULE_FILE = os.path.join(os.path.dirname(__file__), "20250912-Schedule FA1.csv")
+
+
+def test_confidence_interval():
+    print("🔍 Testing confidence interval...")
+    summary = confidence_interval([10, 12, 14], confidence=0.95)
+    assert summary["mean"] == 12
+    assert abs(summary["half_width"] - 4.968) < 0.001  # t(0.975, 2) * 2 / sqrt(3)
+    assert confidence_interval([5])["half_width"] is None
+    print("✅ Confidence interval works")
+
+
+def test_run_replications():
+    print("🔍 Testing replications...")
+    schedule_df = load_schedule(SCHEDULE_FILE)
+    with tempfile.TemporaryDirectory() as work_dir:
+        bom_file = os.path.join(work_dir, "bom.txt")
+        with open(bom_file, 'w') as f:
+            for part in schedule_df['PART NO'].dropna().unique():
+                f.write(f"{part} COMP-A\n")
+
+        scenario = BatchScenario(
+            name="replications",
+            production_setup=SimulationSetup(line_processes={}, event_driven=True),
+            schedule_file=SCHEDULE_FILE,
+            bom_file=bom_file,
+            target_date='15-Sep',
+            seed=100,
+            max_sim_time=3 * 3600
+        )
+        # Loose target: met after the first wave of min_replications
+        result = run_replications(scenario, max_replications=8, min_replications=4,
+                                  target_relative_half_width=0.5, max_workers=2)
+
+    print(f"Replications: {result['replications']}, completed units: {result['metrics']['completed_units']}")
+    assert result["target_met"]
+    assert result["replications"] == 4
+    assert result["seeds"] == [100, 101, 102, 103]
+    completed = result["metrics"]["completed_units"]
+    assert completed["n"] == 4
+    assert completed["ci_low"] <= completed["mean"] <= completed["ci_high"]
+    assert result["line_throughput_per_hour"]
+    assert not result["errors"]
+    print("✅ Replications work")
+
+
+def test_unknown_target_metric():
+    """A misspelled target metric must be rejected before any replication runs"""
+    print("🔍 Testing target metric validation...")
+    scenario = BatchScenario(
+        name="replications",
+        production_setup=SimulationSetup(line_processes={}),
+        schedule_file=SCHEDULE_FILE,
+        seed=100
+    )
+    line_name = str(load_schedule(SCHEDULE_FILE)['LINE'].dropna().iloc[0]).strip()
+    for metric in ("completed_unit", "logistics_utilization", "line_throughput_per_hour:NO-SUCH-LINE"):
+        try:
+            run_replications(scenario, target_metrics=[metric], max_workers=1)
+            assert False, f"{metric} must be rejected"
+        except ValueError as e:
+            assert metric in str(e)
+    check_target_metrics(scenario, ["completed_units", f"line_throughput_per_hour:{line_name}"])
+    print("✅ Unknown target metrics are rejected")
+
+
+if __name__ == "__main__":
+    test_confidence_interval()
+    test_run_replications()
+    test_unknown_target_metric()
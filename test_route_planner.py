@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test script for the milk-run route planner.
+"""
+
+import sys
+import os
+from collections import deque
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from models import TransportUnit, TransportTask, Location, LogisticsSimulationSetup
+from logistics_simulation import LogisticsSimulationEngine
+from sim_test_support import StockRecorder
+from route_planner import plan_milk_runs
+
+# Locations on a straight line, position in meters
+POSITIONS = {"WAREHOUSE": 0, "L1": 300, "L2": 100, "L3": 200, "L4": 900}
+
+
+def line_distance(from_location, to_location):
+    distance = abs(POSITIONS[from_location] - POSITIONS[to_location])
+    return distance, distance / 2
+
+
+def test_nearest_neighbour_tours():
+    print("🔍 Testing milk-run planning...")
+    demands = {
+        ("L1", "Assembly"): {"MAT-A": 2},
+        ("L2", "Assembly"): {"MAT-B": 3},
+        ("L3", "Assembly"): {"MAT-C": 1},
+        ("L4", "Assembly"): {"MAT-D": 4},
+    }
+    tours = plan_milk_runs("WAREHOUSE", demands, capacity=8, max_stops=3,
+                           distance_lookup=line_distance, transport_unit_names=["Train"])
+
+    assert [[drop.destination for drop in tour.drops] for tour in tours] == [["L2", "L3", "L1"], ["L4"]]
+    first = tours[0]
+    assert first.lots_required == 6 and first.load == {"MAT-B": 3, "MAT-C": 1, "MAT-A": 2}
+    assert [drop.travel_time for drop in first.drops] == [50, 50, 50]
+    assert first.distance == 600 and first.return_time == 150
+
+    # Capacity splits a stop's demand over two tours
+    tours = plan_milk_runs("WAREHOUSE", {("L1", None): {"MAT-A": 5}}, capacity=3, max_stops=3,
+                           distance_lookup=line_distance, transport_unit_names=["Train"])
+    assert [tour.load for tour in tours] == [{"MAT-A": 3}, {"MAT-A": 2}]
+    print("✅ Milk-run planning works")
+
+
+def test_engine_runs_milk_runs():
+    print("🔍 Testing milk runs in the logistics engine...")
+    setup = LogisticsSimulationSetup(
+        locations=[Location(name="WAREHOUSE"), Location(name="L1"), Location(name="L2")],
+        transport_units=[
+            TransportUnit(name="Train", type="Kururu", num_sub_units=3, capacity_per_sub_unit=2),
+            TransportUnit(name="Forklift", type="Forklift"),
+        ],
+        tasks=[TransportTask(origin="WAREHOUSE", destination="L1", material="DUMMY", lots_required=1,
+                             distance=1, travel_time=1, loading_time=0, unloading_time=0,
+                             transport_unit_names=["Train"])],
+        milk_run_enabled=True,
+        event_driven=True
+    )
+    requests = deque([
+        {'material': 'MAT-A', 'quantity': 2, 'destination': 'L1:Assembly'},
+        {'material': 'MAT-B', 'quantity': 3, 'destination': 'L2:Assembly'},
+        {'material': 'MAT-C', 'quantity': 4, 'destination': 'L3:Assembly'},
+    ])
+    recorder = StockRecorder()
+    engine = LogisticsSimulationEngine(setup, requests, recorder, "")
+
+    while requests or engine.available_tasks or engine.in_progress_tasks:
+        engine.run_step()
+
+    assert dict(recorder.delivered_to) == {("L1", "MAT-A"): 2, ("L2", "MAT-B"): 3, ("L3", "MAT-C"): 4}
+    # 9 lots on a 6-lot train: two tours, both driven by the tow train
+    assert engine.completed_tasks_per_unit == {"Train": 2, "Forklift": 0}
+    assert all(task.drops for task in engine.completed_tasks)
+    print("✅ Milk runs are driven and unloaded stop by stop")
+
+
+if __name__ == "__main__":
+    test_nearest_neighbour_tours()
+    test_engine_runs_milk_runs()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script for the on-disk cache of parsed schedules.
+"""
+
+import sys
+import os
+import shutil
+import pickle
+import tempfile
+
+import pandas as pd
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import data_loader
+
+SCHEDULE_FILE = os.path.join(os.path.dirname(__file__), "20250912-Schedule FA1.csv")
+
+
+def with_cache_dir(test):
+    """Runs test(work_dir) with SCHEDULE_CACHE_DIR pointing into a fresh temporary directory."""
+    work_dir = tempfile.mkdtemp()
+    previous = os.environ.get("SCHEDULE_CACHE_DIR")
+    os.environ["SCHEDULE_CACHE_DIR"] = os.path.join(work_dir, "cache")
+    try:
+        test(work_dir)
+    finally:
+        if previous is None:
+            os.environ.pop("SCHEDULE_CACHE_DIR")
+        else:
+            os.environ["SCHEDULE_CACHE_DIR"] = previous
+        shutil.rmtree(work_dir)
+
+
+def test_schedule_cache():
+    print("🔍 Testing schedule cache...")
+    with_cache_dir(check_schedule_cache)
+    print("✅ Schedule cache works")
+
+
+def check_schedule_cache(work_dir):
+    schedule_path = os.path.join(work_dir, os.path.basename(SCHEDULE_FILE))
+    shutil.copy(SCHEDULE_FILE, schedule_path)
+
+    parsed = data_loader.load_schedule(schedule_path)
+    cache_path = data_loader._schedule_cache_path(schedule_path)
+    assert os.path.exists(cache_path)
+    # Nothing is written next to the (uploaded) source file
+    assert sorted(os.listdir(work_dir)) == sorted([os.path.basename(SCHEDULE_FILE), "cache"])
+    assert os.stat(os.path.dirname(cache_path)).st_mode & 0o077 == 0
+    pd.testing.assert_frame_equal(parsed, data_loader.load_schedule(schedule_path, use_cache=False))
+
+    # Second load must not parse the file again
+    original_parse = data_loader._parse_schedule
+    data_loader._parse_schedule = lambda path: (_ for _ in ()).throw(AssertionError("cache not used"))
+    try:
+        pd.testing.assert_frame_equal(parsed, data_loader.load_schedule(schedule_path))
+        # Touching the file without changing it is resolved through the content hash
+        os.utime(schedule_path, (0, 0))
+        pd.testing.assert_frame_equal(parsed, data_loader.load_schedule(schedule_path))
+    finally:
+        data_loader._parse_schedule = original_parse
+
+    # Changing the content invalidates the cache
+    with open(schedule_path, 'a') as f:
+        f.write("\n")
+    reparsed = data_loader.load_schedule(schedule_path)
+    assert len(reparsed) == len(parsed)
+
+
+class Exploit:
+    """Unpickling creates marker_path"""
+    def __init__(self, marker_path):
+        self.marker_path = marker_path
+
+    def __reduce__(self):
+        return (open, (self.marker_path, 'w'))
+
+
+def test_forged_cache_ignored():
+    """A cache file without a valid signature is never unpickled"""
+    print("🔍 Testing forged schedule cache...")
+    with_cache_dir(check_forged_cache_ignored)
+    print("✅ Forged schedule cache is ignored")
+
+
+def check_forged_cache_ignored(work_dir):
+    schedule_path = os.path.join(work_dir, os.path.basename(SCHEDULE_FILE))
+    shutil.copy(SCHEDULE_FILE, schedule_path)
+    cache_path = data_loader._schedule_cache_path(schedule_path)
+    marker_path = os.path.join(work_dir, "unpickled")
+    with open(cache_path, 'wb') as f:
+        f.write(b"\0" * 32 + pickle.dumps(Exploit(marker_path)))
+
+    parsed = data_loader.load_schedule(schedule_path)
+    assert not parsed.empty
+    assert not os.path.exists(marker_path), "forged cache was unpickled"
+    # The forged file was replaced by a signed cache of the real parse
+    assert data_loader._read_schedule_cache(cache_path)['size'] == os.path.getsize(schedule_path)
+
+
+if __name__ == "__main__":
+    test_schedule_cache()
+    test_forged_cache_ignored()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test script for the leveled, rate-limited simulation logging.
+"""
+
+import sys
+import os
+import io
+import contextlib
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from sim_logging import get_logger, configure
+
+
+def _capture(func):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        func()
+    return out.getvalue().splitlines()
+
+
+def test_levels_and_debug_categories():
+    print("🔍 Testing log levels and debug categories...")
+    log = get_logger("test.engine.dispatch")
+    try:
+        configure(level="INFO", debug_categories=[])
+        assert not log.debug_enabled
+        assert _capture(lambda: (log.debug("hidden %s", 1), log.info("shown %s", 2))) == ["INFO: shown 2"]
+
+        configure(debug_categories=["test.engine"])
+        assert log.debug_enabled
+        assert not get_logger("test.other").debug_enabled
+        assert _capture(lambda: log.debug("visible %d", 3)) == ["DEBUG: visible 3"]
+
+        configure(level="WARNING", debug_categories=[])
+        assert _capture(lambda: (log.info("quiet"), log.warning("loud"), log.error("louder"))) == ["WARNING: loud", "ERROR: louder"]
+    finally:
+        configure(level="INFO", debug_categories=[])
+    print("✅ Messages below the level are dropped and debug is enabled per category")
+
+
+def test_rate_limit():
+    print("🔍 Testing rate limiting...")
+    log = get_logger("test.rate_limited", max_per_second=3)
+    lines = _capture(lambda: [log.info("step %d", i) for i in range(10)])
+    assert lines == ["INFO: step 0", "INFO: step 1", "INFO: step 2"]
+
+    # The next window reports how many messages were dropped
+    log._window_start -= 1.0
+    assert _capture(lambda: log.info("step 10")) == ["INFO: step 10 (7 similar messages suppressed)"]
+    # Errors are never dropped
+    assert len(_capture(lambda: [log.error("boom") for _ in range(5)])) == 5
+    print("✅ Messages beyond the rate are suppressed and counted")
+
+
+def test_hot_loop_is_silent_by_default():
+    print("🔍 Testing that engine debug output is off by default...")
+    from logistics_simulation import log as logistics_log
+    from production_engine_v2 import log as production_log
+    if not os.environ.get("SIM_DEBUG") and not os.environ.get("SIM_LOG_LEVEL"):
+        assert not logistics_log.debug_enabled and not production_log.debug_enabled
+    print("✅ Engine debug channels are disabled")
+
+
+if __name__ == "__main__":
+    test_levels_and_debug_categories()
+    test_rate_limit()
+    test_hot_loop_is_silent_by_default()
+    print("\n🎉 Logging tests passed!")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the versioned delta status of ProductionEngineV2: a client that merges
+the deltas into its last full status ends up with the same state as a fresh full status.
+"""
+
+import sys
+import os
+import json
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from sim_test_support import build_production_engine
+
+# Derived from current_time; delta clients recompute them instead of receiving them
+TIME_DERIVED = {"progress", "elapsed_time", "remaining_time", "takt_countdown", "current_processing_products"}
+
+
+def merge(previous, delta):
+    merged = dict(delta, lines=dict(previous["lines"]))
+    for line_name, line_delta in delta["lines"].items():
+        processes = dict(previous["lines"][line_name]["processes"])
+        for process_name, process_delta in line_delta["processes"].items():
+            stock = dict(processes[process_name]["stock"], **process_delta["stock"])
+            processes[process_name] = dict(process_delta, stock=stock)
+        merged["lines"][line_name] = dict(line_delta, processes=processes)
+    return merged
+
+
+def strip_time_derived(data):
+    if isinstance(data, dict):
+        return {key: strip_time_derived(value) for key, value in data.items() if key not in TIME_DERIVED}
+    if isinstance(data, list):
+        return [strip_time_derived(element) for element in data]
+    return data
+
+
+def test_delta_merges_to_full_status():
+    """Merged deltas must match the full status, state-wise"""
+    print("🔍 Testing delta status merging...")
+    engine = build_production_engine()
+    client_status = engine.get_status()
+    assert client_status["delta"] is False
+    # Polled every 30 seconds, with material deliveries in between
+    for poll in range(40):
+        for _ in range(30):
+            engine.run_step()
+        if poll % 10 == 5:
+            line_name = next(iter(engine.lines))
+            process_name = next(iter(engine.lines[line_name]["processes"]))
+            engine.add_stock(f"{line_name}:{process_name}", "COMP-A", 5)
+        delta = engine.get_status(since_version=client_status["version"])
+        assert delta["delta"] is True
+        client_status = merge(client_status, delta)
+
+    full_status = engine.get_status()
+    assert client_status["version"] == full_status["version"]
+    assert strip_time_derived(client_status["lines"]) == strip_time_derived(full_status["lines"])
+    print("✅ Merged deltas match the full status")
+
+
+def test_delta_only_contains_changes():
+    """Nothing changed means no lines; a delivery only resends its process and stock entry"""
+    print("🔍 Testing delta content...")
+    engine = build_production_engine()
+    for _ in range(100):
+        engine.run_step()
+    full_status = engine.get_status()
+
+    unchanged = engine.get_status(since_version=full_status["version"])
+    assert unchanged["lines"] == {}
+    assert unchanged["current_time"] == engine.time
+
+    line_name = next(iter(engine.lines))
+    process_name = next(iter(engine.lines[line_name]["processes"]))
+    engine.add_stock(f"{line_name}:{process_name}", "COMP-B", 3)
+    delta = engine.get_status(since_version=full_status["version"])
+    assert list(delta["lines"]) == [line_name]
+    assert list(delta["lines"][line_name]["processes"]) == [process_name]
+    assert delta["lines"][line_name]["processes"][process_name]["stock"] == {
+        "COMP-B": engine.lines[line_name]["processes"][process_name]["stock"]["COMP-B"]
+    }
+    print(f"Full status: {len(json.dumps(full_status))} bytes, delta: {len(json.dumps(delta))} bytes")
+    assert len(json.dumps(delta)) < len(json.dumps(full_status))
+
+    # A version the engine never reached (e.g. from before a restart) gets the full status
+    restarted = engine.get_status(since_version=engine.state_version + 100)
+    assert restarted["delta"] is False
+    assert set(restarted["lines"]) == set(engine.lines)
+    print("✅ Delta only contains changes")
+
+
+if __name__ == "__main__":
+    test_delta_merges_to_full_status()
+    test_delta_only_contains_changes()
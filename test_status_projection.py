@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for field projection and pagination of the production and logistics status.
+"""
+
+import sys
+import os
+import io
+import copy
+import contextlib
+from collections import deque
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from sim_test_support import build_production_engine
+from models import TransportUnit, TransportTask, Location, LogisticsSimulationSetup
+from logistics_simulation import LogisticsSimulationEngine
+from status_projection import parse_sections, project_production_status, project_logistics_status
+
+
+def production_status():
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = build_production_engine()
+    for _ in range(100):
+        engine.run_step()
+    return engine.get_status()
+
+
+def test_parse_sections():
+    print("🔍 Testing include parsing...")
+    assert parse_sections(None) is None
+    assert parse_sections("") == set()
+    assert parse_sections("lines, stock") == {"lines", "stock"}
+    try:
+        parse_sections("lines,units_in_process")
+        assert False, "unknown sections must be rejected"
+    except ValueError as e:
+        assert "units_in_process" in str(e)
+    print("✅ Include parsing works")
+
+
+def test_production_projection():
+    print("🔍 Testing production status projection...")
+    status = production_status()
+    original = copy.deepcopy(status)
+
+    assert project_production_status(status) is status
+
+    summary = project_production_status(status, set())
+    assert "lines" not in summary
+    assert summary["completed_units"] == status["completed_units"]
+
+    assert any("child_parts" in (line_status["current_order"] or {}) for line_status in status["lines"].values())
+    light = project_production_status(status, {"lines"}, offset=2, limit=5)
+    assert list(light["lines"]) == list(status["lines"])[2:7]
+    assert light["pagination"]["lines"] == {"offset": 2, "limit": 5, "total": len(status["lines"])}
+    for line_status in light["lines"].values():
+        assert "child_parts" not in (line_status["current_order"] or {})
+        for process_status in line_status["processes"].values():
+            assert "stock" not in process_status
+            assert all("child_parts" not in unit for unit in process_status["units_in_process"])
+
+    detailed = project_production_status(status, {"lines", "stock", "child_parts"}, limit=1)
+    line_name = next(iter(status["lines"]))
+    assert detailed["lines"] == {line_name: status["lines"][line_name]}
+
+    # The (possibly shared) status is never modified
+    assert status == original
+    print("✅ Production sections and pages are selected")
+
+
+def test_logistics_projection():
+    print("🔍 Testing logistics status projection...")
+    setup = LogisticsSimulationSetup(
+        locations=[Location(name="WH"), Location(name="L1")],
+        transport_units=[TransportUnit(name=f"U{i}", type="Forklift") for i in range(1, 6)],
+        tasks=[TransportTask(origin="WH", destination="L1", material="M1", lots_required=1, distance=10,
+                             travel_time=10, loading_time=5, unloading_time=5, transport_unit_names=["U1"])],
+        workday_end_time=600
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = LogisticsSimulationEngine(setup, deque(), None, "")
+        for _ in range(60):
+            engine.run_step()
+    status = engine.get_status()
+    original = copy.deepcopy(status)
+
+    summary = project_logistics_status(status, set())
+    assert "transport_units" not in summary and "event_log" not in summary
+    assert all(set(location) == {"name"} for location in summary["locations"])
+    assert summary["completed_tasks_count"] == status["completed_tasks_count"]
+
+    units_page = project_logistics_status(status, {"units"}, units_offset=1, units_limit=2)
+    assert [unit["name"] for unit in units_page["transport_units"]] == ["U2", "U3"]
+    assert units_page["pagination"] == {"transport_units": {"offset": 1, "limit": 2, "total": 5}}
+    assert "event_log" not in units_page
+
+    log_page = project_logistics_status(status, {"event_log", "stock"}, log_limit=3)
+    assert log_page["event_log"] == status["event_log"][:3]
+    assert log_page["locations"] == status["locations"]
+
+    # Paging the units leaves the event log alone, and the other way round
+    assert len(status["event_log"]) > 3
+    both = project_logistics_status(status, None, units_offset=3, units_limit=1, log_offset=1)
+    assert [unit["name"] for unit in both["transport_units"]] == ["U4"]
+    assert both["event_log"] == status["event_log"][1:]
+    assert both["pagination"]["event_log"] == {"offset": 1, "limit": None, "total": len(status["event_log"])}
+    assert status == original
+    print("✅ Logistics sections and pages are selected")
+
+
+if __name__ == "__main__":
+    test_parse_sections()
+    test_production_projection()
+    test_logistics_projection()
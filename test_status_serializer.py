@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script for the status serializer: non-finite floats, NumPy and datetime values,
+the standard library fallback, MessagePack and gzip negotiation.
+"""
+
+import sys
+import os
+import gzip
+import json
+import math
+import time
+from datetime import datetime
+
+import numpy as np
+from starlette.requests import Request
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import status_serializer
+from status_serializer import encode_json, status_response
+
+STATUS = {
+    "status": "running",
+    "current_time": 12.5,
+    "utilization": math.nan,
+    "lines": {"L1": {"takt_countdown": math.inf, "completed_units": np.int64(3), "ratio": np.float64(0.5)}},
+    "materials": [{"material": "M1", "needed": 4}],
+    "sync_status": {"last_sync_time": datetime(2025, 9, 12, 7, 30)},
+}
+EXPECTED = {
+    "status": "running",
+    "current_time": 12.5,
+    "utilization": None,
+    "lines": {"L1": {"takt_countdown": None, "completed_units": 3, "ratio": 0.5}},
+    "materials": [{"material": "M1", "needed": 4}],
+    "sync_status": {"last_sync_time": "2025-09-12T07:30:00"},
+}
+
+
+def make_request(**headers):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/status",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+def test_encode_json():
+    """Non-finite floats become null and NumPy/datetime values are plain JSON, with or without orjson"""
+    print("🔍 Testing JSON encoding...")
+    assert json.loads(encode_json(STATUS)) == EXPECTED
+    assert json.loads(encode_json({"a": np.float32("nan"), "b": np.array([1.5, np.nan])})) == {"a": None, "b": [1.5, None]}
+
+    real_orjson = status_serializer.orjson
+    status_serializer.orjson = None
+    try:
+        assert json.loads(encode_json(STATUS)) == EXPECTED
+        finite = {"a": 1.0, "b": [np.int32(2)]}
+        assert encode_json(finite) == b'{"a":1.0,"b":[2]}'
+        numpy_nan = {"a": np.float32("nan"), "b": np.array([1.5, np.nan, np.inf]), "c": [np.float64("-inf")]}
+        assert json.loads(encode_json(numpy_nan)) == {"a": None, "b": [1.5, None, None], "c": [None]}
+    finally:
+        status_serializer.orjson = real_orjson
+    print("✅ JSON encoding handles non-finite, NumPy and datetime values")
+
+
+def test_negotiation():
+    """gzip only when accepted and worth it; MessagePack only when asked for and available"""
+    print("🔍 Testing content negotiation...")
+    small = status_response({"status": "running"}, make_request(accept_encoding="gzip"))
+    assert "content-encoding" not in small.headers
+    assert small.media_type == "application/json"
+
+    large_status = {"lines": {f"L{i}": {"stock": {f"M{j}": j for j in range(50)}} for i in range(20)}}
+    large = status_response(large_status, make_request(accept_encoding="deflate, gzip;q=0.8"))
+    assert large.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in large.headers["vary"]
+    assert json.loads(gzip.decompress(large.body)) == large_status
+    print(f"gzip: {len(encode_json(large_status))} -> {len(large.body)} bytes")
+
+    refused = status_response(large_status, make_request(accept_encoding="gzip;q=0"))
+    assert "content-encoding" not in refused.headers
+
+    packed = status_response(STATUS, make_request(accept="application/msgpack"))
+    if status_serializer.msgpack is None:
+        assert packed.media_type == "application/json"
+        print("msgpack not installed, JSON served instead")
+    else:
+        assert packed.media_type == "application/msgpack"
+        decoded = status_serializer.msgpack.unpackb(packed.body)
+        assert decoded["lines"]["L1"]["completed_units"] == 3
+        assert math.isnan(decoded["utilization"])
+    print("✅ Content negotiation works")
+
+
+def test_large_status_roundtrip():
+    """A large status is encoded in one pass and decodes to the same data"""
+    print("🔍 Testing serialization cost...")
+    unit = {"progress": 50, "part_no": "P1", "model": "M", "cycle_time": 60.0, "remaining_time": 30.0,
+            "elapsed_time": 30.0, "child_parts": [f"C{i}" for i in range(20)]}
+    status = {"lines": {f"L{i}": {"processes": {f"P{j}": {"units_in_process": [unit] * 5, "stock": {f"C{k}": k for k in range(20)}}
+                                                for j in range(10)}} for i in range(100)}}
+    start = time.perf_counter()
+    body = encode_json(status)
+    elapsed = time.perf_counter() - start
+    print(f"{len(body)} bytes encoded in {elapsed * 1000:.1f} ms")
+    assert json.loads(body) == status
+    print("✅ Large status encoded")
+
+
+if __name__ == "__main__":
+    test_encode_json()
+    test_negotiation()
+    test_large_status_roundtrip()
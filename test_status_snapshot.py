@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the double-buffered status snapshots: publish cadence, deltas cut from a
+snapshot, and consistent reads while the engine steps in another thread.
+"""
+
+import sys
+import os
+import threading
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from sim_test_support import build_production_engine
+from production_engine_v2 import select_status_changes
+from status_snapshot import SnapshotBuffer
+
+
+def test_publish_cadence():
+    """A snapshot every N steps, or sooner once T milliseconds have passed"""
+    print("🔍 Testing snapshot cadence...")
+    buffer = SnapshotBuffer(every_steps=5, every_ms=60000)
+    published = [buffer.step_done(lambda: ({"step": step}, None)) for step in range(12)]
+    # The first step publishes because there is no snapshot yet
+    assert published == [True, False, False, False, False, True, False, False, False, False, True, False]
+    assert buffer.latest().status == {"step": 10}
+    assert buffer.latest().sequence == 3
+
+    buffer = SnapshotBuffer(every_steps=1000, every_ms=0)
+    assert all(buffer.step_done(lambda: ({}, None)) for _ in range(5))
+    buffer.clear()
+    assert buffer.latest() is None
+    print("✅ Snapshots follow the configured cadence")
+
+
+def test_delta_from_snapshot_matches_engine():
+    """Changes cut from a snapshot equal get_status(since_version) at the same state"""
+    print("🔍 Testing deltas from snapshots...")
+    engine = build_production_engine()
+    for _ in range(200):
+        engine.run_step()
+    since_version = engine.get_status()["version"]
+    for _ in range(300):
+        engine.run_step()
+    line_name = next(iter(engine.lines))
+    process_name = next(iter(engine.lines[line_name]["processes"]))
+    engine.add_stock(f"{line_name}:{process_name}", "COMP-A", 4)
+
+    buffer = SnapshotBuffer()
+    snapshot = buffer.publish(engine.get_status(), engine.status_versions())
+    expected = engine.get_status(since_version)
+    delta = select_status_changes(snapshot.status, snapshot.versions, since_version)
+    for status in (expected, delta):
+        status.pop("real_time_timestamp")
+        status.pop("step_timing")
+    assert delta == expected
+    assert delta["lines"]
+    # The snapshot itself is left untouched
+    assert snapshot.status["delta"] is False
+    assert set(snapshot.status["lines"]) == set(engine.lines)
+    print("✅ Snapshot deltas match the engine")
+
+
+def test_reads_while_stepping():
+    """Readers on another thread always see a status built between two steps"""
+    print("🔍 Testing snapshot reads during stepping...")
+    engine = build_production_engine()
+    buffer = SnapshotBuffer(every_steps=5, every_ms=1000)
+    buffer.publish(engine.get_status(), engine.status_versions())
+    done = threading.Event()
+
+    def simulation_loop():
+        for _ in range(1500):
+            engine.run_step()
+            buffer.step_done(lambda: (engine.get_status(), engine.status_versions()))
+        done.set()
+
+    thread = threading.Thread(target=simulation_loop)
+    thread.start()
+    reads, last_sequence = 0, 0
+    while not done.is_set() or reads == 0:
+        snapshot = buffer.latest()
+        status = snapshot.status
+        assert snapshot.sequence >= last_sequence
+        last_sequence = snapshot.sequence
+        assert status["completed_units"] == sum(line["completed_units"] for line in status["lines"].values())
+        assert status["version"] == snapshot.versions["version"]
+        reads += 1
+    thread.join()
+    print(f"{reads} consistent reads of {last_sequence} snapshots")
+    print("✅ Reads never see a half-finished step")
+
+
+if __name__ == "__main__":
+    test_publish_cadence()
+    test_delta_from_snapshot_matches_engine()
+    test_reads_while_stepping()
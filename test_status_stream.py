@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the status broadcaster: one frame per publish shared by every
+subscriber, rate-limited builds, and publishing from a simulation thread.
+"""
+
+import sys
+import os
+import json
+import asyncio
+import threading
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from status_stream import StatusBroadcaster
+
+
+def test_subscribers_share_frames():
+    """Every subscriber gets the same bytes object; no status is built without subscribers"""
+    print("🔍 Testing shared status frames...")
+    broadcaster = StatusBroadcaster("test", rate_hz=1000)
+    builds = []
+
+    def build_status():
+        builds.append(len(builds))
+        return {"step": len(builds), "value": 1.5}
+
+    assert broadcaster.publish_if_due(build_status) is False
+    assert builds == []
+
+    async def collect(count):
+        frames = []
+        async for frame in broadcaster.subscribe():
+            frames.append(frame)
+            if len(frames) == count:
+                return frames
+
+    async def scenario():
+        readers = [asyncio.create_task(collect(3)) for _ in range(4)]
+        await asyncio.sleep(0)
+        assert broadcaster.subscriber_count == 4
+        for _ in range(3):
+            while not broadcaster.publish_if_due(build_status):
+                await asyncio.sleep(0.001)
+            await asyncio.sleep(0.01)
+        return await asyncio.gather(*readers)
+
+    results = asyncio.run(scenario())
+    assert len(builds) == 3
+    for frames in results:
+        assert [json.loads(frame)["step"] for frame in frames] == [1, 2, 3]
+        assert all(frame is shared for frame, shared in zip(frames, results[0]))
+    assert broadcaster.subscriber_count == 0
+    print("✅ Subscribers share one frame per publish")
+
+
+def test_rate_limit_and_thread_publishing():
+    """A thread stepping far faster than the rate publishes at most rate_hz frames per second"""
+    print("🔍 Testing rate-limited publishing from a thread...")
+    broadcaster = StatusBroadcaster("test", rate_hz=20)
+    builds = []
+
+    def simulation_loop(stop):
+        step = 0
+        while not stop.is_set():
+            step += 1
+            broadcaster.publish_if_due(lambda: builds.append(step) or {"step": step})
+        broadcaster.publish({"step": step, "status": "finished"})
+
+    async def scenario():
+        stop = threading.Event()
+        received = []
+
+        async def reader():
+            async for frame in broadcaster.subscribe():
+                received.append(json.loads(frame))
+                if received[-1].get("status") == "finished":
+                    return
+
+        task = asyncio.create_task(reader())
+        await asyncio.sleep(0)
+        thread = threading.Thread(target=simulation_loop, args=(stop,))
+        thread.start()
+        await asyncio.sleep(0.5)
+        stop.set()
+        await asyncio.wait_for(task, timeout=2)
+        thread.join()
+        return received
+
+    received = asyncio.run(scenario())
+    print(f"Built {len(builds)} frames in 0.5 s, subscriber received {len(received)}")
+    assert 1 <= len(builds) <= 13
+    assert received[-1]["status"] == "finished"
+    steps = [frame["step"] for frame in received]
+    assert steps == sorted(steps)
+    print("✅ Publishing is rate-limited and thread-safe")
+
+
+if __name__ == "__main__":
+    test_subscribers_share_frames()
+    test_rate_limit_and_thread_publishing()
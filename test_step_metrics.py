@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for the ring-buffered step timer.
+"""
+
+import sys
+import os
+import io
+import contextlib
+from collections import deque
+
+# Add backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+import step_metrics
+from step_metrics import StepTimer
+from models import TransportUnit, TransportTask, Location, LogisticsSimulationSetup
+from logistics_simulation import LogisticsSimulationEngine
+
+
+class FakeClock:
+    """Replaces time.perf_counter with a clock that only moves when told to."""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ring_buffer_and_percentiles():
+    print("🔍 Testing step timer ring buffer...")
+    clock = FakeClock()
+    real_perf_counter = step_metrics.time.perf_counter
+    step_metrics.time.perf_counter = clock
+    try:
+        timer = StepTimer(("requests", "dispatch"), capacity=4)
+        for step in range(10):
+            timer.start_step()
+            clock.now += 0.001 * step  # requests
+            timer.mark("requests")
+            clock.now += 0.002  # dispatch
+            timer.mark("dispatch")
+            timer.end_step()
+    finally:
+        step_metrics.time.perf_counter = real_perf_counter
+
+    summary = timer.summary()
+    assert summary["steps"] == 10 and summary["window"] == 4
+    # Only steps 6..9 are kept: totals of 8, 9, 10 and 11 ms
+    assert abs(summary["total"]["max_ms"] - 11) < 1e-6
+    assert abs(summary["total"]["mean_ms"] - 9.5) < 1e-6
+    assert abs(summary["phases"]["dispatch"]["p99_ms"] - 2) < 1e-6
+    assert abs(summary["phases"]["requests"]["p50_ms"] - 7.5) < 1e-6
+    assert abs(timer.mean_step_time - 0.0095) < 1e-9
+    print("✅ Old steps are overwritten and percentiles cover the window")
+
+
+def test_logistics_exposes_step_timing():
+    print("🔍 Testing step timing in the logistics status...")
+    setup = LogisticsSimulationSetup(
+        locations=[Location(name="WH"), Location(name="L1")],
+        transport_units=[TransportUnit(name="U1", type="Forklift")],
+        tasks=[TransportTask(origin="WH", destination="L1", material="M1", lots_required=1, distance=10,
+                             travel_time=10, loading_time=5, unloading_time=5, transport_unit_names=["U1"])],
+        workday_end_time=600
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = LogisticsSimulationEngine(setup, deque(), None, "")
+        while engine.status != "finished":
+            engine.run_step()
+
+    timing = engine.get_status()["performance_metrics"]["step_timing"]
+    assert timing["steps"] == engine.step_timer.count > 600
+    assert set(timing["phases"]) == {"requests", "dispatch", "progression"}
+    assert timing["total"]["max_ms"] >= timing["total"]["p99_ms"] >= timing["total"]["p50_ms"] > 0
+    print("✅ Per-phase step timing is part of the status")
+
+
+if __name__ == "__main__":
+    test_ring_buffer_and_percentiles()
+    test_logistics_exposes_step_timing()
+    print("\n🎉 Step timer tests passed!")